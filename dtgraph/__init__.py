@@ -1,3 +1,11 @@
 from dtgraph.backend.neo4j.graph import Neo4jGraph
+from dtgraph.backend.neo4j.async_graph import AsyncNeo4jGraph
+from dtgraph.backend.memory.graph import InMemoryGraph
+from dtgraph.backend.capabilities import Capabilities
 from dtgraph.rule import Rule
 from dtgraph.transformation import Transformation
+from dtgraph.cache import RuleCache
+from dtgraph.plan import PlanNode
+from dtgraph.metrics import RunStats
+from dtgraph.tracing import Tracer, TraceHook, ChromeTraceExporter
+from dtgraph.conflict import Conflict
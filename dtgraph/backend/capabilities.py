@@ -0,0 +1,240 @@
+"""Capabilities of the backends.
+
+Backends speak different dialects of openCypher, and their servers differ by the features they offer:
+the function returning the identifier of an element, how a query commits in batches, how indexes and constraints are defined, ...
+This module describes each backend by a `Capabilities` profile, which the compiler and the transformations consult
+to emit the fastest form available on the backend.
+
+Profiles are registered by database name, see `register_profile`.
+Supporting another backend, or a newer version of a server, amounts to registering (or deriving) a profile,
+and giving it to the graph, e.g., `Neo4jGraph(uri, "neo4j", capabilities=NEO4J.derive(parallel_runtime=True))`.
+"""
+import copy
+
+# syntaxes of the batched execution of the MERGE section of rules
+BATCHINGS = ("call_in_transactions", "periodic_commit")
+
+# syntaxes of the schema commands
+DDLS = ("neo4j", "memgraph")
+
+class Capabilities(object):
+    """
+    Profile of a backend, i.e., the dialect of openCypher it speaks and the features of its server.
+
+    Attributes
+    ----------
+    name : str
+        Name of the backend, i.e., "neo4j", "memgraph" or "memory".
+    id_function : str
+        Function returning the (string) identifier of an element, used in the Skolem tuples of output elements.
+    numeric_id_function : str
+        Function returning an integer identifier of an element, or template of the expression computing it from the element `{}`,
+        used to split the bindings of partitioned rules and the exported elements, see `numeric_id`.
+    hash_function : str
+        Function returning the hexadecimal MD5 digest of a list of strings, used by compact identifiers.
+        The compiler folds the digest into a pair of integers. It is provided by plugins, e.g., APOC on Neo4j and MAGE on Memgraph.
+    batching : str
+        How the MERGE section of a rule commits in batches, one of `BATCHINGS`, or None if the backend can not.
+        "call_in_transactions" wraps it into `CALL { ... } IN TRANSACTIONS`, which also deletes elements in bounded transactions,
+        whereas "periodic_commit" prefixes the script with `USING PERIODIC COMMIT`.
+    ddl : str
+        Syntax of the schema commands, one of `DDLS`, or None if the backend has no schema.
+    key_constraints : bool
+        Whether output elements are identified through uniqueness constraints, rather than through indexes.
+        Constraints also prevent concurrent writers from duplicating an element.
+    relationship_indexes : bool
+        Whether properties of relationships can be indexed (or constrained), so that output relationships are looked up by their identifier.
+    composite_indexes : bool
+        Whether an index can span several properties.
+    schema_autocommit : bool
+        Whether schema commands must run in an implicit transaction.
+    index_population_async : bool
+        Whether indexes are populated in background, and should be awaited before they are used.
+    parallel_runtime : bool
+        Whether read-only queries (e.g., the diagnosis of conflicts) can run on the parallel runtime of the server.
+        This requires Neo4j Enterprise 5.13 or newer, hence no profile enables it by default.
+    reports_plans : bool
+        Whether the summary of a query carries its plan when it is explained or profiled.
+    evaluates_rules : bool
+        Whether the graph evaluates the dictionaries of rules itself, rather than executing compiled scripts.
+
+    The following attributes describe how transformations are executed on the backend, rather than what it supports.
+
+    storage_mode : str
+        If provided, storage mode the database is switched to while a transformation is applied, and restored from on eject or abort,
+        e.g., "IN_MEMORY_ANALYTICAL" on Memgraph, which gives up the multi-version concurrency control of transactions.
+    index_output_labels : bool
+        Whether the identifiers of output nodes are also indexed by output label while a transformation is applied.
+    batch_size : int
+        If provided, batch size of the rules which are not given one, see `batching`.
+    """
+
+    def __init__(self, name, id_function = "ID", numeric_id_function = "ID", hash_function = "util_module.md5", batching = "call_in_transactions",
+                 ddl = None, key_constraints = False, relationship_indexes = False, composite_indexes = False, schema_autocommit = False,
+                 index_population_async = False, parallel_runtime = False, reports_plans = False, evaluates_rules = False,
+                 storage_mode = None, index_output_labels = False, batch_size = None):
+        if batching is not None and batching not in BATCHINGS:
+            raise ValueError(f"Unknown batching {batching}, expected one of {', '.join(BATCHINGS)}.")
+        if ddl is not None and ddl not in DDLS:
+            raise ValueError(f"Unknown DDL {ddl}, expected one of {', '.join(DDLS)}.")
+        self.name = name
+        self.id_function = id_function
+        self.numeric_id_function = numeric_id_function
+        self.hash_function = hash_function
+        self.batching = batching
+        self.ddl = ddl
+        self.key_constraints = key_constraints
+        self.relationship_indexes = relationship_indexes
+        self.composite_indexes = composite_indexes
+        self.schema_autocommit = schema_autocommit
+        self.index_population_async = index_population_async
+        self.parallel_runtime = parallel_runtime
+        self.reports_plans = reports_plans
+        self.evaluates_rules = evaluates_rules
+        self.storage_mode = storage_mode
+        self.index_output_labels = index_output_labels
+        self.batch_size = batch_size
+
+    def derive(self, **changes):
+        """Returns a copy of this profile with the given attributes changed, e.g., for a newer version of the server."""
+        derived = copy.copy(self)
+        for key, value in changes.items():
+            if not hasattr(derived, key):
+                raise ValueError(f"Unknown capability {key}.")
+            setattr(derived, key, value)
+        return derived
+
+    @property
+    def dialect(self) -> list:
+        """The attributes changing the compiled scripts, which should be part of the key of cached rules."""
+        return [self.id_function, self.numeric_id_function, self.hash_function, self.batching]
+
+    def create_key(self, name, label, property, relationship = False):
+        """
+        Returns the schema command speeding up the lookup of output elements by their identifier,
+        or None if the backend can not index such elements.
+
+        Parameters
+        ----------
+        name : str
+            Name of the constraint, if the backend names them.
+        label : str
+            Label of the nodes, or type of the relationships.
+        property : str
+            Property identifying the elements.
+        relationship : bool
+            Whether the elements are relationships.
+        """
+        if self.ddl is None or (relationship and not self.relationship_indexes):
+            return None
+        if self.key_constraints:
+            variable = "r" if relationship else "n"
+            pattern = f"()-[r:`{label}`]-()" if relationship else f"(n:`{label}`)"
+            return f"CREATE CONSTRAINT `{name}` IF NOT EXISTS FOR {pattern} REQUIRE {variable}.`{property}` IS UNIQUE"
+        if self.ddl == "neo4j":
+            return self.create_index(name, label, [property], relationship)
+        return f"CREATE {'EDGE ' if relationship else ''}INDEX ON :`{label}`(`{property}`)"
+
+    def drop_key(self, name, label, property, relationship = False):
+        """Returns the schema command dropping the result of `create_key`, or None if there is none."""
+        if self.ddl is None or (relationship and not self.relationship_indexes):
+            return None
+        if self.key_constraints:
+            return f"DROP CONSTRAINT `{name}` IF EXISTS"
+        return self.drop_index(name, label, [property], relationship)
+
+    def create_index(self, name, label, properties, relationship = False):
+        """
+        Returns the schema command creating an index on the given properties of the nodes with the given label,
+        or None if the backend has no schema.
+        Only the first property is indexed if the backend does not support composite indexes.
+        """
+        if self.ddl is None or (relationship and not self.relationship_indexes):
+            return None
+        if not self.composite_indexes:
+            properties = properties[:1]
+        if self.ddl == "neo4j":
+            pattern = f"()-[n:`{label}`]-()" if relationship else f"(n:`{label}`)"
+            return f"CREATE INDEX `{name}` IF NOT EXISTS FOR {pattern} ON ({', '.join([f'n.`{p}`' for p in properties])})"
+        return f"CREATE {'EDGE ' if relationship else ''}INDEX ON :`{label}`({', '.join([f'`{p}`' for p in properties])})"
+
+    def drop_index(self, name, label, properties, relationship = False):
+        """Returns the schema command dropping the result of `create_index`, or None if the backend has no schema."""
+        if self.ddl is None or (relationship and not self.relationship_indexes):
+            return None
+        if self.ddl == "neo4j":
+            return f"DROP INDEX `{name}` IF EXISTS"
+        if not self.composite_indexes:
+            properties = properties[:1]
+        return f"DROP {'EDGE ' if relationship else ''}INDEX ON :`{label}`({', '.join([f'`{p}`' for p in properties])})"
+
+    def numeric_id(self, variable: str) -> str:
+        """Returns the expression computing the integer identifier of the element bound to the given variable."""
+        if "{}" in self.numeric_id_function:
+            return self.numeric_id_function.format(variable)
+        return f"{self.numeric_id_function}({variable})"
+
+    def read_query(self, query: str) -> str:
+        """Returns the given read-only query, to be run by the fastest runtime of the server."""
+        if self.parallel_runtime:
+            return "CYPHER runtime=parallel\n" + query.lstrip()
+        return query
+
+    def __repr__(self):
+        return f"Capabilities({self.name})"
+
+NEO4J = Capabilities(
+    "neo4j",
+    id_function = "elementID",
+    # id() is deprecated on Neo4j 5, whose element ids end with the integer identifier of the element
+    numeric_id_function = 'toInteger(split(elementId({}), ":")[-1])',
+    hash_function = "apoc.util.md5",
+    batching = "call_in_transactions",
+    ddl = "neo4j",
+    key_constraints = True,
+    relationship_indexes = True,
+    composite_indexes = True,
+    index_population_async = True,
+    reports_plans = True)
+
+MEMGRAPH = Capabilities(
+    "memgraph",
+    batching = "periodic_commit",
+    ddl = "memgraph",
+    schema_autocommit = True)
+
+# bulk transformations on Memgraph: the analytical storage mode removes the overhead of transactions on large MERGE workloads,
+# which are committed periodically, and each output label gets an index on the identifiers of its nodes.
+# As writes are not isolated in this mode, only independent rules should be applied concurrently.
+MEMGRAPH_ANALYTICAL = MEMGRAPH.derive(
+    storage_mode = "IN_MEMORY_ANALYTICAL",
+    index_output_labels = True,
+    batch_size = 10_000)
+
+MEMORY = Capabilities(
+    "memory",
+    batching = None,
+    evaluates_rules = True)
+
+PROFILES = {}
+
+def register_profile(capabilities: Capabilities):
+    """Registers the profile of a backend, used by the graphs connected to a database of the same name."""
+    PROFILES[capabilities.name] = capabilities
+
+for _profile in (NEO4J, MEMGRAPH, MEMORY):
+    register_profile(_profile)
+
+def profile_for(database: str) -> Capabilities:
+    """Returns the profile registered for a database, or a generic openCypher profile if there is none."""
+    profile = PROFILES.get(database)
+    if profile is None:
+        return Capabilities(database)
+    return profile
+
+def capabilities_of(graph) -> Capabilities:
+    """Returns the capabilities of a graph, or the profile registered for its database if the graph does not declare any."""
+    capabilities = getattr(graph, 'capabilities', None)
+    if capabilities is not None:
+        return capabilities
+    return profile_for(getattr(graph, 'database', None))
@@ -0,0 +1,941 @@
+"""Evaluation of openCypher in memory.
+
+This module contains a parser and an evaluator for the subset of openCypher used by the lhs of rules,
+i.e., `MATCH` clauses with node and relationship patterns (including variable-length ones) and `WHERE` conditions,
+and by the commands loading the scenarios, i.e., `CREATE` and `MERGE` clauses.
+It is not a general openCypher engine: bookkeeping operations (e.g., eject or abort) are implemented by the graph itself,
+and conditions are restricted to comparisons, null checks, `IN` lists, string predicates (`STARTS WITH`, `ENDS WITH`, `CONTAINS`),
+concatenations with `+`, and the functions `coalesce`, `toString`, `toLower`, `toUpper` and `trim`.
+Any other construct raises a ParseError.
+
+Bindings of a `MATCH` clause are computed pattern by pattern: a pattern sharing a variable with the previous ones
+is expanded from each of their bindings, otherwise it is matched once, filtered by the conditions on its own variables,
+and hash-joined with the previous bindings on the equalities of the `WHERE` clause relating both sides.
+Nodes are looked up through the label and property indexes of the store, see `dtgraph.backend.memory.graph.InMemoryGraph`.
+
+Functions
+---------
+parse_query(text)
+    Parses a read query made of `MATCH` clauses, e.g., the lhs of a rule.
+parse_script(text)
+    Parses a write query made of `CREATE` and `MERGE` clauses, e.g., a command loading a CSV file.
+"""
+import functools
+import math
+import re
+
+from dtgraph.exceptions import ParseError, RunTimeError
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+|//[^\n]*)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<number>\d+\.\d+(?:[eE][-+]?\d+)?|\d+)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*|`[^`]*`)
+  | (?P<parameter>\$[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<symbol><>|<=|>=|\.\.|[-+*=<>(){}\[\],:.|;])
+""", re.VERBOSE)
+
+_ESCAPES = {'n': "\n", 't': "\t", 'r': "\r", 'b': "\b", 'f': "\f", '\\': "\\", "'": "'", '"': '"'}
+
+# clauses that may follow the write clauses of a script without writing anything
+_READ_CLAUSES = ("WITH", "MATCH", "OPTIONAL", "UNWIND", "RETURN")
+_WRITE_KEYWORDS = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DETACH|FOREACH|CALL)\b", re.IGNORECASE)
+
+class _Token(object):
+    __slots__ = ("kind", "value", "pos", "quoted")
+
+    def __init__(self, kind, value, pos, quoted = False):
+        self.kind = kind
+        self.value = value
+        self.pos = pos
+        self.quoted = quoted
+
+    def keyword(self):
+        """Returns the keyword the token stands for, if it is an unquoted name."""
+        return self.value.upper() if self.kind == "name" and not self.quoted else None
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise ParseError(f"Unexpected character {text[pos]!r} (at char {pos}).")
+        kind = m.lastgroup
+        value = m.group()
+        if kind == "name" and value.startswith("`"):
+            tokens.append(_Token(kind, value[1:-1], pos, quoted=True))
+        elif kind != "space":
+            tokens.append(_Token(kind, value, pos))
+        pos = m.end()
+    tokens.append(_Token("end", "", len(text)))
+    return tokens
+
+def _unescape(literal):
+    return re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(1)), literal[1:-1])
+
+# values
+
+def _category(v):
+    if isinstance(v, bool):
+        return "boolean"
+    if isinstance(v, (int, float)):
+        return "number"
+    if isinstance(v, str):
+        return "string"
+    if isinstance(v, (list, tuple)):
+        return "list"
+    return type(v).__name__
+
+def equals(a, b):
+    """Cypher equality: null if either operand is null, false if they are of different types."""
+    if a is None or b is None:
+        return None
+    category = _category(a)
+    if category != _category(b):
+        return False
+    if category == "list":
+        if len(a) != len(b):
+            return False
+        result = True
+        for x, y in zip(a, b):
+            e = equals(x, y)
+            if e is False:
+                return False
+            if e is None:
+                result = None
+        return result
+    if category in ("boolean", "number", "string"):
+        return a == b
+    return a is b
+
+def _compare(a, b):
+    """Returns -1, 0 or 1, or None if the operands are null or not comparable."""
+    if a is None or b is None:
+        return None
+    category = _category(a)
+    if category != _category(b) or category not in ("boolean", "number", "string"):
+        return None
+    if isinstance(a, float) and math.isnan(a) or isinstance(b, float) and math.isnan(b):
+        return None
+    return (a > b) - (a < b)
+
+def to_string(v) -> str:
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    return str(v)
+
+def plus(a, b):
+    """Cypher `+`: concatenation of strings and lists, addition of numbers."""
+    if a is None or b is None:
+        return None
+    if isinstance(a, list) or isinstance(b, list):
+        return (a if isinstance(a, list) else [a]) + (b if isinstance(b, list) else [b])
+    if isinstance(a, str) or isinstance(b, str):
+        if isinstance(a, (str, int, float)) and isinstance(b, (str, int, float)):
+            return to_string(a) + to_string(b)
+    elif _category(a) == _category(b) == "number":
+        return a + b
+    raise RunTimeError(f"Type mismatch: cannot add {_category(a)} and {_category(b)}.")
+
+def _and(a, b):
+    if a is False or b is False:
+        return False
+    if a is None or b is None:
+        return None
+    return True
+
+def _or(a, b):
+    if a is True or b is True:
+        return True
+    if a is None or b is None:
+        return None
+    return False
+
+def _truth(v, operator):
+    if v is not None and not isinstance(v, bool):
+        raise RunTimeError(f"Type mismatch: expected a boolean operand of {operator}, got {_category(v)}.")
+    return v
+
+def _property(element, key):
+    if element is None:
+        return None
+    properties = getattr(element, 'properties', None)
+    if properties is not None:
+        return properties.get(key)
+    if isinstance(element, dict):
+        return element.get(key)
+    raise RunTimeError(f"Type mismatch: cannot access property {key} of {_category(element)}.")
+
+def _subscript(container, index):
+    if container is None or index is None:
+        return None
+    if isinstance(container, dict):
+        return container.get(index)
+    if isinstance(container, (list, str)) and _category(index) == "number":
+        try:
+            return container[int(index)]
+        except IndexError:
+            return None
+    return _property(container, index)
+
+def _null_safe(f):
+    return lambda v: None if v is None else f(v)
+
+# functions of strings, as used to normalize the values compared by the lhs of rules, and `coalesce` (see `_Parser.function`)
+_FUNCTIONS = {
+    'tostring': _null_safe(to_string),
+    'tolower': _null_safe(lambda s: s.lower()),
+    'toupper': _null_safe(lambda s: s.upper()),
+    'trim': _null_safe(lambda s: s.strip()),
+}
+
+# expressions
+
+class Expression(object):
+    """
+    Compiled expression.
+
+    Attributes
+    ----------
+    evaluate : callable
+        Function of a binding (dict from variables to values) returning the value of the expression.
+    variables : frozenset[str]
+        Variables the expression depends on.
+    operator : str
+        Top-level operator, e.g., "AND" or "=", if any.
+    operands : list[Expression]
+        Operands of the top-level operator.
+    """
+
+    __slots__ = ("evaluate", "variables", "operator", "operands")
+
+    def __init__(self, evaluate, variables = frozenset(), operator = None, operands = ()):
+        self.evaluate = evaluate
+        self.variables = frozenset(variables)
+        self.operator = operator
+        self.operands = list(operands)
+
+    def conjuncts(self) -> list:
+        if self.operator == "AND":
+            return [c for operand in self.operands for c in operand.conjuncts()]
+        return [self]
+
+    def holds(self, row) -> bool:
+        return self.evaluate(row) is True
+
+def _constant(value):
+    return Expression(lambda row: value)
+
+def _binary(operator, left, right, f):
+    l, r = left.evaluate, right.evaluate
+    return Expression(lambda row: f(l(row), r(row)), left.variables | right.variables, operator, (left, right))
+
+_COMPARISONS = {
+    "=": lambda a, b: equals(a, b),
+    "<>": lambda a, b: None if equals(a, b) is None else not equals(a, b),
+    "<": lambda a, b: None if _compare(a, b) is None else _compare(a, b) < 0,
+    "<=": lambda a, b: None if _compare(a, b) is None else _compare(a, b) <= 0,
+    ">": lambda a, b: None if _compare(a, b) is None else _compare(a, b) > 0,
+    ">=": lambda a, b: None if _compare(a, b) is None else _compare(a, b) >= 0,
+}
+
+def _in(x, values):
+    if values is None:
+        return None
+    result = False
+    for v in values:
+        e = equals(x, v)
+        if e is True:
+            return True
+        if e is None:
+            result = None
+    return None if x is None and values else result
+
+def _string_predicate(f):
+    return lambda a, b: f(a, b) if isinstance(a, str) and isinstance(b, str) else None
+
+def hashable(v):
+    """Returns a key of the value such that equal values (in the sense of Cypher) have equal keys."""
+    if isinstance(v, bool):
+        return ("boolean", v)
+    if isinstance(v, list):
+        return tuple(map(hashable, v))
+    return v
+
+# patterns
+
+class NodePattern(object):
+    """Pattern `(variable:Label {key: expression})`; anonymous nodes are given an internal variable."""
+
+    __slots__ = ("variable", "labels", "properties")
+
+    def __init__(self, variable, labels, properties):
+        self.variable = variable
+        self.labels = labels
+        self.properties = properties
+
+    def accepts(self, node, row) -> bool:
+        labels = node.labels
+        for label in self.labels:
+            if label not in labels:
+                return False
+        for key, expression in self.properties:
+            if equals(node.properties.get(key), expression.evaluate(row)) is not True:
+                return False
+        return True
+
+class RelationshipPattern(object):
+    """Pattern `-[variable:TYPE {key: expression}]->`, with `direction` "out", "in" or "both" with respect to the order of the path."""
+
+    __slots__ = ("variable", "types", "properties", "direction", "hops")
+
+    def __init__(self, variable, types, properties, direction, hops = None):
+        self.variable = variable
+        self.types = types
+        self.properties = properties
+        self.direction = direction
+        # bounds of variable-length patterns, None for a single relationship
+        self.hops = hops
+
+    def accepts(self, relationship, row) -> bool:
+        if self.types and relationship.type not in self.types:
+            return False
+        for key, expression in self.properties:
+            if equals(relationship.properties.get(key), expression.evaluate(row)) is not True:
+                return False
+        return True
+
+    def steps(self, node, forward):
+        """Yields the relationships of the node matching the direction, with their other endpoint."""
+        outgoing = self.direction == "both" or (self.direction == "out") == forward
+        incoming = self.direction == "both" or (self.direction == "in") == forward
+        if outgoing:
+            for relationship in node.out.values():
+                yield relationship, relationship.tgt
+        if incoming:
+            for relationship in node.inc.values():
+                # self-loops are matched once by undirected patterns
+                if not (outgoing and relationship.src is relationship.tgt):
+                    yield relationship, relationship.src
+
+class Path(object):
+    """Path pattern, i.e., nodes linked by relationships."""
+
+    def __init__(self, nodes, relationships):
+        self.nodes = nodes
+        self.relationships = relationships
+        self.variables = frozenset([n.variable for n in nodes] + [r.variable for r in relationships])
+
+    def _start(self, store, row) -> int:
+        """Chooses the node from which the path is expanded: a bound node, or the most selective one."""
+        best, best_cost = 0, None
+        for i, node in enumerate(self.nodes):
+            if node.variable in row:
+                return i
+            if node.labels:
+                cost = min([store.label_size(label) for label in node.labels])
+                if node.properties:
+                    cost = min(cost, 1)
+            else:
+                cost = store.node_count() + (0 if node.properties else 1)
+            if best_cost is None or cost < best_cost:
+                best, best_cost = i, cost
+        return best
+
+    def _candidates(self, store, pattern, row):
+        if pattern.variable in row:
+            node = row[pattern.variable]
+            return [node] if node is not None and pattern.accepts(node, row) else []
+        if pattern.labels and pattern.properties:
+            key, expression = pattern.properties[0]
+            value = expression.evaluate(row)
+            if value is None:
+                return []
+            label = min(pattern.labels, key=store.label_size)
+            return [n for n in store.nodes_with_property(label, key, value) if pattern.accepts(n, row)]
+        return [n for n in store.nodes_with_labels(pattern.labels) if pattern.accepts(n, row)]
+
+    def expand(self, store, row):
+        """Yields the extensions of the binding matching the path."""
+        start = self._start(store, row)
+        steps = [(self.relationships[i], i, i + 1, True) for i in range(start, len(self.relationships))]
+        steps += [(self.relationships[i], i + 1, i, False) for i in range(start - 1, -1, -1)]
+        pattern = self.nodes[start]
+        for node in self._candidates(store, pattern, row):
+            if pattern.variable in row:
+                yield from self._follow(steps, 0, row)
+            else:
+                bound = dict(row)
+                bound[pattern.variable] = node
+                yield from self._follow(steps, 0, bound)
+
+    def _follow(self, steps, i, row):
+        if i == len(steps):
+            yield row
+            return
+        relationship, origin, destination, forward = steps[i]
+        source = row[self.nodes[origin].variable]
+        target = self.nodes[destination]
+        for relationships, node in self._traverse(relationship, source, forward, row):
+            if relationship.variable in row and not self._same(row[relationship.variable], relationships):
+                continue
+            if target.variable in row:
+                if row[target.variable] is not node:
+                    continue
+            elif not target.accepts(node, row):
+                continue
+            bound = dict(row)
+            bound[relationship.variable] = relationships
+            bound[target.variable] = node
+            yield from self._follow(steps, i + 1, bound)
+
+    @staticmethod
+    def _same(bound, relationships):
+        if isinstance(bound, list):
+            return isinstance(relationships, list) and len(bound) == len(relationships) and all(a is b for a, b in zip(bound, relationships))
+        return bound is relationships
+
+    @staticmethod
+    def _traverse(pattern, node, forward, row):
+        """Yields the relationships (or lists of relationships for variable-length patterns) matching the pattern from the node, with their endpoint."""
+        if pattern.hops is None:
+            for relationship, other in pattern.steps(node, forward):
+                if pattern.accepts(relationship, row):
+                    yield relationship, other
+            return
+        low, high = pattern.hops
+        # depth-first traversal, relationships being unique along a path
+        stack = [(node, [])]
+        while stack:
+            current, path = stack.pop()
+            if len(path) >= low:
+                yield path, current
+            if high is not None and len(path) >= high:
+                continue
+            for relationship, other in pattern.steps(current, forward):
+                if pattern.accepts(relationship, row) and all(relationship is not r for r in path):
+                    stack.append((other, path + [relationship]))
+
+class MatchClause(object):
+    """`MATCH` clause, i.e., comma-separated paths and an optional `WHERE` condition."""
+
+    def __init__(self, paths, where):
+        self.paths = paths
+        self.conjuncts = where.conjuncts() if where is not None else []
+        self.variables = frozenset().union(*[p.variables for p in paths])
+        self.relationship_variables = [r.variable for p in paths for r in p.relationships]
+
+    def match(self, store, rows, bound):
+        conjuncts = list(self.conjuncts)
+        bound = set(bound)
+        def take(condition):
+            selected = [c for c in conjuncts if condition(c)]
+            for c in selected:
+                conjuncts.remove(c)
+            return selected
+        for path in self.paths:
+            if not rows:
+                return rows
+            if bound & path.variables:
+                rows = [extended for row in rows for extended in path.expand(store, row)]
+            else:
+                # the path is matched once, then joined with the previous bindings
+                local = take(lambda c: c.variables <= path.variables)
+                right = [r for r in path.expand(store, {}) if all(c.holds(r) for c in local)]
+                keys = take(lambda c: c.operator == "=" and self._join_sides(c, bound, path.variables) is not None)
+                rows = self._join(rows, right, [self._join_sides(c, bound, path.variables) for c in keys])
+            bound |= path.variables
+            filters = take(lambda c: c.variables <= bound)
+            if filters:
+                rows = [r for r in rows if all(c.holds(r) for c in filters)]
+        if len(self.relationship_variables) > 1:
+            # relationships matched by a clause are all distinct
+            rows = [r for r in rows if self._distinct_relationships(r)]
+        return rows
+
+    @staticmethod
+    def _join_sides(condition, left, right):
+        """Returns the operands of an equality evaluated on the previous bindings and on the path respectively, if any."""
+        a, b = condition.operands
+        if a.variables and b.variables:
+            if a.variables <= left and b.variables <= right:
+                return a, b
+            if b.variables <= left and a.variables <= right:
+                return b, a
+        return None
+
+    @staticmethod
+    def _join(rows, right, keys):
+        if rows == [{}]:
+            return right
+        if not keys:
+            return [{**l, **r} for l in rows for r in right]
+        # hash join, null keys never being equal
+        table = {}
+        for r in right:
+            key = tuple([hashable(b.evaluate(r)) for _, b in keys])
+            if None not in key:
+                table.setdefault(key, []).append(r)
+        joined = []
+        for l in rows:
+            key = tuple([hashable(a.evaluate(l)) for a, _ in keys])
+            if None in key:
+                continue
+            for r in table.get(key, ()):
+                joined.append({**l, **r})
+        return joined
+
+    def _distinct_relationships(self, row) -> bool:
+        seen = set()
+        count = 0
+        for variable in self.relationship_variables:
+            value = row[variable]
+            for relationship in (value if isinstance(value, list) else [value]):
+                seen.add(id(relationship))
+                count += 1
+        return len(seen) == count
+
+class Query(object):
+    """Sequence of `MATCH` clauses."""
+
+    def __init__(self, clauses):
+        self.clauses = clauses
+        self.variables = frozenset().union(*[c.variables for c in clauses])
+
+    def match(self, store) -> list[dict]:
+        """Returns the bindings of the query on the store, as dicts from variables to nodes, relationships or lists of relationships."""
+        rows = [{}]
+        bound = frozenset()
+        for clause in self.clauses:
+            rows = clause.match(store, rows, bound)
+            bound |= clause.variables
+        return rows
+
+class WriteClause(object):
+    """`CREATE` or `MERGE` clause."""
+
+    def __init__(self, kind, paths):
+        self.kind = kind
+        self.paths = paths
+
+    def execute(self, store, row, counters):
+        for path in self.paths:
+            if self.kind == "CREATE":
+                self._create(store, path, row, counters)
+            else:
+                self._merge(store, path, row, counters)
+
+    @staticmethod
+    def _properties(pattern, row) -> dict:
+        return {key: expression.evaluate(row) for key, expression in pattern.properties}
+
+    def _create(self, store, path, row, counters):
+        for pattern in path.nodes:
+            if pattern.variable not in row:
+                properties = {k: v for k, v in self._properties(pattern, row).items() if v is not None}
+                row[pattern.variable] = store.create_node(pattern.labels, properties, counters)
+        for i, pattern in enumerate(path.relationships):
+            src, tgt = row[path.nodes[i].variable], row[path.nodes[i + 1].variable]
+            if pattern.direction == "in":
+                src, tgt = tgt, src
+            properties = {k: v for k, v in self._properties(pattern, row).items() if v is not None}
+            row[pattern.variable] = store.create_relationship(pattern.types[0], src, tgt, properties, counters)
+
+    def _merge(self, store, path, row, counters):
+        if len(path.nodes) == 1:
+            pattern = path.nodes[0]
+            properties = self._properties(pattern, row)
+            for key, value in properties.items():
+                if value is None:
+                    raise RunTimeError(f"Cannot merge the node (:{':'.join(pattern.labels)}) because of the null value of property {key}.")
+            for node in path._candidates(store, pattern, row):
+                row[pattern.variable] = node
+                return
+            row[pattern.variable] = store.create_node(pattern.labels, properties, counters)
+            return
+        for pattern in path.nodes:
+            if pattern.variable not in row:
+                raise RunTimeError("Only relationships between bound nodes can be merged in memory.")
+        for i, pattern in enumerate(path.relationships):
+            bound = dict(row)
+            bound.pop(pattern.variable, None)
+            matches = Path(path.nodes[i:i + 2], [pattern]).expand(store, bound)
+            match = next(iter(matches), None)
+            if match is not None:
+                row[pattern.variable] = match[pattern.variable]
+                continue
+            src, tgt = row[path.nodes[i].variable], row[path.nodes[i + 1].variable]
+            if pattern.direction == "in":
+                src, tgt = tgt, src
+            row[pattern.variable] = store.create_relationship(pattern.types[0], src, tgt, self._properties(pattern, row), counters)
+
+class Script(object):
+    """Sequence of `CREATE` and `MERGE` clauses."""
+
+    def __init__(self, clauses, variables):
+        self.clauses = clauses
+        # variables the script expects to be bound, e.g., `row`
+        self.variables = frozenset(variables)
+
+    def execute(self, store, row, counters) -> dict:
+        """Executes the clauses on the binding, and returns the binding extended with the created or merged elements."""
+        row = dict(row)
+        for clause in self.clauses:
+            clause.execute(store, row, counters)
+        return row
+
+# parser
+
+class _Parser(object):
+
+    def __init__(self, text, variables = ()):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.i = 0
+        self.anonymous = 0
+        # variables in scope, i.e., bound by the previous clauses
+        self.scope = set(variables)
+
+    @property
+    def token(self):
+        return self.tokens[self.i]
+
+    def error(self, message):
+        return ParseError(f"{message} (at char {self.token.pos}).")
+
+    def advance(self):
+        token = self.token
+        self.i += 1
+        return token
+
+    def at(self, *symbols, offset = 0):
+        token = self.tokens[min(self.i + offset, len(self.tokens) - 1)]
+        return token.kind == "symbol" and token.value in symbols
+
+    def accept(self, symbol):
+        if self.at(symbol):
+            return self.advance()
+        return None
+
+    def expect(self, symbol):
+        if not self.at(symbol):
+            raise self.error(f"Expected '{symbol}', found {self.token.value!r}")
+        return self.advance()
+
+    def at_keyword(self, *keywords, offset = 0):
+        token = self.tokens[min(self.i + offset, len(self.tokens) - 1)]
+        return token.keyword() in keywords
+
+    def accept_keyword(self, keyword):
+        if self.at_keyword(keyword):
+            return self.advance()
+        return None
+
+    def expect_keyword(self, keyword):
+        if not self.at_keyword(keyword):
+            raise self.error(f"Expected {keyword}, found {self.token.value!r}")
+        return self.advance()
+
+    def name(self, what = "name"):
+        if self.token.kind != "name":
+            raise self.error(f"Expected a {what}, found {self.token.value!r}")
+        return self.advance().value
+
+    def internal_variable(self):
+        # internal variables contain a space, hence never clash with the variables of the query
+        self.anonymous += 1
+        return f" {self.anonymous}"
+
+    def at_end(self):
+        while self.accept(";"):
+            pass
+        return self.token.kind == "end"
+
+    # clauses
+
+    def query(self) -> Query:
+        clauses = []
+        while not self.at_end():
+            if self.at_keyword("OPTIONAL"):
+                raise self.error("OPTIONAL MATCH is not supported in memory")
+            if not self.at_keyword("MATCH"):
+                raise self.error(f"Only MATCH clauses are supported in memory, found {self.token.value!r}")
+            self.advance()
+            paths = self.paths()
+            variables = frozenset().union(*[p.variables for p in paths])
+            where = None
+            if self.accept_keyword("WHERE"):
+                where = self.expression()
+                undefined = where.variables - self.scope - variables
+                if undefined:
+                    raise ParseError(f"Variable(s) {', '.join(sorted(undefined))} not defined.")
+            clauses.append(MatchClause(paths, where))
+            self.scope |= variables
+        if not clauses:
+            raise self.error("Expected a MATCH clause")
+        return Query(clauses)
+
+    def script(self) -> Script:
+        clauses = []
+        variables = set(self.scope)
+        while not self.at_end():
+            keyword = self.token.keyword()
+            if keyword in _READ_CLAUSES and clauses:
+                # the trailing read-only part of a script returns records, which are not used by the loaders
+                rest = self.text[self.token.pos:]
+                if _WRITE_KEYWORDS.search(re.sub(r"""("[^"]*"|'[^']*')""", '""', rest)):
+                    raise self.error("Only CREATE and MERGE clauses can write in memory")
+                break
+            if keyword not in ("CREATE", "MERGE"):
+                raise self.error(f"Only CREATE and MERGE clauses are supported in memory, found {self.token.value!r}")
+            self.advance()
+            paths = self.paths()
+            if keyword == "MERGE" and len(paths) > 1:
+                raise self.error("MERGE expects a single path")
+            for path in paths:
+                for r in path.relationships:
+                    if len(r.types) != 1 or r.hops is not None or (r.direction == "both" and keyword == "CREATE"):
+                        raise ParseError("Written relationships should have a single type, a single hop and a direction.")
+            clauses.append(WriteClause(keyword, paths))
+            for path in paths:
+                self.scope |= path.variables
+        if not clauses:
+            raise self.error("Expected a CREATE or MERGE clause")
+        return Script(clauses, variables)
+
+    # patterns
+
+    def paths(self) -> list[Path]:
+        paths = [self.path()]
+        while self.accept(","):
+            paths.append(self.path())
+        return paths
+
+    def path(self) -> Path:
+        if self.token.kind == "name" and self.at("=", offset=1):
+            raise self.error("Named paths are not supported in memory")
+        nodes = [self.node()]
+        relationships = []
+        while self.at("-", "<"):
+            relationships.append(self.relationship())
+            nodes.append(self.node())
+        return Path(nodes, relationships)
+
+    def node(self) -> NodePattern:
+        self.expect("(")
+        variable = self.name("variable") if self.token.kind == "name" else self.internal_variable()
+        labels = []
+        while self.accept(":"):
+            labels.append(self.name("label"))
+            if self.at("|", "&"):
+                raise self.error("Label expressions are not supported in memory")
+        properties = self.properties()
+        self.expect(")")
+        return NodePattern(variable, labels, properties)
+
+    def relationship(self) -> RelationshipPattern:
+        incoming = self.accept("<") is not None
+        self.expect("-")
+        variable, types, properties, hops = None, [], [], None
+        if self.accept("["):
+            if self.token.kind == "name":
+                variable = self.name()
+            if self.accept(":"):
+                types.append(self.name("type"))
+                while self.accept("|"):
+                    self.accept(":")
+                    types.append(self.name("type"))
+            if self.accept("*"):
+                hops = self.hops()
+            properties = self.properties()
+            self.expect("]")
+        self.expect("-")
+        outgoing = self.accept(">") is not None
+        if incoming and outgoing:
+            raise self.error("A relationship has a single direction")
+        direction = "out" if outgoing else "in" if incoming else "both"
+        return RelationshipPattern(variable or self.internal_variable(), types, properties, direction, hops)
+
+    def hops(self):
+        low = high = None
+        if self.token.kind == "number":
+            low = int(self.advance().value)
+            high = low
+        if self.accept(".."):
+            high = int(self.advance().value) if self.token.kind == "number" else None
+        return (1 if low is None else low, high)
+
+    def properties(self) -> list:
+        if not self.accept("{"):
+            return []
+        properties = []
+        if not self.at("}"):
+            while True:
+                key = self.name("property")
+                self.expect(":")
+                expression = self.expression()
+                undefined = expression.variables - self.scope
+                if undefined:
+                    raise ParseError(f"Variable(s) {', '.join(sorted(undefined))} not defined in the properties of a pattern.")
+                properties.append((key, expression))
+                if not self.accept(","):
+                    break
+        self.expect("}")
+        return properties
+
+    # expressions, by increasing precedence
+
+    def expression(self) -> Expression:
+        left = self.conjunction()
+        while self.accept_keyword("OR"):
+            right = self.conjunction()
+            l, r = left.evaluate, right.evaluate
+            left = Expression(lambda row, l=l, r=r: _or(_truth(l(row), "OR"), _truth(r(row), "OR")), left.variables | right.variables, "OR", (left, right))
+        return left
+
+    def conjunction(self) -> Expression:
+        left = self.negation()
+        while self.accept_keyword("AND"):
+            right = self.negation()
+            l, r = left.evaluate, right.evaluate
+            left = Expression(lambda row, l=l, r=r: _and(_truth(l(row), "AND"), _truth(r(row), "AND")), left.variables | right.variables, "AND", (left, right))
+        return left
+
+    def negation(self) -> Expression:
+        if self.accept_keyword("NOT"):
+            operand = self.negation()
+            f = operand.evaluate
+            return Expression(lambda row: None if f(row) is None else not _truth(f(row), "NOT"), operand.variables, "NOT", (operand,))
+        return self.comparison()
+
+    def comparison(self) -> Expression:
+        left = self.additive()
+        while True:
+            if self.token.kind == "symbol" and self.token.value in _COMPARISONS:
+                operator = self.advance().value
+                left = _binary(operator, left, self.additive(), _COMPARISONS[operator])
+            elif self.at_keyword("IS"):
+                self.advance()
+                negated = self.accept_keyword("NOT") is not None
+                self.expect_keyword("NULL")
+                f = left.evaluate
+                left = Expression((lambda row: f(row) is not None) if negated else (lambda row: f(row) is None), left.variables)
+            elif self.accept_keyword("IN"):
+                left = _binary("IN", left, self.additive(), _in)
+            elif self.at_keyword("STARTS", "ENDS"):
+                keyword = self.advance().keyword()
+                self.expect_keyword("WITH")
+                predicate = str.startswith if keyword == "STARTS" else str.endswith
+                left = _binary(keyword, left, self.additive(), _string_predicate(predicate))
+            elif self.accept_keyword("CONTAINS"):
+                left = _binary("CONTAINS", left, self.additive(), _string_predicate(lambda a, b: b in a))
+            else:
+                return left
+
+    def additive(self) -> Expression:
+        """Concatenations (or additions) of values, the only arithmetic of the lhs of rules, as of their constructors."""
+        left = self.postfix()
+        while self.accept("+"):
+            left = _binary("+", left, self.postfix(), plus)
+        return left
+
+    def postfix(self) -> Expression:
+        expression = self.atom()
+        while True:
+            f = expression.evaluate
+            if self.accept("."):
+                key = self.name("property")
+                expression = Expression(lambda row, f=f, key=key: _property(f(row), key), expression.variables)
+            elif self.accept("["):
+                index = self.expression()
+                self.expect("]")
+                g = index.evaluate
+                expression = Expression(lambda row, f=f, g=g: _subscript(f(row), g(row)), expression.variables | index.variables)
+            elif self.at(":") and expression.operator == "variable":
+                # label predicate, e.g., `n:Person:Actor`
+                labels = []
+                while self.accept(":"):
+                    labels.append(self.name("label"))
+                expression = Expression(lambda row, f=f, labels=labels: None if f(row) is None else all(l in f(row).labels for l in labels), expression.variables)
+            else:
+                return expression
+
+    def atom(self) -> Expression:
+        token = self.token
+        if token.kind == "string":
+            self.advance()
+            return _constant(_unescape(token.value))
+        if token.kind == "number":
+            self.advance()
+            return _constant(float(token.value) if "." in token.value or "e" in token.value.lower() else int(token.value))
+        if token.kind == "parameter":
+            raise self.error("Parameters are not supported in memory")
+        if self.accept("("):
+            expression = self.expression()
+            self.expect(")")
+            return expression
+        if self.accept("["):
+            items = []
+            if not self.at("]"):
+                items.append(self.expression())
+                while self.accept(","):
+                    items.append(self.expression())
+            self.expect("]")
+            fs = [item.evaluate for item in items]
+            return Expression(lambda row: [f(row) for f in fs], frozenset().union(*[item.variables for item in items]))
+        if token.kind == "name":
+            keyword = token.keyword()
+            if keyword in ("TRUE", "FALSE"):
+                self.advance()
+                return _constant(keyword == "TRUE")
+            if keyword == "NULL":
+                self.advance()
+                return _constant(None)
+            name = self.advance().value
+            if self.accept("("):
+                return self.function(name)
+            return Expression(lambda row: row[name], {name}, "variable")
+        raise self.error(f"Unexpected {token.value!r}")
+
+    def function(self, name) -> Expression:
+        arguments = []
+        if not self.at(")"):
+            arguments.append(self.expression())
+            while self.accept(","):
+                arguments.append(self.expression())
+        self.expect(")")
+        fs = [a.evaluate for a in arguments]
+        variables = frozenset().union(*[a.variables for a in arguments])
+        if name.lower() == "coalesce":
+            def coalesce(row):
+                for f in fs:
+                    v = f(row)
+                    if v is not None:
+                        return v
+                return None
+            return Expression(coalesce, variables)
+        function = _FUNCTIONS.get(name.lower())
+        if function is None:
+            raise ParseError(f"Function {name} is not supported in memory.")
+        if len(fs) != 1:
+            raise ParseError(f"Function {name} expects a single argument.")
+        f = fs[0]
+        return Expression(lambda row: function(f(row)), variables)
+
+@functools.lru_cache(maxsize=256)
+def parse_query(text) -> Query:
+    """Parses a sequence of `MATCH` clauses, e.g., the lhs of a rule. Raises a ParseError if the query is not supported."""
+    return _Parser(text).query()
+
+@functools.lru_cache(maxsize=256)
+def parse_script(text, variables = ()) -> Script:
+    """
+    Parses a sequence of `CREATE` and `MERGE` clauses. Raises a ParseError if the script is not supported.
+
+    Parameters
+    ----------
+    variables : tuple[str]
+        Variables bound before the script is executed, e.g., ("row",) for the commands loading CSV files.
+    """
+    return _Parser(text, variables).script()
@@ -0,0 +1,200 @@
+"""Evaluation of the constructors of rules in memory.
+
+This module contains the `RuleEvaluator` class, which applies the constructors of a rule processed by the DSL
+on each binding of its lhs, with the semantics of the scripts produced by `dtgraph.compiler.Compiler`:
+output elements are merged on their Skolem tuple, stored in their `_id` property,
+and properties on which bindings disagree are set to "Conflict Detected!".
+"""
+import functools
+
+from dtgraph.compiler import _EXPRESSION_TOKEN
+from dtgraph.conflict import CONFLICT_VALUE
+from dtgraph.exceptions import CompileError, RunTimeError
+from dtgraph.backend.memory.cypher import equals, plus
+
+def _resolve(variable, row, aliases):
+    if variable in aliases:
+        return aliases[variable]
+    if variable in row:
+        return row[variable]
+    raise RunTimeError(f"Variable `{variable}` not defined.")
+
+def _element_id(variable):
+    def evaluate(row, aliases):
+        element = _resolve(variable, row, aliases)
+        if element is None:
+            return None
+        if not hasattr(element, 'id'):
+            raise RunTimeError(f"Variable `{variable}` is not bound to a node or a relationship.")
+        return str(element.id)
+    return evaluate
+
+def _access(token):
+    variable, key = token.split('.', 1)
+    def evaluate(row, aliases):
+        element = _resolve(variable, row, aliases)
+        if element is None:
+            return None
+        properties = getattr(element, 'properties', None)
+        if properties is None:
+            raise RunTimeError(f"Variable `{variable}` is not bound to a node or a relationship.")
+        return properties.get(key)
+    return evaluate
+
+def _constant(value):
+    return lambda row, aliases: value
+
+def _id_term(token):
+    """Mirrors `Compiler._wrap_id`: variables stand for the identifier of their element, and labels are enclosed by colons."""
+    if token[0].islower() and '.' not in token:
+        return _element_id(token)
+    elif token[0].isupper():
+        return _constant(":" + token + ":")
+    elif token[0] == '"':
+        return _constant(token[1:-1])
+    else:
+        return _access(token)
+
+def _value_term(token):
+    if token[0] == '"':
+        return _constant(token[1:-1])
+    if '.' in token and token[0].islower():
+        return _access(token)
+    raise CompileError(f"Unexpected term {token} in a property of a constructor.")
+
+def _skolem(ids):
+    """Returns the function computing the Skolem tuple `"(" + id + "," + ... + ")"`, null if one of the ids is null."""
+    terms = [_id_term(i) for i in ids]
+    def evaluate(row, aliases):
+        parts = ["("]
+        for i, term in enumerate(terms):
+            if i:
+                parts.append(",")
+            parts.append(term(row, aliases))
+        parts.append(")")
+        return functools.reduce(plus, parts)
+    return evaluate
+
+def _expression(value):
+    terms = [_value_term(t) for t in _EXPRESSION_TOKEN.findall(value)]
+    if len(terms) == 1:
+        return terms[0]
+    return lambda row, aliases: functools.reduce(plus, [term(row, aliases) for term in terms])
+
+class RuleEvaluator(object):
+    """
+    Constructors of a rule, applied on the bindings of its lhs.
+
+    Raises a CompileError if the constructors are not valid, as the compiler would.
+
+    Methods
+    -------
+    apply(graph, row, counters)
+        Merges the output elements of a binding into the graph.
+    """
+
+    def __init__(self, dict, with_diagnose = True):
+        """
+        Parameters
+        ----------
+        dict : dict
+            Rule processed by the DSL, see `Rule._dict`.
+        with_diagnose : bool
+            Whether conflicting elements are marked, with the `_hasConflict` label for nodes and property for relationships.
+        """
+        self.with_diagnose = with_diagnose
+        # output nodes, in order of definition, and output relationships
+        self.nodes = []
+        self.relationships = []
+        defined, missing = [], []
+        def node(constructor):
+            alias, ids = constructor.get('alias'), constructor.get('ids')
+            if alias and ids is None:
+                if alias not in defined and alias not in missing:
+                    missing.append(alias)
+                return alias
+            if alias:
+                if alias in defined:
+                    raise CompileError("Redefinition of the following alias: " + alias)
+                if alias in missing:
+                    missing.remove(alias)
+            else:
+                alias = f"x_{len(defined)}"
+            defined.append(alias)
+            self.nodes.append((alias, _skolem(ids), constructor.get('labels') or [], self._properties(constructor)))
+            return alias
+        edges = []
+        for constructor in dict.get('constructors'):
+            if constructor.get('src'):
+                edges.append((node(constructor['src']), constructor['edge'], node(constructor['tgt'])))
+            else:
+                node(constructor)
+        if missing:
+            raise CompileError("The following aliases are not defined: " + ",".join(missing))
+        for src, edge, tgt in edges:
+            if edge.get('alias'):
+                raise CompileError("Using alias in edge constructor is forbidden.")
+            labels = edge.get('labels')
+            if labels is None or len(labels) != 1:
+                raise CompileError("Relationships should be of only one type in openCypher.")
+            self.relationships.append((labels[0], _skolem([labels[0]] + edge.get('ids') + [src, tgt]), src, tgt, self._properties(edge)))
+
+    @staticmethod
+    def _properties(constructor):
+        return [(p['key'], _expression(p['value'])) for p in constructor.get('properties') or []]
+
+    def apply(self, graph, row, counters, merged = None):
+        """Merges the output elements of a binding of the lhs.
+
+        If given, `merged` is a pair of sets, to which the (constructor, identifier) pairs of the merged nodes and relationships are added,
+        as counted by the statistics of fused rules (see `dtgraph.compiler.Compiler.compile_many`).
+        """
+        aliases = {}
+        for alias, skolem, labels, properties in self.nodes:
+            key = skolem(row, aliases)
+            if key is None:
+                raise RunTimeError(f"Cannot merge the output node {alias}, as one of its ids is null.")
+            node = next(iter(graph.nodes_with_property("_dummy", "_id", key)), None)
+            if node is None:
+                node = graph.create_node(["_dummy"] + labels, {'_id': key}, counters)
+                created = True
+            else:
+                for label in labels:
+                    graph.add_label(node, label, counters)
+                created = False
+            aliases[alias] = node
+            if merged is not None:
+                merged[0].add((alias, node.id))
+            values = [(k, f(row, aliases)) for k, f in properties]
+            self._set(graph, node, values, created, counters)
+            if self._conflicting(node, values):
+                graph.add_label(node, "_hasConflict", counters)
+        for i, (type, skolem, src, tgt, properties) in enumerate(self.relationships):
+            key = skolem(row, aliases)
+            if key is None:
+                raise RunTimeError(f"Cannot merge an output relationship of type {type}, as one of its ids is null.")
+            start, end = aliases[src], aliases[tgt]
+            relationship = next(iter([r for r in graph.relationships_with_property(type, "_id", key) if r.src is start and r.tgt is end]), None)
+            created = relationship is None
+            if created:
+                relationship = graph.create_relationship(type, start, end, {'_id': key}, counters)
+            if merged is not None:
+                merged[1].add((i, relationship.id))
+            values = [(k, f(row, aliases)) for k, f in properties]
+            self._set(graph, relationship, values, created, counters)
+            if self._conflicting(relationship, values):
+                graph.set_property(relationship, "_hasConflict", True, counters)
+
+    @staticmethod
+    def _set(graph, element, values, created, counters):
+        """Sets the properties as `ON CREATE SET`, or with the conflict detection of `ON MATCH SET`."""
+        for key, value in values:
+            if created:
+                if value is not None:
+                    graph.set_property(element, key, value, counters)
+            else:
+                # `CASE WHEN x.key <> value THEN "Conflict Detected!" ELSE value END`, hence null values replace the current ones
+                graph.set_property(element, key, CONFLICT_VALUE if equals(element.properties.get(key), value) is False else value, counters)
+
+    def _conflicting(self, element, values) -> bool:
+        return self.with_diagnose and any(element.properties.get(key) == CONFLICT_VALUE for key, _ in values)
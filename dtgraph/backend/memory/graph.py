@@ -0,0 +1,597 @@
+"""In-memory property graph.
+
+This module contains the `InMemoryGraph` class, an in-process backend exposing the interface of `Neo4jGraph`
+used by transformations and scenarios, without a server.
+Rules are not compiled into openCypher: their parsed dictionaries are evaluated directly (see `Rule.apply_on`),
+their lhs by `dtgraph.backend.memory.cypher` and their constructors by `dtgraph.backend.memory.evaluator`,
+with the same output and conflicts as the compiled scripts.
+This makes it suitable for tests, for developing rules, and for small transformations.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+from dtgraph.backend.capabilities import MEMORY
+from dtgraph.backend.memory.cypher import parse_query, parse_script, hashable, to_string
+from dtgraph.backend.memory.evaluator import RuleEvaluator
+from dtgraph.conflict import Conflict, CONFLICT_VALUE, BOOKKEEPING_LABELS, to_jsonl, format_summary, summary_order
+from dtgraph.exceptions import RunTimeError
+from dtgraph.loader import CsvLoader, iter_csv_rows, resolve_csv_path, new_variable
+from dtgraph.metrics import COUNTERS, RunStats, print_sink
+from dtgraph.tracing import Tracer, traced, query_hash
+
+class Node(object):
+    """Node of an `InMemoryGraph`. Relationships are indexed by identifier, outgoing (`out`) and incoming (`inc`)."""
+
+    __slots__ = ("id", "labels", "properties", "out", "inc")
+
+    def __init__(self, id, labels, properties):
+        self.id = id
+        self.labels = set(labels)
+        self.properties = dict(properties)
+        self.out = {}
+        self.inc = {}
+
+    def items(self):
+        return self.properties.items()
+
+    def __repr__(self):
+        return f"Node({self.id}, {sorted(self.labels)}, {self.properties})"
+
+class Relationship(object):
+    """Relationship of an `InMemoryGraph`, from `src` to `tgt`."""
+
+    __slots__ = ("id", "type", "src", "tgt", "properties")
+
+    def __init__(self, id, type, src, tgt, properties):
+        self.id = id
+        self.type = type
+        self.src = src
+        self.tgt = tgt
+        self.properties = dict(properties)
+
+    def items(self):
+        return self.properties.items()
+
+    def __repr__(self):
+        return f"Relationship({self.id}, {self.type}, {self.src.id}->{self.tgt.id}, {self.properties})"
+
+class Summary(object):
+    """Summary of an operation, with the attributes of `neo4j.ResultSummary` read by metrics, rules and tracers."""
+
+    plan = None
+    profile = None
+    parameters = None
+
+    def __init__(self, query, counters, available_after, consumed_after = 0):
+        self.query = query
+        self.counters = SimpleNamespace(**{c: counters.get(c, 0) for c in COUNTERS})
+        self.result_available_after = available_after
+        self.result_consumed_after = consumed_after
+
+def _counters():
+    return dict.fromkeys(COUNTERS, 0)
+
+def _elapsed(start) -> int:
+    return int((time.perf_counter() - start) * 1000)
+
+class InMemoryGraph(object):
+    """Property graph stored in the memory of the process.
+
+    Nodes are indexed by label, and by label and property once a lookup on this property has been made,
+    e.g., by a pattern `(n:Label {key: value})` or by the merge of an output node on its identifier.
+    Output relationships are similarly indexed by type and identifier.
+    Operations are serialized by a lock, hence the graph can be shared by threads, e.g., by parallel loaders or rules.
+    """
+
+    database = "memory"
+    # rules are evaluated by the graph, see `exec_rule`, rather than compiled into openCypher
+    capabilities = MEMORY
+
+    def __init__(self, import_dir=None, verbose=False, sinks=None, tracer=None):
+        """
+        Parameters
+        ----------
+        import_dir : str
+            Local directory standing for the import directory of a server, from which the URLs of `populate_with_csv` are resolved,
+            e.g., "output-ibench-data". See `dtgraph.loader.resolve_csv_path`.
+        sinks : list[callable]
+            Functions called with the `dtgraph.metrics.QueryStats` of each operation, see `Neo4jGraph`.
+        tracer : dtgraph.tracing.Tracer
+            Tracer opening a span around each operation, see `Neo4jGraph`.
+        """
+        self.import_dir = import_dir
+        self.verbose = verbose
+        self.metrics = RunStats(sinks=[print_sink] if sinks is None else sinks)
+        self.tracer = tracer if tracer is not None else Tracer()
+        self._lock = threading.RLock()
+        self._next_id = 0
+        self._clear()
+
+    def _clear(self):
+        self._nodes = {}
+        self._relationships = {}
+        self._labels = {} # label -> id -> node
+        self._types = {} # type -> id -> relationship
+        self._node_indexes = {} # (label, key) -> value -> id -> node
+        self._relationship_indexes = {} # (type, key) -> value -> id -> relationship
+
+    def close(self):
+        pass
+
+    def _log(self, message, display=True):
+        """See `Neo4jGraph._log`."""
+        self.metrics.log(message, display=display)
+
+    def _record(self, phase, summary, message=None, display=False):
+        stats = self.metrics.record(phase, summary, message=message, display=display)
+        tracer = getattr(self, 'tracer', None)
+        if tracer is not None:
+            tracer.annotate(phase=phase, query_hash=query_hash(summary.query), time=stats.time, **stats.counters)
+        return stats
+
+    # storage, as used by the evaluation of queries and rules
+
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    def label_size(self, label) -> int:
+        return len(self._labels.get(label, ()))
+
+    def nodes(self, label=None) -> list[Node]:
+        """Returns the nodes with the given label, or all the nodes."""
+        with self._lock:
+            return list(self._nodes.values() if label is None else self._labels.get(label, {}).values())
+
+    def relationships(self, type=None) -> list[Relationship]:
+        """Returns the relationships of the given type, or all the relationships."""
+        with self._lock:
+            return list(self._relationships.values() if type is None else self._types.get(type, {}).values())
+
+    def nodes_with_labels(self, labels):
+        if not labels:
+            return self._nodes.values()
+        smallest = min(labels, key=self.label_size)
+        return [n for n in self._labels.get(smallest, {}).values() if all(l in n.labels for l in labels)]
+
+    def nodes_with_property(self, label, key, value):
+        index = self._node_indexes.get((label, key))
+        if index is None:
+            index = self._node_indexes[(label, key)] = {}
+            for node in self._labels.get(label, {}).values():
+                if key in node.properties:
+                    index.setdefault(hashable(node.properties[key]), {})[node.id] = node
+        return list(index.get(hashable(value), {}).values())
+
+    def relationships_with_property(self, type, key, value):
+        index = self._relationship_indexes.get((type, key))
+        if index is None:
+            index = self._relationship_indexes[(type, key)] = {}
+            for relationship in self._types.get(type, {}).values():
+                if key in relationship.properties:
+                    index.setdefault(hashable(relationship.properties[key]), {})[relationship.id] = relationship
+        return list(index.get(hashable(value), {}).values())
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def create_node(self, labels, properties, counters) -> Node:
+        node = Node(self._new_id(), [], {})
+        self._nodes[node.id] = node
+        counters['nodes_created'] += 1
+        for label in labels:
+            self.add_label(node, label, counters)
+        for key, value in properties.items():
+            self.set_property(node, key, value, counters)
+        return node
+
+    def create_relationship(self, type, src, tgt, properties, counters) -> Relationship:
+        relationship = Relationship(self._new_id(), type, src, tgt, {})
+        self._relationships[relationship.id] = relationship
+        self._types.setdefault(type, {})[relationship.id] = relationship
+        src.out[relationship.id] = relationship
+        tgt.inc[relationship.id] = relationship
+        counters['relationships_created'] += 1
+        for key, value in properties.items():
+            self.set_property(relationship, key, value, counters)
+        return relationship
+
+    def _indexes_of(self, element):
+        """Returns the indexes the element belongs to, by property."""
+        if isinstance(element, Node):
+            return [(key, index) for (label, key), index in self._node_indexes.items() if label in element.labels]
+        return [(key, index) for (type, key), index in self._relationship_indexes.items() if type == element.type]
+
+    def set_property(self, element, key, value, counters):
+        """Sets a property of a node or a relationship, null values removing the property."""
+        previous = element.properties.get(key)
+        if previous is None and value is None:
+            return
+        for k, index in self._indexes_of(element):
+            if k != key:
+                continue
+            if previous is not None:
+                index.get(hashable(previous), {}).pop(element.id, None)
+            if value is not None:
+                index.setdefault(hashable(value), {})[element.id] = element
+        if value is None:
+            del element.properties[key]
+        else:
+            element.properties[key] = value
+        counters['properties_set'] += 1
+
+    def add_label(self, node, label, counters):
+        if label in node.labels:
+            return
+        node.labels.add(label)
+        self._labels.setdefault(label, {})[node.id] = node
+        for (l, key), index in self._node_indexes.items():
+            if l == label and key in node.properties:
+                index.setdefault(hashable(node.properties[key]), {})[node.id] = node
+        counters['labels_added'] += 1
+
+    def remove_label(self, node, label, counters):
+        if label not in node.labels:
+            return
+        node.labels.discard(label)
+        self._labels[label].pop(node.id, None)
+        for (l, key), index in self._node_indexes.items():
+            if l == label and key in node.properties:
+                index.get(hashable(node.properties[key]), {}).pop(node.id, None)
+        counters['labels_removed'] += 1
+
+    def delete_relationship(self, relationship, counters):
+        for key, index in self._indexes_of(relationship):
+            if key in relationship.properties:
+                index.get(hashable(relationship.properties[key]), {}).pop(relationship.id, None)
+        del self._relationships[relationship.id]
+        self._types[relationship.type].pop(relationship.id, None)
+        relationship.src.out.pop(relationship.id, None)
+        relationship.tgt.inc.pop(relationship.id, None)
+        counters['relationships_deleted'] += 1
+
+    def detach_delete_node(self, node, counters):
+        for relationship in list(node.out.values()) + list(node.inc.values()):
+            if relationship.id in self._relationships:
+                self.delete_relationship(relationship, counters)
+        for key, index in self._indexes_of(node):
+            if key in node.properties:
+                index.get(hashable(node.properties[key]), {}).pop(node.id, None)
+        for label in node.labels:
+            self._labels[label].pop(node.id, None)
+        del self._nodes[node.id]
+        counters['nodes_deleted'] += 1
+
+    # interface of Neo4jGraph
+
+    @traced("query")
+    def flush_database(self, batch_size=None):
+        """Deletes all the nodes and relationships. Operations are not transactional, hence `batch_size` is ignored."""
+        start = time.perf_counter()
+        with self._lock:
+            counters = _counters()
+            counters['nodes_deleted'] = len(self._nodes)
+            counters['relationships_deleted'] = len(self._relationships)
+            self._clear()
+        summary = Summary("FLUSH", counters, _elapsed(start))
+        self._record("flush", summary, message=f"Flushed database: Deleted {counters['nodes_deleted']} nodes, deleted {counters['relationships_deleted']} relationships, completed after {summary.result_available_after} ms.", display=True)
+        if batch_size is not None:
+            return {'nodes': counters['nodes_deleted'], 'relationships': counters['relationships_deleted']}
+
+    @traced("query")
+    def abort(self, stats=False, batch_size=None):
+        """Deletes the output of the transformation."""
+        return self._delete("abort", "Abort", lambda n: "_dummy" in n.labels, stats, batch_size)
+
+    @traced("query")
+    def destruct_input(self, stats=False, batch_size=None):
+        """Deletes the input of the transformation."""
+        return self._delete("destruct", "Destruct", lambda n: "_dummy" not in n.labels, stats, batch_size)
+
+    def _delete(self, phase, title, selection, stats, batch_size):
+        start = time.perf_counter()
+        with self._lock:
+            counters = _counters()
+            for node in [n for n in self._nodes.values() if selection(n)]:
+                self.detach_delete_node(node, counters)
+        summary = Summary(phase.upper(), counters, _elapsed(start))
+        self._record(phase, summary, message=f"{title}: Deleted {counters['nodes_deleted']} nodes, deleted {counters['relationships_deleted']} relationships, completed after {summary.result_available_after} ms.", display=self.verbose or stats)
+        if batch_size is not None:
+            return {'nodes': counters['nodes_deleted'], 'relationships': counters['relationships_deleted']}
+
+    @traced("query")
+    def remove_bookkeeping(self, stats=False, batch_size=None):
+        """Removes the bookkeeping labels and properties of output elements. Operations are not transactional, hence `batch_size` is ignored."""
+        start = time.perf_counter()
+        with self._lock:
+            counters = _counters()
+            for node in self.nodes_with_labels(["_dummy"]):
+                # output relationships always start from output nodes
+                for relationship in list(node.out.values()):
+                    if relationship.properties.get('_id') is not None:
+                        for key in ('_id', '_hasConflict', '_key', '_hasCollision'):
+                            self.set_property(relationship, key, None, counters)
+                for label in ('_dummy', '_hasConflict', '_hasCollision'):
+                    self.remove_label(node, label, counters)
+                for key in ('_id', '_key'):
+                    self.set_property(node, key, None, counters)
+        summary = Summary("REMOVE BOOKKEEPING", counters, _elapsed(start))
+        self._record("eject", summary, message=f"Eject: Removed {counters['labels_removed']} labels, erased {counters['properties_set']} properties, completed after {summary.result_available_after} ms.", display=stats)
+
+    @traced("query")
+    def populate_with_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False, mark_new=False):
+        """Executes mergeCMD on each row of the CSV file, resolved from the import directory of the graph.
+
+        Commands are sequences of `CREATE` and `MERGE` clauses, see `dtgraph.backend.memory.cypher.parse_script`.
+        If mark_new is set, the node bound by the command to the variable `mark_new` (or to `n` if mark_new is True) is marked as new, see `Neo4jGraph.populate_with_csv`.
+        """
+        rows = iter_csv_rows(resolve_csv_path(path_to_csv_file, self.import_dir), fieldterminator)
+        summary = self._execute(rows, mergeCMD, mark_new)
+        self._record("csv", summary, message=f"CSV:    Added {summary.counters.labels_added} labels, created {summary.counters.nodes_created} nodes, "
+                  f"set {summary.counters.properties_set} properties, created {summary.counters.relationships_created} relationships, completed after {summary.result_available_after} ms.", display=self.verbose or stats)
+
+    @traced("query")
+    def populate_with_rows(self, rows, mergeCMD, stats=False, mark_new=False):
+        """Executes mergeCMD on each of the rows, given as a list of lists."""
+        summary = self._execute(rows, mergeCMD, mark_new)
+        self._record("csv", summary, message=f"Rows:   Added {summary.counters.labels_added} labels, created {summary.counters.nodes_created} nodes, "
+                  f"set {summary.counters.properties_set} properties, created {summary.counters.relationships_created} relationships, completed after {summary.result_available_after} ms.", display=stats)
+        return summary
+
+    def _execute(self, rows, mergeCMD, mark_new):
+        script = parse_script(mergeCMD, ("row",))
+        variable = new_variable(mergeCMD, mark_new) if mark_new else None
+        start = time.perf_counter()
+        counters = _counters()
+        with self._lock:
+            for row in rows:
+                bound = script.execute(self, {'row': row}, counters)
+                if variable is not None:
+                    if not isinstance(bound.get(variable), Node):
+                        raise RunTimeError(f"Variable `{variable}` is not bound to a node, hence the new node can not be marked.")
+                    self.add_label(bound[variable], "_dtgNew", counters)
+        return Summary(mergeCMD, counters, _elapsed(start))
+
+    def load_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False, mark_new=False, csv_root=None, sessions=4, batch_size=10_000):
+        """See `Neo4jGraph.load_csv`. Files are resolved from the import directory of the graph, unless `csv_root` is given."""
+        loader = CsvLoader(self, sessions=sessions, batch_size=batch_size, csv_root=csv_root if csv_root is not None else self.import_dir)
+        return loader.load(path_to_csv_file, mergeCMD, fieldterminator=fieldterminator, stats=stats, mark_new=mark_new)
+
+    @traced("query")
+    def load_scenario_script(self, query, stats=False):
+        """Executes the `CREATE` and `MERGE` clauses of a script. A trailing read-only part, e.g., `WITH ... RETURN ...`, is skipped."""
+        summary = self._execute([None], query, False)
+        self._record("scenario", summary, message=f"Load scenario: Added {summary.counters.labels_added} labels, created {summary.counters.nodes_created} nodes, "
+                  f"set {summary.counters.properties_set} properties, created {summary.counters.relationships_created} relationships, completed after {summary.result_available_after} ms.", display=self.verbose or stats)
+        return summary
+
+    @traced("query")
+    def clear_new_marks(self, stats=False):
+        """Marks every input node as processed by removing the label of new nodes."""
+        start = time.perf_counter()
+        with self._lock:
+            counters = _counters()
+            for node in self.nodes_with_labels(["_dtgNew"]):
+                self.remove_label(node, "_dtgNew", counters)
+        summary = Summary("CLEAR NEW", counters, _elapsed(start))
+        self._record("delta", summary, message=f"Delta: Removed {counters['labels_removed']} marks of new nodes, completed after {summary.result_available_after} ms.", display=self.verbose or stats)
+
+    @traced("query")
+    def output_all_nodes(self, stats=True):
+        summary = Summary("COUNT", {}, 0)
+        self._record("info", summary, message=f"Info: There are currently {self.node_count()} node(s) in the database.", display=self.verbose or stats)
+
+    @traced("query")
+    def exec_rule(self, rules, stats=False, with_diagnose=True, with_records=False):
+        """
+        Applies rules processed by the DSL, sharing the same lhs.
+
+        Parameters
+        ----------
+        rules : list[dict]
+            Dictionaries of the rules (see `Rule._dict`). The lhs of the first one is evaluated once,
+            and the constructors of every rule are applied on each of its bindings.
+        with_diagnose : bool
+            Whether conflicting elements are marked.
+        with_records : bool
+            Whether the statistics of each rule are returned too, as the single record returned by a fused script, 
+            see `dtgraph.compiler.Compiler.compile_many`.
+
+        Returns
+        -------
+        Summary | tuple[list[dict], Summary]
+            The time (in ms) spent matching the lhs is reported as available after, and the time spent merging the output as consumed after.
+        """
+        query = parse_query(rules[0]['lhs'])
+        evaluators = [RuleEvaluator(r, with_diagnose=with_diagnose) for r in rules]
+        counters = _counters()
+        merged = [(set(), set()) for _ in rules] if with_records else [None for _ in rules]
+        with self._lock:
+            start = time.perf_counter()
+            rows = query.match(self)
+            available_after = _elapsed(start)
+            start = time.perf_counter()
+            for row in rows:
+                for evaluator, m in zip(evaluators, merged):
+                    evaluator.apply(self, row, counters, m)
+            consumed_after = _elapsed(start)
+        summary = Summary(rules[0]['lhs'].strip(), counters, available_after, consumed_after)
+        self._record("rule", summary, message=f"Rule: Added {counters['labels_added']} labels, created {counters['nodes_created']} nodes, "
+                  f"set {counters['properties_set']} properties, created {counters['relationships_created']} relationships, completed after {available_after + consumed_after} ms.", display=self.verbose or stats)
+        if with_records:
+            record = {'dtgRows': len(rows)}
+            for i, (nodes, relationships) in enumerate(merged):
+                record[f"dtgNodes{i}"] = len(nodes)
+                record[f"dtgRelationships{i}"] = len(relationships)
+            return [record], summary
+        return summary
+
+    # diagnosis
+
+    def _conflicting_relationships(self):
+        return [r for r in self._relationships.values() if r.properties.get('_hasConflict') is not None]
+
+    @traced("query")
+    def diagnose_nodes(self, stats=True):
+        with self._lock:
+            nodes = self.nodes_with_labels(["_hasConflict"])
+        self._record("diagnose", Summary("DIAGNOSE NODES", {}, 0), message=f"NodeConflicts: There are currently {len(nodes)} nodes in the database which have a conflict.", display=self.verbose or stats)
+        for n in nodes:
+            self._log("  " + self._pretty_print_node(n), display=self.verbose or stats)
+        return len(nodes)
+
+    @traced("query")
+    def diagnose_edges(self, stats=True):
+        with self._lock:
+            relationships = self._conflicting_relationships()
+        self._record("diagnose", Summary("DIAGNOSE EDGES", {}, 0), message=f"EdgeConflicts: There are currently {len(relationships)} edges in the database which have a conflict.", display=self.verbose or stats)
+        for r in relationships:
+            self._log("  " + self._pretty_print_node(r.src, print_conflict=False) + self._pretty_print_edge(r) + self._pretty_print_node(r.tgt, print_conflict=False)
+                      + "\n" + self._pretty_print_edge_conflicts(r), display=self.verbose or stats)
+        return len(relationships)
+
+    @traced("query")
+    def diagnose_collisions(self, stats=True):
+        """Output elements are identified by their Skolem tuple rather than by a hash of it, hence identifiers never collide."""
+        self._record("diagnose", Summary("DIAGNOSE COLLISIONS", {}, 0), message="Collisions: There are currently 0 elements in the database whose compact id collides with another Skolem tuple.", display=self.verbose or stats)
+        return 0
+
+    def iter_conflicts(self, elements="all", fetch_size=1000, limit=None):
+        """See `Neo4jGraph.iter_conflicts`.
+
+        Conflicts are listed in order of identifier (and of type, for relationships), from a snapshot of the references of the conflicting elements
+        sorted once, which is read by pages of `fetch_size` elements. The graph is only locked while the snapshot is taken and while a page is listed.
+        Elements removed in between are skipped.
+        """
+        count = 0
+        for kind in [k for k in ("node", "edge") if elements in (k + "s", "all")]:
+            if limit is not None and count >= limit:
+                break
+            start = time.perf_counter()
+            with self._lock:
+                if kind == "node":
+                    ids = [id for _, id in sorted(self._conflict_order(n) for n in self._labels.get("_hasConflict", {}).values() if "_dummy" in n.labels)]
+                else:
+                    ids = [id for _, _, id in sorted((r.type,) + self._conflict_order(r) for r in self._relationships.values() if r.properties.get('_hasConflict') is not None)]
+            snapshot = _elapsed(start)
+            if limit is not None:
+                ids = ids[:limit - count]
+            store = self._nodes if kind == "node" else self._relationships
+            for offset in range(0, max(len(ids), 1), fetch_size):
+                start = time.perf_counter()
+                with self._lock:
+                    page = [e for e in (store.get(id) for id in ids[offset:offset + fetch_size]) if e is not None]
+                    records = [self._conflict_record(e, labels=sorted(e.labels)) if kind == "node" else self._conflict_record(e, type=e.type) for e in page]
+                self._record("diagnose", Summary("CONFLICTS", {}, snapshot + _elapsed(start)))
+                snapshot = 0
+                for record in records:
+                    yield Conflict.from_record(kind, record)
+                count += len(records)
+
+    @staticmethod
+    def _conflict_order(element):
+        return (to_string(element.properties.get('_id')), element.id)
+
+    @staticmethod
+    def _conflict_record(element, **attributes) -> dict:
+        record = {'id': element.properties.get('_id'), 'element_id': str(element.id), 'keys': [k for k, v in element.items() if v == CONFLICT_VALUE]}
+        record.update(attributes)
+        return record
+
+    @traced("query")
+    def conflict_summary(self, stats=True):
+        """See `Neo4jGraph.conflict_summary`."""
+        start = time.perf_counter()
+        counts = {}
+        with self._lock:
+            for n in self.nodes_with_labels(["_hasConflict"]):
+                for key in [k for k, v in n.items() if v == CONFLICT_VALUE]:
+                    for label in [l for l in n.labels if l not in BOOKKEEPING_LABELS] or [None]:
+                        counts[("node", label, key)] = counts.get(("node", label, key), 0) + 1
+            for r in self._conflicting_relationships():
+                for key in [k for k, v in r.items() if v == CONFLICT_VALUE]:
+                    counts[("edge", r.type, key)] = counts.get(("edge", r.type, key), 0) + 1
+        rows = sorted([{'kind': kind, 'label': label, 'key': key, 'count': count} for (kind, label, key), count in counts.items()],
+                      key=summary_order)
+        self._record("diagnose", Summary("CONFLICT SUMMARY", {}, _elapsed(start)), message=f"ConflictSummary: {sum([r['count'] for r in rows])} conflicting properties on {len(rows)} label(s) and type(s) x property.", display=self.verbose or stats)
+        if rows:
+            self._log(format_summary(rows), display=self.verbose or stats)
+        return rows
+
+    def export_conflicts(self, path, elements="all", fetch_size=1000, limit=None, stats=True):
+        """Writes the conflicts streamed by `iter_conflicts` to a JSON lines file, and returns their number."""
+        count = to_jsonl(self.iter_conflicts(elements=elements, fetch_size=fetch_size, limit=limit), path)
+        self._log(f"Conflicts: Exported {count} conflicting elements to {path}.", display=self.verbose or stats)
+        return count
+
+    def _output_elements(self, kind, labels, types):
+        """Iterates over the nodes or relationships selected as by `dtgraph.backend.neo4j.graph.export_query`, in no particular order."""
+        if kind == "nodes":
+            if labels is None:
+                return iter(self.nodes_with_labels(["_dummy"]))
+            # nodes with several of the labels are listed under the first one
+            return (n for i, label in enumerate(labels) for n in self._labels.get(label, {}).values() if not any(l in n.labels for l in labels[:i]))
+        if labels is None:
+            relationships = (r for n in self.nodes_with_labels(["_dummy"]) for r in n.out.values() if r.properties.get('_id') is not None)
+        else:
+            relationships = (r for n in self._nodes.values() if n.labels & set(labels) for r in n.out.values() if r.tgt.labels & set(labels))
+        return (r for r in relationships if not types or r.type in types)
+
+    def output_keys(self, kind, labels=None, types=None):
+        """See `Neo4jGraph.output_keys`."""
+        with self._lock:
+            keys = {key for element in self._output_elements(kind, labels, types) for key in element.properties}
+        self._record("export", Summary("OUTPUT KEYS", {}, 0))
+        return sorted(keys)
+
+    def iter_output(self, kind, labels=None, types=None, partition=0, partitions=1, fetch_size=1000):
+        """See `Neo4jGraph.iter_output`.
+
+        Elements are listed in order of identifier, from a snapshot of the identifiers of the selected elements sorted once,
+        which is read by pages of `fetch_size` elements. The graph is only locked while the snapshot is taken and while a page is listed.
+        Elements removed in between are skipped.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            ids = sorted(e.id for e in self._output_elements(kind, labels, types) if e.id % partitions == partition)
+        elapsed = _elapsed(start)
+        store = self._nodes if kind == "nodes" else self._relationships
+        for offset in range(0, len(ids), fetch_size):
+            start = time.perf_counter()
+            with self._lock:
+                page = [e for e in (store.get(id) for id in ids[offset:offset + fetch_size]) if e is not None]
+                if kind == "nodes":
+                    records = [{'id': str(n.id), 'labels': sorted(n.labels), 'properties': dict(n.properties)} for n in page]
+                else:
+                    records = [{'id': str(r.id), 'type': r.type, 'start': str(r.src.id), 'end': str(r.tgt.id), 'properties': dict(r.properties)} for r in page]
+            elapsed += _elapsed(start)
+            yield from records
+        self._record("export", Summary("OUTPUT", {}, elapsed))
+
+    def _pretty_print_node(self, node, print_conflict = True):
+        str_ = "("
+        if node.labels:
+            str_ += ":"
+        str_ += ":".join(sorted([l for l in node.labels if l not in ("_hasConflict", "_hasCollision", "_dummy")]))
+        str_ += " {"
+        str_ += ", ".join([k + ": " + str(v) for k, v in node.items() if k not in ('_id', '_key') and v != CONFLICT_VALUE])
+        str_ += "})"
+        if(print_conflict):
+            str_ += " has a conflict on attributes ['"
+            str_ += "', '".join([k for k, v in node.items() if v == CONFLICT_VALUE])
+            str_ += "']."
+        return str_
+
+    def _pretty_print_edge(self, edge):
+        str_ = "-[:" + edge.type
+        str_ += " {"
+        str_ += ", ".join([k + ": " + str(v) for k, v in edge.items() if k not in ('_id', '_key', '_hasConflict', '_hasCollision') and v != CONFLICT_VALUE])
+        str_ += "}]->"
+        return str_
+
+    def _pretty_print_edge_conflicts(self, edge):
+        str_ = "    has a conflict on attributes ['"
+        str_ += "', '".join([k for k, v in edge.items() if v == CONFLICT_VALUE])
+        str_ += "']"
+        return str_
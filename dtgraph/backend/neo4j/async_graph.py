@@ -0,0 +1,247 @@
+import asyncio
+import time
+
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import ClientError
+
+from dtgraph.backend.capabilities import capabilities_of
+from dtgraph.backend.neo4j.graph import (Neo4jGraph, Query, Pause, Stream, FLUSH_QUERY, ABORT_QUERY, DESTRUCT_QUERY, REMOVE_BOOKKEEPING_QUERY,
+    FLUSH_SELECTION, ABORT_SELECTION, DESTRUCT_SELECTION, CLEAR_NEW_QUERY, COUNT_ALL_QUERY, DIAGNOSE_NODES_QUERY, DIAGNOSE_EDGES_QUERY, DIAGNOSE_COLLISIONS_QUERY,
+    SHOW_STORAGE_INFO_QUERY, WRITE_MESSAGE, DELETE_MESSAGE, INDEX_ADDED_MESSAGE, INDEX_REMOVED_MESSAGE, CONSTRAINT_ADDED_MESSAGE, CONSTRAINT_REMOVED_MESSAGE,
+    EJECT_MESSAGE, CLEAR_NEW_MESSAGE, COUNT_ALL_MESSAGE)
+from dtgraph.conflict import to_jsonl_async
+from dtgraph.loader import CsvLoader
+from dtgraph.tracing import traced
+
+class AsyncNeo4jGraph(Neo4jGraph):
+    """Class reflecting a Neo4j graph instance, accessed through the asyncio API of the driver.
+
+    This class encapsulates a neo4j.AsyncGraphDatabase object, and mirrors the methods of `Neo4jGraph` as coroutines.
+    Queries issued by concurrent tasks run on separate sessions of the driver.
+    Only the calls to the driver differ: the queries, the operations sending several of them and the statistics they report are
+    those of `Neo4jGraph`.
+    """
+
+    @staticmethod
+    def _driver(uri, auth):
+        return AsyncGraphDatabase.driver(uri, auth=auth)
+
+    async def close(self):
+        await self.driver.close()
+
+    async def _run_autocommit(self, query, parameters=None):
+        """See `Neo4jGraph._run_autocommit`."""
+        async with self.driver.session(database=self.database) as session:
+            result = await session.run(query, parameters)
+            records = [record async for record in result]
+            keys = result.keys()
+            summary = await result.consume()
+        return records, summary, keys
+
+    async def _execute(self, query, parameters=None, autocommit=False):
+        """See `Neo4jGraph._execute`."""
+        if autocommit:
+            return await self._run_autocommit(query, parameters)
+        return await self.driver.execute_query(
+            query,
+            parameters_=parameters,
+            database=self.database)
+
+    async def _step(self, step):
+        if isinstance(step, Pause):
+            await asyncio.sleep(step.seconds)
+            return None
+        return await self._execute(step.text, step.parameters, step.autocommit)
+
+    async def _stream(self, steps):
+        """See `Neo4jGraph._stream`. The value returned by the steps is ignored."""
+        result = None
+        while True:
+            try:
+                step = steps.send(result)
+            except StopIteration:
+                return
+            if isinstance(step, Stream):
+                async with self.driver.session(database=self.database, fetch_size=step.fetch_size) as session:
+                    records = await session.run(step.text, step.parameters)
+                    count = 0
+                    async for record in records:
+                        yield step.item(record)
+                        count += 1
+                    result = (count, await records.consume())
+            elif isinstance(step, (Query, Pause)):
+                result = await self._step(step)
+            else:
+                result = None
+                yield step
+
+    async def _drive(self, steps):
+        """See `Neo4jGraph._drive`."""
+        result = None
+        while True:
+            try:
+                step = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            result = await self._step(step) if isinstance(step, (Query, Pause)) else None
+
+    @traced("query")
+    async def flush_database(self, batch_size=None):
+        """See `Neo4jGraph.flush_database`."""
+        if batch_size is not None:
+            return await self._drive(self._delete_steps("flush", "Flushed database", FLUSH_SELECTION, batch_size, stats=True))
+        self._report("flush", await self._execute(FLUSH_QUERY), "Flushed database: " + DELETE_MESSAGE, display=True)
+
+    @traced("query")
+    async def abort(self, stats=False, batch_size=None):
+        """See `Neo4jGraph.abort`."""
+        if batch_size is not None:
+            return await self._drive(self._delete_steps("abort", "Abort", ABORT_SELECTION, batch_size, stats))
+        self._report("abort", await self._execute(ABORT_QUERY), "Abort: " + DELETE_MESSAGE, display=stats)
+
+    @traced("query")
+    async def destruct_input(self, stats = False, batch_size = None):
+        """See `Neo4jGraph.destruct_input`."""
+        if batch_size is not None:
+            return await self._drive(self._delete_steps("destruct", "Destruct", DESTRUCT_SELECTION, batch_size, stats))
+        self._report("destruct", await self._execute(DESTRUCT_QUERY), "Destruct: " + DELETE_MESSAGE, display=stats)
+
+    @traced("query")
+    async def remove_bookkeeping(self, stats=False, batch_size=None):
+        """See `Neo4jGraph.remove_bookkeeping`."""
+        if batch_size is not None:
+            return await self._drive(self._remove_bookkeeping_steps(batch_size, stats))
+        self._report("eject", await self._execute(REMOVE_BOOKKEEPING_QUERY), EJECT_MESSAGE, display=stats)
+
+    @traced("query")
+    async def populate_with_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False, mark_new=False):
+        """See `Neo4jGraph.populate_with_csv`."""
+        populate_query = self._populate_query(f"LOAD CSV FROM '{path_to_csv_file}' as row FIELDTERMINATOR '{fieldterminator}' ", mergeCMD, mark_new)
+        self._report("csv", await self._execute(populate_query), "CSV:    " + WRITE_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    async def populate_with_rows(self, rows, mergeCMD, stats=False, mark_new=False):
+        """See `Neo4jGraph.populate_with_rows`."""
+        populate_query = self._populate_query("UNWIND $rows AS row\n", mergeCMD, mark_new)
+        return self._report("csv", await self._execute(populate_query, {'rows': rows}), "Rows:   " + WRITE_MESSAGE, display=stats)[1]
+
+    async def load_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False, mark_new=False, csv_root=None, sessions=4, batch_size=10_000):
+        """See `Neo4jGraph.load_csv`. Batches are executed by concurrent tasks."""
+        loader = CsvLoader(self, sessions=sessions, batch_size=batch_size, csv_root=csv_root)
+        return await loader.load_async(path_to_csv_file, mergeCMD, fieldterminator=fieldterminator, stats=stats, mark_new=mark_new)
+
+    @traced("query")
+    async def clear_new_marks(self, stats=False):
+        """See `Neo4jGraph.clear_new_marks`."""
+        self._report("delta", await self._execute(CLEAR_NEW_QUERY), CLEAR_NEW_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    async def output_all_nodes(self, stats=True):
+        self._report("info", await self._execute(COUNT_ALL_QUERY), COUNT_ALL_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    async def query(self, query):
+        records, summary = self._report("query", await self._execute(query), "Query:  " + WRITE_MESSAGE, display=self.verbose)
+        return (len(records), summary.result_consumed_after)
+
+    @traced("query")
+    async def load_scenario_script(self, query, stats=False):
+        return self._report("scenario", await self._execute(query), "Load scenario: " + WRITE_MESSAGE, display=self.verbose or stats)[1]
+
+    @traced("query")
+    async def exec_rule(self, query, stats=False, autocommit=False, parameters=None, with_records=False):
+        """See `Neo4jGraph.exec_rule`."""
+        return self._report_rule(await self._execute(query, parameters, autocommit), stats, with_records)
+
+    @traced("query")
+    async def explain_rule(self, query, autocommit=False, parameters=None):
+        """See `Neo4jGraph.explain_rule`."""
+        return self._report("explain", await self._execute(query, parameters, autocommit))[1]
+
+    @traced("query")
+    async def has_hash_function(self, name):
+        """See `Neo4jGraph.has_hash_function`."""
+        try:
+            await self._execute(f'RETURN {name}(["dtgraph"]) AS digest')
+        except ClientError:
+            return False
+        return True
+
+    @traced("query")
+    async def run_schema_command(self, query):
+        """See `Neo4jGraph.run_schema_command`."""
+        await self._execute(query, autocommit=True)
+
+    @traced("query")
+    async def storage_mode(self):
+        """See `Neo4jGraph.storage_mode`."""
+        return self._storage_mode_of(await self._execute(SHOW_STORAGE_INFO_QUERY, autocommit=True))
+
+    @traced("query")
+    async def set_storage_mode(self, mode, stats=False):
+        """See `Neo4jGraph.set_storage_mode`."""
+        start = time.monotonic()
+        await self.run_schema_command(f"STORAGE MODE {mode}")
+        self._print_storage_mode(mode, start, stats)
+
+    @traced("query")
+    async def diagnose_nodes(self, stats=True):
+        return self._report_conflicting_nodes(await self._execute(capabilities_of(self).read_query(DIAGNOSE_NODES_QUERY)), stats)
+
+    @traced("query")
+    async def diagnose_edges(self, stats=True):
+        return self._report_conflicting_edges(await self._execute(capabilities_of(self).read_query(DIAGNOSE_EDGES_QUERY)), stats)
+
+    @traced("query")
+    async def diagnose_collisions(self, stats=True):
+        return self._report_collisions(await self._execute(capabilities_of(self).read_query(DIAGNOSE_COLLISIONS_QUERY)), stats)
+
+    def iter_conflicts(self, elements="all", fetch_size=1000, limit=None):
+        """Asynchronous generator counterpart of `Neo4jGraph.iter_conflicts`."""
+        return self._stream(self._conflict_steps(elements, fetch_size, limit))
+
+    @traced("query")
+    async def conflict_summary(self, stats=True):
+        """See `Neo4jGraph.conflict_summary`."""
+        return self._report_conflict_summary(await self._execute(*self._conflict_summary_query()), stats)
+
+    async def export_conflicts(self, path, elements="all", fetch_size=1000, limit=None, stats=True):
+        """See `Neo4jGraph.export_conflicts`."""
+        count = await to_jsonl_async(self.iter_conflicts(elements=elements, fetch_size=fetch_size, limit=limit), path)
+        return self._print_exported_conflicts(count, path, stats)
+
+    async def output_keys(self, kind, labels=None, types=None):
+        """See `Neo4jGraph.output_keys`."""
+        records, summary = self._report("export", await self._execute(self._output_query(kind, labels, types, keys=True)))
+        return sorted([r['key'] for r in records])
+
+    async def iter_output(self, kind, labels=None, types=None, partition=0, partitions=1, fetch_size=1000):
+        """Asynchronous generator counterpart of `Neo4jGraph.iter_output`."""
+        query = self._output_query(kind, labels, types, partitioned=partitions > 1)
+        async with self.driver.session(database=self.database, fetch_size=fetch_size) as session:
+            result = await session.run(query, {'partitions': partitions, 'partition': partition})
+            async for record in result:
+                yield record.data()
+            summary = await result.consume()
+        self._record("export", summary)
+
+    @traced("query")
+    async def addIndex(self, query, stats=False):
+        self._report("index", await self._execute(query), INDEX_ADDED_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    async def dropIndex(self, query, stats=False):
+        self._report("index", await self._execute(query), INDEX_REMOVED_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    async def addConstraint(self, query, stats=False):
+        self._report("constraint", await self._execute(query), CONSTRAINT_ADDED_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    async def dropConstraint(self, query, stats=False):
+        self._report("constraint", await self._execute(query), CONSTRAINT_REMOVED_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    async def await_indexes(self, names, timeout=300, poll_interval=0.5, stats=False):
+        """See `Neo4jGraph.await_indexes`."""
+        return await self._drive(self._await_index_steps(names, timeout, poll_interval, stats))
@@ -1,171 +1,731 @@
+import collections
+import time
+
 from neo4j import GraphDatabase, basic_auth
+from neo4j.exceptions import ClientError
+
+from dtgraph.backend.capabilities import capabilities_of
+from dtgraph.conflict import Conflict, CONFLICT_VALUE, BOOKKEEPING_LABELS, to_jsonl, format_summary, summary_order
+from dtgraph.exceptions import RunTimeError
+from dtgraph.loader import CsvLoader, new_variable
+from dtgraph.metrics import RunStats, print_sink
+from dtgraph.tracing import Tracer, traced, query_hash
+
+FLUSH_QUERY = """
+MATCH (n) DETACH DELETE(n)
+"""
+
+ABORT_QUERY = """
+MATCH (n:`_dummy`)
+DETACH DELETE n
+"""
+
+DESTRUCT_QUERY = """
+MATCH (n)
+WHERE NOT n:`_dummy`
+DETACH DELETE n
+"""
+
+# output relationships always start from output nodes, hence input relationships are not scanned
+REMOVE_BOOKKEEPING_QUERY = """
+MATCH (:`_dummy`)-[r]->()
+WHERE r._id IS NOT NULL
+REMOVE r._id, r._hasConflict, r._key, r._hasCollision
+WITH count(*) AS edges
+MATCH (n:`_dummy`)
+REMOVE n:_dummy, n:_hasConflict, n:_hasCollision, n._id, n._key
+"""
+
+# processed nodes lose the `_dummy` label, hence each batch starts where the previous one ended
+REMOVE_BOOKKEEPING_BATCH_QUERY = """
+MATCH (n:`_dummy`)
+WITH n LIMIT $batch_size
+OPTIONAL MATCH (n)-[r]->()
+WHERE r._id IS NOT NULL
+WITH n, collect(r) AS edges
+FOREACH (r IN edges | REMOVE r._id, r._hasConflict, r._key, r._hasCollision)
+REMOVE n:_dummy, n:_hasConflict, n:_hasCollision, n._id, n._key
+RETURN count(n) AS count
+"""
+
+COUNT_ALL_QUERY = """
+MATCH (n)
+RETURN COUNT(n) as count
+"""
+
+DIAGNOSE_NODES_QUERY = """
+MATCH (n:_hasConflict)
+RETURN n
+"""
+
+DIAGNOSE_EDGES_QUERY = """
+MATCH (i)-[r]->(o)
+WHERE r._hasConflict IS NOT NULL
+RETURN i, r, o
+"""
+
+DIAGNOSE_COLLISIONS_QUERY = """
+MATCH (n:_hasCollision)
+RETURN n._id AS id, n._key AS key
+UNION ALL
+MATCH ()-[r]->()
+WHERE r._hasCollision IS NOT NULL
+RETURN r._id AS id, r._key AS key
+"""
+
+# nodes deleted by flush_database, abort and destruct_input, as a pattern and a condition on `n`
+FLUSH_SELECTION = ("(n)", "")
+ABORT_SELECTION = ("(n:`_dummy`)", "")
+DESTRUCT_SELECTION = ("(n)", "WHERE NOT n:`_dummy`")
+
+def batched_delete_queries(capabilities, selection, batch_size):
+    """
+    Returns the steps deleting the selected nodes in bounded transactions: their outgoing relationships, their incoming relationships, then the nodes.
+    Deleting relationships first keeps the transactions bounded even for dense nodes.
+
+    On backends supporting `CALL { ... } IN TRANSACTIONS` (e.g., Neo4j), each step is a single such query, to be run in an auto-commit transaction.
+    On other backends, each step deletes at most `batch_size` elements, and should be repeated until it deletes fewer.
+
+    Parameters
+    ----------
+    capabilities : dtgraph.backend.capabilities.Capabilities
+        Capabilities of the backend.
+
+    Returns
+    -------
+    list[tuple[str, str, bool]]
+        The kind of deleted elements ("nodes" or "relationships"), the query, and whether the query should be repeated.
+    """
+    node, where = selection
+    steps = [
+        ("relationships", f"MATCH {node}-[r]->()", "r", "DELETE r"),
+        ("relationships", f"MATCH ()-[r]->{node}", "r", "DELETE r"),
+        ("nodes", f"MATCH {node}", "n", "DETACH DELETE n"),
+    ]
+    queries = []
+    for kind, match, variable, delete in steps:
+        match = "\n".join([line for line in (match, where) if line])
+        if capabilities.batching == "call_in_transactions":
+            queries.append((kind, f"{match}\nCALL {{ WITH {variable} {delete} }} IN TRANSACTIONS OF {int(batch_size)} ROWS", False))
+        else:
+            queries.append((kind, f"{match}\nWITH {variable} LIMIT {int(batch_size)}\n{delete}\nRETURN count(*) AS count", True))
+    return queries
+
+CLEAR_NEW_QUERY = """
+MATCH (n:_dtgNew)
+REMOVE n:_dtgNew
+"""
+
+SHOW_STORAGE_INFO_QUERY = """
+SHOW STORAGE INFO
+"""
+
+SHOW_INDEXES_QUERY = """
+SHOW INDEXES YIELD name, state, populationPercent
+WHERE name IN $names
+RETURN name, state, populationPercent
+"""
+
+# pages of conflicts are ordered by the identifier of output elements, which is indexed by the constraints of the transformation
+CONFLICTING_NODES_QUERY = """
+MATCH (n:_hasConflict:_dummy)
+WHERE n._id > $after
+RETURN n._id AS id, {element_id}(n) AS element_id, labels(n) AS labels, [k IN keys(n) WHERE properties(n)[k] = $conflict] AS keys
+ORDER BY n._id
+LIMIT $limit
+"""
+
+CONFLICTING_EDGE_TYPES_QUERY = """
+MATCH ()-[r]->()
+WHERE r._hasConflict IS NOT NULL
+RETURN DISTINCT type(r) AS type
+"""
+
+CONFLICTING_EDGES_QUERY = """
+MATCH ()-[r:`{type}`]->()
+WHERE r._hasConflict IS NOT NULL AND r._id > $after
+RETURN r._id AS id, {element_id}(r) AS element_id, type(r) AS type, [k IN keys(r) WHERE properties(r)[k] = $conflict] AS keys
+ORDER BY r._id
+LIMIT $limit
+"""
+
+# without an index on the identifiers of relationships (e.g., on Memgraph), each page of the above query would scan the whole type,
+# hence the conflicting relationships of a type are streamed by a single query instead
+STREAMED_CONFLICTING_EDGES_QUERY = """
+MATCH ()-[r:`{type}`]->()
+WHERE r._hasConflict IS NOT NULL
+RETURN r._id AS id, {element_id}(r) AS element_id, type(r) AS type, [k IN keys(r) WHERE properties(r)[k] = $conflict] AS keys
+ORDER BY r._id
+{limit}
+"""
+
+# conflicts are counted by the server, a single row being returned per label or type and conflicting property;
+# conflicting nodes and relationships are scanned by the two parts of the union,
+# and nodes without other labels than bookkeeping ones are counted with a null label rather than dropped by the UNWIND of an empty list
+CONFLICT_SUMMARY_QUERY = """
+MATCH (n:_hasConflict)
+UNWIND [k IN keys(n) WHERE properties(n)[k] = $conflict] AS key
+WITH n, key, [l IN labels(n) WHERE NOT l IN $bookkeeping] AS labels
+UNWIND CASE WHEN size(labels) = 0 THEN [null] ELSE labels END AS label
+RETURN "node" AS kind, label, key, count(*) AS count
+UNION ALL
+MATCH ()-[r]->()
+WHERE r._hasConflict IS NOT NULL
+UNWIND [k IN keys(r) WHERE properties(r)[k] = $conflict] AS key
+RETURN "edge" AS kind, type(r) AS label, key, count(*) AS count
+"""
+
+def export_query(capabilities, kind, labels=None, types=None, partitioned=False, keys=False):
+    """
+    Returns the query streaming the exported nodes or relationships, see `Neo4jGraph.iter_output`.
+
+    Parameters
+    ----------
+    capabilities : dtgraph.backend.capabilities.Capabilities
+        Capabilities of the backend.
+    kind : str
+        "nodes" or "relationships".
+    labels : list[str]
+        Labels of the exported nodes, and of the endpoints of the exported relationships.
+        If None, the output elements of the active transformation are exported, i.e., the `_dummy` nodes and the relationships they identify.
+    types : list[str]
+        If provided, types of the exported relationships.
+    partitioned : bool
+        Whether the elements are split by their identifier into `$partitions` parts, of which the `$partition`-th is streamed.
+    keys : bool
+        Whether the query returns the distinct property keys of the elements, rather than the elements.
+    """
+    def has_label(variable):
+        return "(" + " OR ".join([f"{variable}:`{l}`" for l in labels]) + ")"
+    if kind == "nodes":
+        variable = "n"
+        match = "MATCH (n:`_dummy`)" if labels is None else "MATCH (n)"
+        conditions = [] if labels is None else [has_label("n")]
+    else:
+        variable = "r"
+        pattern = "" if not types else ":" + "|".join([f"`{t}`" for t in types])
+        if labels is None:
+            # output relationships always start from output nodes
+            match = f"MATCH (s:`_dummy`)-[r{pattern}]->(t)"
+            conditions = ["r._id IS NOT NULL"]
+        else:
+            match = f"MATCH (s)-[r{pattern}]->(t)"
+            conditions = [has_label("s"), has_label("t")]
+    if partitioned:
+        conditions.append(f"{capabilities.numeric_id(variable)} % $partitions = $partition")
+    query = match + "\n"
+    if conditions:
+        query += "WHERE " + " AND ".join(conditions) + "\n"
+    if keys:
+        return query + f"UNWIND keys({variable}) AS key\nRETURN DISTINCT key"
+    id_function = capabilities.id_function
+    if kind == "nodes":
+        return query + f"RETURN {id_function}(n) AS id, labels(n) AS labels, properties(n) AS properties"
+    return query + f"RETURN {id_function}(r) AS id, type(r) AS type, {id_function}(s) AS start, {id_function}(t) AS end, properties(r) AS properties"
+
+# messages of the queries, formatted with the `summary` of the query, its `counters`, its `records` and their `count`, see `Neo4jGraph._report`
+WRITE_MESSAGE = ("Added {counters.labels_added} labels, created {counters.nodes_created} nodes, set {counters.properties_set} properties, "
+                 "created {counters.relationships_created} relationships, completed after {summary.result_available_after} ms.")
+DELETE_MESSAGE = "Deleted {counters.nodes_deleted} nodes, deleted {counters.relationships_deleted} relationships, completed after {summary.result_available_after} ms."
+INDEX_ADDED_MESSAGE = "Index: Added {counters.indexes_added} index, completed after {summary.result_available_after} ms."
+INDEX_REMOVED_MESSAGE = "Index: Removed {counters.indexes_removed} index, completed after {summary.result_available_after} ms."
+CONSTRAINT_ADDED_MESSAGE = "Cns:    Added {counters.constraints_added} constraint, completed after {summary.result_available_after} ms."
+CONSTRAINT_REMOVED_MESSAGE = "Cns:    Removed {counters.constraints_removed} constraint, completed after {summary.result_available_after} ms."
+EJECT_MESSAGE = "Eject: Removed {counters.labels_removed} labels, erased {counters.properties_set} properties, completed after {summary.result_available_after} ms."
+CLEAR_NEW_MESSAGE = "Delta: Removed {counters.labels_removed} marks of new nodes, completed after {summary.result_available_after} ms."
+COUNT_ALL_MESSAGE = "Info: There are currently {records[0][count]} node(s) in the database."
+
+# the operations sending several queries are written once, as generators of steps shared by the synchronous and asynchronous graphs:
+# they yield the queries to send (or the pauses to make) and receive the records, summary and keys of each query, see `Neo4jGraph._drive`,
+# and may yield other items to their consumer, see `Neo4jGraph._stream`
+Query = collections.namedtuple("Query", ["text", "parameters", "autocommit"], defaults=[None, False])
+Pause = collections.namedtuple("Pause", ["seconds"])
+# query whose records are pulled from the server `fetch_size` at a time, and yielded to the consumer as mapped by `item`;
+# the steps receive the number of records and the summary of the query
+Stream = collections.namedtuple("Stream", ["text", "parameters", "fetch_size", "item"])
 
 class Neo4jGraph(object):
     """Class reflecting a Neo4j graph instance.
 
     This class encapsulates a neo4j.GraphDatabase object.
     Note that it also supports other openCypher compatible backends such as Memgraph.
+
+    Queries are sent by `_execute`, `_drive` and `_stream` only, which `AsyncNeo4jGraph` overrides with coroutines;
+    the queries, their parameters and the statistics they report are shared by both classes.
     """
 
-    def __init__(self, uri, database, username=None, password=None, verbose=False):
-        if username is None:
-            self.driver = GraphDatabase.driver(
-                uri, 
-                auth=None)
-        else:
-            self.driver = GraphDatabase.driver(
-                uri, 
-                auth=basic_auth(username, password))
+    # dtgraph.backend.capabilities.Capabilities of the backend, defaulting to the profile registered for the database
+    capabilities = None
+
+    def __init__(self, uri, database, username=None, password=None, verbose=False, sinks=None, tracer=None, capabilities=None):
+        """
+        Parameters
+        ----------
+        capabilities : dtgraph.backend.capabilities.Capabilities
+            Capabilities of the backend, e.g., a profile derived for a newer version of the server.
+            Defaults to the profile registered for the database, see `dtgraph.backend.capabilities.profile_for`.
+        sinks : list[callable]
+            Functions called with the `dtgraph.metrics.QueryStats` of each query, and of each other message, e.g., progress or conflict listings
+            (see `dtgraph.metrics.RunStats.log`). Defaults to `dtgraph.metrics.print_sink`, which prints the statistics as requested by the `stats` arguments.
+            Nothing is printed with an empty list.
+        tracer : dtgraph.tracing.Tracer
+            Tracer opening a span around each query, annotated with its counters.
+            Transformations applied on this graph open their spans with the same tracer, unless given their own.
+        """
+        self.driver = self._driver(uri, None if username is None else basic_auth(username, password))
         self.database = database
+        self.capabilities = capabilities_of(self) if capabilities is None else capabilities
         self.verbose = verbose
+        # statistics of every query sent through this object
+        self.metrics = RunStats(sinks=[print_sink] if sinks is None else sinks)
+        self.tracer = tracer if tracer is not None else Tracer()
+
+    @staticmethod
+    def _driver(uri, auth):
+        return GraphDatabase.driver(uri, auth=auth)
 
     def close(self):
         self.driver.close
 
-    def print_query_stats(self, records, summary, keys):
-        print("The query `{query}` returned {records_count} records in {time} ms.".format(
-            query=summary.query, 
-            records_count=len(records),
-            time=summary.result_available_after))
+    def _record(self, phase, summary, message=None, display=False):
+        stats = self.metrics.record(phase, summary, message=message, display=display)
+        tracer = getattr(self, 'tracer', None)
+        if tracer is not None:
+            tracer.annotate(phase=phase, query_hash=query_hash(getattr(summary, 'query', None)), time=stats.time, bytes_sent=stats.bytes_sent, **stats.counters)
+        return stats
 
-    def flush_database(self):
-        flush_query = """
-        MATCH (n) DETACH DELETE(n)
+    def _report(self, phase, result, message=None, display=False):
         """
-        records, summary, keys = self.driver.execute_query(
-            flush_query,
-            database=self.database)
+        Prints the statistics of a query if the graph is verbose, and records them, see `_record`.
+
+        Parameters
+        ----------
+        result : tuple
+            The records, summary and keys of the query, as returned by `_execute`.
+        message : str
+            Message of the query, formatted with its `summary`, its `counters`, its `records` and their `count`, see `WRITE_MESSAGE`.
+
+        Returns
+        -------
+        tuple[list, neo4j.ResultSummary]
+            The records and the summary of the query.
+        """
+        records, summary, keys = result
         if(self.verbose):
             self.print_query_stats(records, summary, keys)
-        print(f"Flushed database: Deleted {summary.counters.nodes_deleted} nodes, deleted {summary.counters.relationships_deleted} relationships, completed after {summary.result_available_after} ms.")
+        if message is not None:
+            message = message.format(summary=summary, counters=summary.counters, records=records, count=len(records))
+        self._record(phase, summary, message=message, display=display)
+        return records, summary
+
+    def print_query_stats(self, records, summary, keys):
+        self._log("The query `{query}` returned {records_count} records in {time} ms.".format(
+            query=summary.query,
+            records_count=len(records),
+            time=summary.result_available_after))
+
+    def _log(self, message, display=True):
+        """Forwards a message which does not describe a single query to the sinks of the metrics, see `dtgraph.metrics.RunStats.log`."""
+        self.metrics.log(message, display=display)
+
+    def _run_autocommit(self, query, parameters=None):
+        """Runs the query in an implicit (auto-commit) transaction.
 
-    def abort(self, stats=False):
+        This is required by queries that manage their own transactions,
+        e.g., `CALL { ... } IN TRANSACTIONS` on Neo4j or `USING PERIODIC COMMIT` on Memgraph.
+        """
         with self.driver.session(database=self.database) as session:
-            abort_query = """
-            MATCH (n:`_dummy`)
-            DETACH DELETE n
-            """
-            records, summary, keys = self.driver.execute_query(
-                abort_query,
-                database=self.database)
-            if(self.verbose):
-                self.print_query_stats(records, summary, keys)
-            if(stats):
-                print(f"Abort: Deleted {summary.counters.nodes_deleted} nodes, deleted {summary.counters.relationships_deleted} relationships, completed after {summary.result_available_after} ms.")
-        
-    def destruct_input(self, stats = False):
-        destruct_query = """
-        MATCH (n)
-        WHERE NOT n:`_dummy`
-        DETACH DELETE n
-        """
-        records, summary, keys = self.driver.execute_query(
-            destruct_query,
-            database=self.database)
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(stats):
-            print(f"Destruct: Deleted {summary.counters.nodes_deleted} nodes, deleted {summary.counters.relationships_deleted} relationships, completed after {summary.result_available_after} ms.")
-
-    def remove_bookkeeping(self, stats=False):
-        remove_query = """
-        MATCH ()-[r]->()
-        REMOVE r._id, r._hasConflict
-        WITH *
-        MATCH (n:`_dummy`)
-        REMOVE n:_dummy, n:_hasConflict, n._id
-        """
-        records, summary, keys = self.driver.execute_query(
-            remove_query,
-            database=self.database)
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(stats):
-            print(f"Eject: Removed {summary.counters.labels_removed} labels, erased {summary.counters.properties_set} properties, completed after {summary.result_available_after} ms.")
+            result = session.run(query, parameters)
+            records = list(result)
+            keys = result.keys()
+            summary = result.consume()
+        return records, summary, keys
 
-    def populate_with_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False):
-        populate_query = f"LOAD CSV FROM '{path_to_csv_file}' as row FIELDTERMINATOR '{fieldterminator}' " + mergeCMD
-        records, summary, keys = self.driver.execute_query(
-            populate_query,
+    def _execute(self, query, parameters=None, autocommit=False):
+        """Runs the query, in an implicit transaction if `autocommit` (see `_run_autocommit`), and returns its records, summary and keys."""
+        if autocommit:
+            return self._run_autocommit(query, parameters)
+        return self.driver.execute_query(
+            query,
+            parameters_=parameters,
             database=self.database)
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):    
-            print(f"CSV:    Added {summary.counters.labels_added} labels, created {summary.counters.nodes_created} nodes, " 
-                  f"set {summary.counters.properties_set} properties, created {summary.counters.relationships_created} relationships, completed after {summary.result_available_after} ms.")
 
-    def output_all_nodes(self, stats=True):
-        count_all_query = """
-        MATCH (n)
-        RETURN COUNT(n) as count
+    def _step(self, step):
+        if isinstance(step, Pause):
+            time.sleep(step.seconds)
+            return None
+        return self._execute(step.text, step.parameters, step.autocommit)
+
+    def _stream(self, steps):
+        """Runs the queries yielded by a generator of steps, sending back their results, and yields the other items it yields."""
+        result = None
+        while True:
+            try:
+                step = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            if isinstance(step, Stream):
+                result = yield from self._stream_records(step)
+            elif isinstance(step, (Query, Pause)):
+                result = self._step(step)
+            else:
+                result = None
+                yield step
+
+    def _stream_records(self, step):
+        """Yields the items of the records of a `Stream` step, and returns their number and the summary of the query."""
+        with self.driver.session(database=self.database, fetch_size=step.fetch_size) as session:
+            result = session.run(step.text, step.parameters)
+            count = 0
+            for record in result:
+                yield step.item(record)
+                count += 1
+            return count, result.consume()
+
+    def _drive(self, steps):
+        """Runs the queries yielded by a generator of steps, sending back their results, and returns the value it returns."""
+        stream = self._stream(steps)
+        while True:
+            try:
+                next(stream)
+            except StopIteration as stop:
+                return stop.value
+
+    @traced("query")
+    def flush_database(self, batch_size=None):
+        """Deletes all the nodes and relationships of the database, in transactions of `batch_size` elements if provided."""
+        if batch_size is not None:
+            return self._drive(self._delete_steps("flush", "Flushed database", FLUSH_SELECTION, batch_size, stats=True))
+        self._report("flush", self._execute(FLUSH_QUERY), "Flushed database: " + DELETE_MESSAGE, display=True)
+
+    @traced("query")
+    def abort(self, stats=False, batch_size=None):
+        """Deletes the output of the transformation, in transactions of `batch_size` elements if provided."""
+        if batch_size is not None:
+            return self._drive(self._delete_steps("abort", "Abort", ABORT_SELECTION, batch_size, stats))
+        self._report("abort", self._execute(ABORT_QUERY), "Abort: " + DELETE_MESSAGE, display=stats)
+
+    @traced("query")
+    def destruct_input(self, stats = False, batch_size = None):
+        """Deletes the input of the transformation, in transactions of `batch_size` elements if provided."""
+        if batch_size is not None:
+            return self._drive(self._delete_steps("destruct", "Destruct", DESTRUCT_SELECTION, batch_size, stats))
+        self._report("destruct", self._execute(DESTRUCT_QUERY), "Destruct: " + DELETE_MESSAGE, display=stats)
+
+    def _delete_steps(self, phase, title, selection, batch_size, stats):
+        """Steps deleting the selected nodes and their relationships in bounded transactions, see `batched_delete_queries`."""
+        start = time.monotonic()
+        deleted = {'nodes': 0, 'relationships': 0}
+        for kind, query, repeated in batched_delete_queries(capabilities_of(self), selection, batch_size):
+            while True:
+                records, summary = self._report(phase, (yield Query(query, autocommit=not repeated)))
+                if repeated:
+                    count = records[0]['count']
+                else:
+                    count = summary.counters.nodes_deleted if kind == "nodes" else summary.counters.relationships_deleted
+                deleted[kind] += count
+                self._log(f"{title}: Deleted {deleted['nodes']} nodes, deleted {deleted['relationships']} relationships so far.", display=self.verbose)
+                if not repeated or count < batch_size:
+                    break
+        self._log(f"{title}: Deleted {deleted['nodes']} nodes, deleted {deleted['relationships']} relationships in batches of {batch_size}, completed after {int((time.monotonic() - start) * 1000)} ms.", display=self.verbose or stats)
+        return deleted
+
+    @traced("query")
+    def remove_bookkeeping(self, stats=False, batch_size=None):
         """
-        records, summary, keys = self.driver.execute_query(
-            count_all_query,
-            database=self.database)
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"Info: There are currently {records[0]['count']} node(s) in the database.")
+        Removes the bookkeeping labels and properties of output elements.
+
+        Parameters
+        ----------
+        batch_size : int
+            If provided, output nodes and their outgoing relationships are processed in transactions of `batch_size` nodes.
+            This keeps the transaction state bounded on large outputs.
+        """
+        if batch_size is not None:
+            return self._drive(self._remove_bookkeeping_steps(batch_size, stats))
+        self._report("eject", self._execute(REMOVE_BOOKKEEPING_QUERY), EJECT_MESSAGE, display=stats)
+
+    def _remove_bookkeeping_steps(self, batch_size, stats):
+        start = time.monotonic()
+        nodes = batches = 0
+        while True:
+            records, summary = self._report("eject", (yield Query(REMOVE_BOOKKEEPING_BATCH_QUERY, {'batch_size': batch_size})))
+            count = records[0]['count']
+            nodes += count
+            batches += 1
+            if count < batch_size:
+                break
+        self._log(f"Eject: Removed the bookkeeping of {nodes} nodes in {batches} batch(es), completed after {int((time.monotonic() - start) * 1000)} ms.", display=self.verbose or stats)
+
+    @traced("query")
+    def populate_with_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False, mark_new=False):
+        """Executes mergeCMD on each row of the CSV file.
+
+        If mark_new is set, the node bound by the command to the variable `mark_new` (or to `n` if mark_new is True) is marked as new,
+        so that it is taken into account by the next `Transformation.apply_delta()`.
+        Raises a ValueError if the command does not bind this variable to a node.
+        """
+        populate_query = self._populate_query(f"LOAD CSV FROM '{path_to_csv_file}' as row FIELDTERMINATOR '{fieldterminator}' ", mergeCMD, mark_new)
+        self._report("csv", self._execute(populate_query), "CSV:    " + WRITE_MESSAGE, display=self.verbose or stats)
+
+    @staticmethod
+    def _populate_query(source, mergeCMD, mark_new):
+        """Returns the query executing mergeCMD on each row given by `source`, marking the node bound to the variable `mark_new` as new, if any."""
+        populate_query = source + mergeCMD
+        if mark_new:
+            populate_query += f"\nSET {new_variable(mergeCMD, mark_new)}:_dtgNew"
+        return populate_query
 
+    @traced("query")
+    def populate_with_rows(self, rows, mergeCMD, stats=False, mark_new=False):
+        """Executes mergeCMD on each of the rows, given as a list of lists, with a single `UNWIND $rows AS row` query.
+
+        See `populate_with_csv` for mark_new.
+        """
+        populate_query = self._populate_query("UNWIND $rows AS row\n", mergeCMD, mark_new)
+        return self._report("csv", self._execute(populate_query, {'rows': rows}), "Rows:   " + WRITE_MESSAGE, display=stats)[1]
+
+    def load_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False, mark_new=False, csv_root=None, sessions=4, batch_size=10_000):
+        """
+        Executes mergeCMD on each row of a CSV file read by the client, unlike `populate_with_csv`.
+        Rows are sent in batches, executed by several sessions in parallel, see `dtgraph.loader.CsvLoader`.
+
+        Parameters
+        ----------
+        path_to_csv_file : str
+            Local path, or URL as given to `populate_with_csv`, e.g., "file:///gtb/gusgene1000-5.csv".
+        csv_root : str
+            Local directory standing for the import directory of the server, e.g., "output-ibench-data".
+        sessions : int
+            Number of batches executed concurrently.
+        batch_size : int
+            Number of rows sent by each query.
+        """
+        loader = CsvLoader(self, sessions=sessions, batch_size=batch_size, csv_root=csv_root)
+        return loader.load(path_to_csv_file, mergeCMD, fieldterminator=fieldterminator, stats=stats, mark_new=mark_new)
+
+    @traced("query")
+    def clear_new_marks(self, stats=False):
+        """Marks every input node as processed by removing the label of new nodes."""
+        self._report("delta", self._execute(CLEAR_NEW_QUERY), CLEAR_NEW_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    def output_all_nodes(self, stats=True):
+        self._report("info", self._execute(COUNT_ALL_QUERY), COUNT_ALL_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
     def query(self, query):
-        records, summary, keys = self.driver.execute_query(
-            query,
-            database=self.database)
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-            print(f"Query:  Added {summary.counters.labels_added} labels, created {summary.counters.nodes_created} nodes, " 
-                  f"set {summary.counters.properties_set} properties, created {summary.counters.relationships_created} relationships, completed after {summary.result_available_after} ms.")
+        records, summary = self._report("query", self._execute(query), "Query:  " + WRITE_MESSAGE, display=self.verbose)
         return (len(records), summary.result_consumed_after)
-    
+
+    @traced("query")
     def load_scenario_script(self, query, stats=False):
-        records, summary, keys = self.driver.execute_query(
-            query,
-            database=self.database)
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"Load scenario: Added {summary.counters.labels_added} labels, created {summary.counters.nodes_created} nodes, " 
-                  f"set {summary.counters.properties_set} properties, created {summary.counters.relationships_created} relationships, completed after {summary.result_available_after} ms.")
-        return summary
-    
-    def exec_rule(self, query, stats=False):
-        records, summary, keys = self.driver.execute_query(
-            query,
-            database=self.database)
-        if(summary.plan):
-            print(summary.plan['args']['string-representation'])
-        if(summary.profile):
-            print(summary.profile['args']['string-representation'])
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"Rule: Added {summary.counters.labels_added} labels, created {summary.counters.nodes_created} nodes, " 
-                  f"set {summary.counters.properties_set} properties, created {summary.counters.relationships_created} relationships, completed after {summary.result_available_after} ms.")
-        return summary
+        return self._report("scenario", self._execute(query), "Load scenario: " + WRITE_MESSAGE, display=self.verbose or stats)[1]
 
-    def diagnose_nodes(self, stats=True):
-        diagnose_nodes_query = """
-        MATCH (n:_hasConflict)
-        RETURN n
+    @traced("query")
+    def exec_rule(self, query, stats=False, autocommit=False, parameters=None, with_records=False):
         """
-        records, summary, keys = self.driver.execute_query(
-            diagnose_nodes_query,
-            database=self.database)
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"NodeConflicts: There are currently {len(records)} nodes in the database which have a conflict.")
+        Executes a compiled rule, and returns the summary of the query.
+        If `with_records` is set, returns a tuple with the records returned by the rule and the summary,
+        e.g., the statistics of each rule of a fused script (see `dtgraph.compiler.Compiler.compile_many`).
+        """
+        return self._report_rule(self._execute(query, parameters, autocommit), stats, with_records)
+
+    def _report_rule(self, result, stats, with_records=False):
+        summary = result[1]
+        if capabilities_of(self).reports_plans:
+            if(summary.plan):
+                self._log(summary.plan['args']['string-representation'])
+            if(summary.profile):
+                self._log(summary.profile['args']['string-representation'])
+        records, summary = self._report("rule", result, "Rule: " + WRITE_MESSAGE, display=self.verbose or stats)
+        return (records, summary) if with_records else summary
+
+    @traced("query")
+    def explain_rule(self, query, autocommit=False, parameters=None):
+        """Runs an EXPLAIN query, and returns its summary without printing anything."""
+        return self._report("explain", self._execute(query, parameters, autocommit))[1]
+
+    @traced("query")
+    def has_hash_function(self, name):
+        """Whether the server provides the given function hashing a list of strings, e.g., `apoc.util.md5`, which plugins may not have installed."""
+        try:
+            self._execute(f'RETURN {name}(["dtgraph"]) AS digest')
+        except ClientError:
+            return False
+        return True
+
+    @traced("query")
+    def run_schema_command(self, query):
+        """Runs a schema command in an implicit transaction, as required by Memgraph."""
+        self._execute(query, autocommit=True)
+
+    @traced("query")
+    def storage_mode(self):
+        """Returns the current storage mode of a Memgraph database, e.g., "IN_MEMORY_TRANSACTIONAL", or None if it is not reported."""
+        return self._storage_mode_of(self._execute(SHOW_STORAGE_INFO_QUERY, autocommit=True))
+
+    @staticmethod
+    def _storage_mode_of(result):
+        for r in result[0]:
+            if r['storage info'] == "storage_mode":
+                return r['value']
+        return None
+
+    @traced("query")
+    def set_storage_mode(self, mode, stats=False):
+        """Switches a Memgraph database to the given storage mode, e.g., "IN_MEMORY_ANALYTICAL"."""
+        start = time.monotonic()
+        self.run_schema_command(f"STORAGE MODE {mode}")
+        self._print_storage_mode(mode, start, stats)
+
+    def _print_storage_mode(self, mode, start, stats):
+        self._log(f"Storage: Switched to {mode}, completed after {int((time.monotonic() - start) * 1000)} ms.", display=self.verbose or stats)
+
+    @traced("query")
+    def diagnose_nodes(self, stats=True):
+        return self._report_conflicting_nodes(self._execute(capabilities_of(self).read_query(DIAGNOSE_NODES_QUERY)), stats)
+
+    def _report_conflicting_nodes(self, result, stats):
+        records, summary = self._report("diagnose", result, "NodeConflicts: There are currently {count} nodes in the database which have a conflict.", display=self.verbose or stats)
         for r in records:
-            print(" ", self._pretty_print_node(r['n']))
+            self._log("  " + self._pretty_print_node(r['n']), display=self.verbose or stats)
         return len(records)
 
+    def iter_conflicts(self, elements="all", fetch_size=1000, limit=None):
+        """
+        Streams the conflicting output elements, without holding them in memory, unlike `diagnose_nodes` and `diagnose_edges`.
+        Elements are fetched in pages ordered by their identifier, each page resuming after the last identifier of the previous one.
+        If the backend can not index the identifiers of relationships, the conflicting relationships of each type are rather streamed by a single query,
+        `fetch_size` at a time.
+
+        Parameters
+        ----------
+        elements : str
+            "nodes", "edges" or "all".
+        fetch_size : int
+            Number of elements fetched by each query.
+        limit : int
+            If provided, maximum number of conflicts returned.
+
+        Yields
+        ------
+        dtgraph.conflict.Conflict
+            Nodes first, then edges by type.
+        """
+        return self._stream(self._conflict_steps(elements, fetch_size, limit))
+
+    def _conflict_steps(self, elements, fetch_size, limit):
+        capabilities = capabilities_of(self)
+        element_id = capabilities.id_function
+        pages = []
+        if elements in ("nodes", "all"):
+            pages.append(("node", capabilities.read_query(CONFLICTING_NODES_QUERY.format(element_id=element_id)), False))
+        if elements in ("edges", "all"):
+            records, summary = self._report("diagnose", (yield Query(CONFLICTING_EDGE_TYPES_QUERY)))
+            streamed = not capabilities.relationship_indexes
+            query = STREAMED_CONFLICTING_EDGES_QUERY if streamed else CONFLICTING_EDGES_QUERY
+            pages += [("edge", capabilities.read_query(query.format(type=r['type'].replace("`", "``"), element_id=element_id, limit="" if limit is None else "LIMIT $limit")), streamed)
+                      for r in records]
+        count = 0
+        for kind, query, streamed in pages:
+            if streamed:
+                if limit is None or count < limit:
+                    streamed_count, summary = yield Stream(query, {'limit': None if limit is None else limit - count, 'conflict': CONFLICT_VALUE}, fetch_size,
+                                                           lambda r, kind=kind: Conflict.from_record(kind, r))
+                    self._record("diagnose", summary)
+                    count += streamed_count
+                continue
+            after = ""
+            while limit is None or count < limit:
+                size = fetch_size if limit is None else min(fetch_size, limit - count)
+                records, summary = self._report("diagnose", (yield Query(query, {'after': after, 'limit': size, 'conflict': CONFLICT_VALUE})))
+                for r in records:
+                    yield Conflict.from_record(kind, r)
+                count += len(records)
+                if len(records) < size:
+                    break
+                after = records[-1]['id']
+
+    @traced("query")
+    def conflict_summary(self, stats=True):
+        """
+        Counts the conflicts by output label (or relationship type) and property, on the server,
+        with a query scanning the conflicting nodes, then the relationships.
+
+        Returns
+        -------
+        list[dict]
+            Rows with keys 'kind' ("node" or "edge"), 'label', 'key' and 'count', by decreasing count.
+            The label is None for the conflicts of nodes without other labels than bookkeeping ones.
+        """
+        return self._report_conflict_summary(self._execute(*self._conflict_summary_query()), stats)
+
+    def _conflict_summary_query(self):
+        return capabilities_of(self).read_query(CONFLICT_SUMMARY_QUERY), {'conflict': CONFLICT_VALUE, 'bookkeeping': list(BOOKKEEPING_LABELS)}
+
+    def _report_conflict_summary(self, result, stats):
+        rows = sorted([dict(r) for r in result[0]], key=summary_order)
+        self._report("diagnose", result, f"ConflictSummary: {sum([r['count'] for r in rows])} conflicting properties on {{count}} label(s) and type(s) x property.", display=self.verbose or stats)
+        if rows:
+            self._log(format_summary(rows), display=self.verbose or stats)
+        return rows
+
+    def export_conflicts(self, path, elements="all", fetch_size=1000, limit=None, stats=True):
+        """Writes the conflicts streamed by `iter_conflicts` to a JSON lines file, and returns their number."""
+        count = to_jsonl(self.iter_conflicts(elements=elements, fetch_size=fetch_size, limit=limit), path)
+        return self._print_exported_conflicts(count, path, stats)
+
+    def _print_exported_conflicts(self, count, path, stats):
+        self._log(f"Conflicts: Exported {count} conflicting elements to {path}.", display=self.verbose or stats)
+        return count
+
+    def output_keys(self, kind, labels=None, types=None):
+        """Returns the sorted property keys of the nodes or relationships exported by `iter_output`, bookkeeping properties included."""
+        records, summary = self._report("export", self._execute(self._output_query(kind, labels, types, keys=True)))
+        return sorted([r['key'] for r in records])
+
+    def _output_query(self, kind, labels, types, partitioned=False, keys=False):
+        capabilities = capabilities_of(self)
+        return capabilities.read_query(export_query(capabilities, kind, labels, types, partitioned=partitioned, keys=keys))
+
+    def iter_output(self, kind, labels=None, types=None, partition=0, partitions=1, fetch_size=1000):
+        """
+        Streams the nodes or relationships of the output graph, without holding them in memory.
+        Records are pulled from the server `fetch_size` at a time.
+
+        Parameters
+        ----------
+        kind : str
+            "nodes" or "relationships".
+        labels : list[str]
+            Labels of the exported nodes, and of the endpoints of the exported relationships.
+            If None, the output elements of the active transformation are exported.
+        types : list[str]
+            If provided, types of the exported relationships.
+        partition : int
+            Part of the elements to stream, the elements being split by identifier into `partitions` parts.
+
+        Yields
+        ------
+        dict
+            The 'id', 'labels' and 'properties' of nodes, or the 'id', 'type', 'start', 'end' and 'properties' of relationships.
+        """
+        query = self._output_query(kind, labels, types, partitioned=partitions > 1)
+        with self.driver.session(database=self.database, fetch_size=fetch_size) as session:
+            result = session.run(query, {'partitions': partitions, 'partition': partition})
+            for record in result:
+                yield record.data()
+            summary = result.consume()
+        self._record("export", summary)
+
     def _pretty_print_node(self, node, print_conflict = True):
-        str_ = "(" 
+        str_ = "("
         if node.labels:
             str_ += ":"
-        str_ += ":".join([l for l in node.labels if l != "_hasConflict" and l != "_dummy"])
+        str_ += ":".join([l for l in node.labels if l not in ("_hasConflict", "_hasCollision", "_dummy")])
         str_ += " {"
-        str_ += ", ".join([k + ": " + str(v) for k, v in node.items() if k != '_id' and v != "Conflict Detected!"])
+        str_ += ", ".join([k + ": " + str(v) for k, v in node.items() if k not in ('_id', '_key') and v != "Conflict Detected!"])
         str_ += "})"
         if(print_conflict):
             str_ += " has a conflict on attributes ['"
@@ -173,30 +733,32 @@ class Neo4jGraph(object):
             str_ += "']." # It has been generated with parameters: " + node['_id']
         return str_
 
+    @traced("query")
     def diagnose_edges(self, stats=True):
-        diagnose_nodes_query = """
-        MATCH (i)-[r]->(o)
-        WHERE r._hasConflict IS NOT NULL
-        RETURN i, r, o
-        """
-        records, summary, keys = self.driver.execute_query(
-            diagnose_nodes_query,
-            database=self.database)
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"EdgeConflicts: There are currently {len(records)} edges in the database which have a conflict.")
+        return self._report_conflicting_edges(self._execute(capabilities_of(self).read_query(DIAGNOSE_EDGES_QUERY)), stats)
+
+    def _report_conflicting_edges(self, result, stats):
+        records, summary = self._report("diagnose", result, "EdgeConflicts: There are currently {count} edges in the database which have a conflict.", display=self.verbose or stats)
+        for r in records:
+            self._log("  " + self._pretty_print_node(r['i'], print_conflict=False) + self._pretty_print_edge(r['r']) + self._pretty_print_node(r['o'], print_conflict=False)
+                      + "\n" + self._pretty_print_edge_conflicts(r['r']), display=self.verbose or stats)
+        return len(records)
+
+    @traced("query")
+    def diagnose_collisions(self, stats=True):
+        """Reports output elements whose compact identifier is shared with a different Skolem tuple."""
+        return self._report_collisions(self._execute(capabilities_of(self).read_query(DIAGNOSE_COLLISIONS_QUERY)), stats)
+
+    def _report_collisions(self, result, stats):
+        records, summary = self._report("diagnose", result, "Collisions: There are currently {count} elements in the database whose compact id collides with another Skolem tuple.", display=self.verbose or stats)
         for r in records:
-            print(" ",self._pretty_print_node(r['i'], print_conflict=False), end="")
-            print(self._pretty_print_edge(r['r']), end="")
-            print(self._pretty_print_node(r['o'], print_conflict=False))
-            print(self._pretty_print_edge_conflicts(r['r']))
+            self._log(f"  {r['id']} is shared by {r['key']} and at least one other Skolem tuple.", display=self.verbose or stats)
         return len(records)
 
     def _pretty_print_edge(self, edge):
         str_ = "-[:" + edge.type
         str_ += " {"
-        str_ += ", ".join([k + ": " + str(v) for k, v in edge.items() if k != '_id' and k != "_hasConflict" and v != "Conflict Detected!"])
+        str_ += ", ".join([k + ": " + str(v) for k, v in edge.items() if k not in ('_id', '_key', '_hasConflict', '_hasCollision') and v != "Conflict Detected!"])
         str_ += "}]->" # It has been generated with parameters: " + node['_id']
         return str_
 
@@ -208,42 +770,48 @@ class Neo4jGraph(object):
 
     # TODO refactor the code below by pushing into the following functions the logic to handle the differences in how backends define their indexes
     # rename funtions according to PEP8, i.e., add_index
+    @traced("query")
     def addIndex(self, query, stats=False):
-        records, summary, keys = self.driver.execute_query(
-                query,
-                database=self.database,
-                )
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"Index: Added {summary.counters.indexes_added} index, completed after {summary.result_available_after} ms.")
+        self._report("index", self._execute(query), INDEX_ADDED_MESSAGE, display=self.verbose or stats)
 
+    @traced("query")
     def dropIndex(self, query, stats=False):
-        records, summary, keys = self.driver.execute_query(
-                query,
-                database=self.database,
-                )
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"Index: Removed {summary.counters.indexes_removed} index, completed after {summary.result_available_after} ms.") 
+        self._report("index", self._execute(query), INDEX_REMOVED_MESSAGE, display=self.verbose or stats)
 
+    @traced("query")
     def addConstraint(self, query, stats=False):
-        records, summary, keys = self.driver.execute_query(
-                query,
-                database=self.database,
-                )
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"Cns:    Added {summary.counters.constraints_added} constraint, completed after {summary.result_available_after} ms.")
+        self._report("constraint", self._execute(query), CONSTRAINT_ADDED_MESSAGE, display=self.verbose or stats)
 
+    @traced("query")
     def dropConstraint(self, query, stats=False):
-        records, summary, keys = self.driver.execute_query(
-                query,
-                database=self.database,
-                )
-        if(self.verbose):
-            self.print_query_stats(records, summary, keys)
-        if(self.verbose or stats):
-            print(f"Cns:    Removed {summary.counters.constraints_removed} constraint, completed after {summary.result_available_after} ms.") 
\ No newline at end of file
+        self._report("constraint", self._execute(query), CONSTRAINT_REMOVED_MESSAGE, display=self.verbose or stats)
+
+    @traced("query")
+    def await_indexes(self, names, timeout=300, poll_interval=0.5, stats=False):
+        """Blocks until the given indexes (or the indexes backing the given constraints) are ONLINE.
+
+        Raises a RunTimeError if one of them fails to populate, or if the timeout (in seconds) expires.
+        """
+        return self._drive(self._await_index_steps(names, timeout, poll_interval, stats))
+
+    def _await_index_steps(self, names, timeout, poll_interval, stats):
+        if not capabilities_of(self).index_population_async:
+            # e.g., index creation is synchronous on Memgraph
+            return
+        start = time.monotonic()
+        while True:
+            records, summary, keys = yield Query(SHOW_INDEXES_QUERY, {'names': list(names)})
+            if(self.verbose):
+                self.print_query_stats(records, summary, keys)
+            failed = [r['name'] for r in records if r['state'] == "FAILED"]
+            if failed:
+                raise RunTimeError(f"Population of index(es) {', '.join(failed)} failed.")
+            pending = [r for r in records if r['state'] != "ONLINE"]
+            elapsed = time.monotonic() - start
+            if not pending:
+                self._log(f"Index: {len(records)} index(es) online, waited {int(elapsed * 1000)} ms.", display=self.verbose or stats)
+                return
+            if elapsed > timeout:
+                raise RunTimeError(f"Index(es) {', '.join([r['name'] for r in pending])} still not online after {timeout} s.")
+            self._log("Index: Populating " + ", ".join([f"{r['name']} ({r['populationPercent']:.1f}%)" for r in pending]) + "...", display=self.verbose or stats)
+            yield Pause(poll_interval)
@@ -0,0 +1 @@
+from dtgraph.bench.runner import Benchmark, SCENARIOS, compare, load_results
@@ -0,0 +1,63 @@
+"""Command line interface of the benchmark.
+
+    python -m dtgraph.bench --uri bolt://localhost:7687 --database neo4j --sizes 100,1000 --output results.json --baseline baseline.json
+    python -m dtgraph.bench --database memory --sizes 100,1000
+
+Connection settings default to the DTG_* environment variables, as in examples/main.py.
+The command exits with status 1 if a phase regressed with respect to the baseline.
+"""
+import argparse
+import os
+import sys
+
+from dtgraph.bench.runner import Benchmark, SCENARIOS
+
+def connect(args):
+    if args.database == "memory":
+        # the scenarios run in the process, their CSV files being read from the local directory
+        from dtgraph.backend.memory.graph import InMemoryGraph
+        return InMemoryGraph(import_dir=args.csv_root or "output-ibench-data")
+    from dtgraph.backend.neo4j.graph import Neo4jGraph
+    return Neo4jGraph(args.uri, database=args.database, username=args.username, password=args.password)
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog="python -m dtgraph.bench", description="Benchmark of the iBench scenarios.")
+    parser.add_argument("--uri", default=f"{os.getenv('DTG_SCHEME', 'bolt')}://{os.getenv('DTG_HOSTNAME', 'localhost')}:{os.getenv('DTG_PORT', '7687')}")
+    parser.add_argument("--database", default=os.getenv('DTG_DATABASE', "neo4j"), help="neo4j, memgraph, or memory for the in-process backend")
+    parser.add_argument("--username", default=os.getenv('DTG_USERNAME'))
+    parser.add_argument("--password", default=os.getenv('DTG_PASSWORD'))
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated names of scenarios")
+    parser.add_argument("--sizes", default=None, help="comma-separated sizes, defaults to every shipped size")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--csv-root", default=None, help="load the CSV files from this local directory instead of the import directory of the server")
+    parser.add_argument("--load-mode", default="merge", choices=["merge", "create", "indexed"])
+    parser.add_argument("--parallel", type=int, default=None, help="number of concurrent sessions applying the rules")
+    parser.add_argument("--output", default=None, help="path of the JSON results")
+    parser.add_argument("--baseline", default=None, help="path of the JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown above which a phase has regressed")
+    args = parser.parse_args(argv)
+
+    graph = connect(args)
+    benchmark = Benchmark(
+        graph,
+        scenarios = args.scenarios.split(","),
+        sizes = [int(s) for s in args.sizes.split(",")] if args.sizes else None,
+        warmup = args.warmup,
+        iterations = args.iterations,
+        csv_root = args.csv_root,
+        load_mode = args.load_mode,
+        transformation_options = {'parallel': args.parallel} if args.parallel else None)
+    benchmark.run()
+    if args.output:
+        benchmark.to_json(args.output)
+    if args.baseline:
+        regressions = benchmark.compare(args.baseline, threshold=args.threshold)
+        for r in regressions:
+            print(f"Regression: {r['scenario']} ({r['size']}) {r['phase']}: {r['baseline']} ms -> {r['current']} ms (x{r['ratio']:.2f}).")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,630 @@
+"""Reference rule sets of the iBench scenarios, as applied in the demo notebooks (see examples/Demo_iBench_*.ipynb)."""
+
+PERSON_ADDRESS = [
+'''
+MATCH (a:Address)
+GENERATE
+(x = (a.zip, a.city):Person2 {
+    address = a.zip
+})-[():LIVES_AT]->(y = (a):Address2 {
+    zip = a.zip,
+    city = a.city
+})
+''',
+'''
+MATCH (p:Person)
+MATCH (a:Address)
+WHERE p.address = a.zip
+GENERATE
+(x = (p):Person2 {
+    name = p.name,
+    address = p.address
+})-[():LIVES_AT]->(y = (a):Address2 {
+    zip = a.zip,
+    city = a.city
+})
+''',
+]
+
+PERSON_DATA = [
+'''
+MATCH (p:Person)
+MATCH (a:Address) WHERE a.occ = p.name
+MATCH (pl:Place) WHERE pl.occ = p.name
+GENERATE
+(x = (p):Person2 {
+    address = a.zip
+})-[():HAS_ADDRESS]->(y = (a.city):City {
+    city = a.city
+}),
+(x)-[():HAS_PLACE]->(z = (pl.zip):Zip {
+    zip = pl.zip
+})
+''',
+]
+
+FLIGHT_HOTEL = [
+'''
+MATCH (f:Flight), (h:Hotel)
+WHERE f.fid = h.flid
+GENERATE
+(l = (f.src):Location {
+    name = f.src
+})-[():FLIGHTS_TO]->(t = (f.src, f.dest):Travel {
+    from = f.src,
+    to = f.dest
+}),
+(t)-[():FLIGHTS_TO]->(j = (f.dest):Location {
+    name = f.dest
+}),
+(t)-[():HAS_HOTEL]->(m = (h.hid):Hotel2 {
+    name = h.hid
+})
+''',
+]
+
+AMALGAM1_TO_AMALGAM3 = [
+'''
+MATCH (pub:InProcPublished)
+MATCH (ip:InProceedings)
+WHERE pub.inproc = ip.inprocid
+MATCH (a:Author)
+WHERE pub.auth = a.authid
+GENERATE
+(x = (ip):TArticle {
+    articleid = "SK1(" + ip.inprocid + ")",
+    title = ip.title,
+    vol = ip.vol,
+    num = ip.num,
+    pages = ip.pages,
+    month = ip.month,
+    year = ip.year,
+    refkey = "SK2(" + ip.inprocid + ")",
+    note = ip.note,
+    remarks = "SK3(" + ip.inprocid + ")",
+    refs = "SK4(" + ip.inprocid + ")",
+    xxxrefs = "SK5(" + ip.inprocid + ")",
+    fullxxxrefs = "SK6(" + ip.inprocid + ")",
+    oldkey = "SK7(" + ip.inprocid + ")",
+    abstract = "SK8(" + ip.inprocid + ")",
+    preliminary = "SK9(" + ip.inprocid + ")"
+})-[():ARTICLE_PUBLISHED]->(y = (a.authid):Auth {
+    authorid = a.authid,
+    name = a.name
+})
+''',
+'''
+MATCH (ap:ArticlePublished)
+MATCH (art:Article)
+WHERE ap.article = art.articleid
+MATCH (a:Author)
+WHERE ap.auth = a.authid
+GENERATE
+(x = (art):TArticle {
+    articleid = "SK11(" + art.articleid + ")",
+    title = art.title,
+    vol = art.vol,
+    num = art.num,
+    pages = art.pages,
+    month = art.month,
+    year = art.year,
+    refkey = "SK12(" + art.articleid + ")",
+    note = art.note,
+    remarks = "SK13(" + art.articleid + ")",
+    refs = "SK14(" + art.articleid + ")",
+    xxxrefs = "SK15(" + art.articleid + ")",
+    fullxxxrefs = "SK16(" + art.articleid + ")",
+    oldkey = "SK17(" + art.articleid + ")",
+    abstract = "SK18(" + art.articleid + ")",
+    preliminary = "SK19(" + art.articleid + ")"
+})-[():ARTICLE_PUBLISHED]->(y = (a.authid):Auth {
+    authorid = a.authid,
+    name = a.name
+})
+''',
+'''
+MATCH (tp:TechPublished)
+MATCH (t:TechReport)
+WHERE tp.tech = t.techid
+MATCH (a:Author)
+WHERE tp.auth = a.authid
+GENERATE
+(x = (t):TArticle {
+    articleid = "SK21(" + t.techid + ")",
+    title = t.title,
+    vol = t.vol,
+    num = t.num,
+    pages = t.pages,
+    month = t.month,
+    year = t.year,
+    refkey = "SK22(" + t.techid + ")",
+    note = t.note,
+    remarks = "SK23(" + t.techid + ")",
+    refs = "SK24(" + t.techid + ")",
+    xxxrefs = "SK25(" + t.techid + ")",
+    fullxxxrefs = "SK26(" + t.techid + ")",
+    oldkey = "SK27(" + t.techid + ")",
+    abstract = "SK28(" + t.techid + ")",
+    preliminary = "SK29(" + t.techid + ")"
+})-[():ARTICLE_PUBLISHED]->(y = (a.authid):Auth {
+    authorid = a.authid,
+    name = a.name
+})
+''',
+'''
+MATCH (bp:BookPublished)
+MATCH (b:Book)
+WHERE bp.book = b.bookid
+MATCH (a:Author)
+WHERE bp.auth = a.authid
+GENERATE
+(x = (b):TArticle {
+    articleid = "SK31(" + b.bookid + ")",
+    title = b.title,
+    vol = b.vol,
+    num = b.num,
+    pages = b.pages,
+    month = b.month,
+    year = b.year,
+    refkey = "SK32(" + b.bookid + ")",
+    note = b.note,
+    remarks = "SK33(" + b.bookid + ")",
+    refs = "SK34(" + b.bookid + ")",
+    xxxrefs = "SK35(" + b.bookid + ")",
+    fullxxxrefs = "SK36(" + b.bookid + ")",
+    oldkey = "SK37(" + b.bookid + ")",
+    abstract = "SK38(" + b.bookid + ")",
+    preliminary = "SK39(" + b.bookid + ")"
+})-[():ARTICLE_PUBLISHED]->(y = (a.authid):Auth {
+    authorid = a.authid,
+    name = a.name
+})
+''',
+'''
+MATCH (icp:InCollPublished)
+MATCH (i:InCollection)
+WHERE icp.col = i.colid
+MATCH (a:Author)
+WHERE icp.auth = a.authid
+GENERATE
+(x = (i):TArticle {
+    articleid = "SK41(" + i.colid + ")",
+    title = i.title,
+    vol = i.vol,
+    num = i.num,
+    pages = i.pages,
+    month = i.month,
+    year = i.year,
+    refkey = "SK42(" + i.colid + ")",
+    note = i.note,
+    remarks = "SK43(" + i.colid + ")",
+    refs = "SK44(" + i.colid + ")",
+    xxxrefs = "SK45(" + i.colid + ")",
+    fullxxxrefs = "SK46(" + i.colid + ")",
+    oldkey = "SK47(" + i.colid + ")",
+    abstract = "SK48(" + i.colid + ")",
+    preliminary = "SK49(" + i.colid + ")"
+})-[():ARTICLE_PUBLISHED]->(y = (a.authid):Auth {
+    authorid = a.authid,
+    name = a.name
+})
+''',
+'''
+MATCH (mp:MiscPublished)
+MATCH (m:Misc)
+WHERE mp.misc = m.miscid
+MATCH (a:Author)
+WHERE mp.auth = a.authid
+GENERATE
+(x = (m):TArticle {
+    articleid = "SK51(" + m.miscid + ")",
+    title = m.title,
+    vol = m.vol,
+    num = m.num,
+    pages = m.pages,
+    month = m.month,
+    year = m.year,
+    refkey = "SK52(" + m.miscid + ")",
+    note = m.note,
+    remarks = "SK53(" + m.miscid + ")",
+    refs = "SK54(" + m.miscid + ")",
+    xxxrefs = "SK55(" + m.miscid + ")",
+    fullxxxrefs = "SK56(" + m.miscid + ")",
+    oldkey = "SK57(" + m.miscid + ")",
+    abstract = "SK58(" + m.miscid + ")",
+    preliminary = "SK59(" + m.miscid + ")"
+})-[():ARTICLE_PUBLISHED]->(y = (a.authid):Auth {
+    authorid = a.authid,
+    name = a.name
+})
+''',
+'''
+MATCH (mp:ManualPublished)
+MATCH (m:Manual)
+WHERE mp.manual = m.manid
+MATCH (a:Author)
+WHERE mp.auth = a.authid
+GENERATE
+(x = (m):TArticle {
+    articleid = "SK61(" + m.manid + ")",
+    title = m.title,
+    vol = m.vol,
+    num = m.num,
+    pages = m.pages,
+    month = m.month,
+    year = m.year,
+    refkey = "SK62(" + m.manid + ")",
+    note = m.note,
+    remarks = "SK63(" + m.manid + ")",
+    refs = "SK64(" + m.manid + ")",
+    xxxrefs = "SK65(" + m.manid + ")",
+    fullxxxrefs = "SK66(" + m.manid + ")",
+    oldkey = "SK67(" + m.manid + ")",
+    abstract = "SK68(" + m.manid + ")",
+    preliminary = "SK69(" + m.manid + ")"
+})-[():ARTICLE_PUBLISHED]->(y = (a.authid):Auth {
+    authorid = a.authid,
+    name = a.name
+})
+''',
+'''
+MATCH (a:Author)
+GENERATE
+(y = (a.authid):Auth {
+    authorid = a.authid,
+    name = a.name
+})
+''',
+]
+
+DBLP_TO_AMALGAM1 = [
+'''
+MATCH (dip:DInProceedings)
+GENERATE
+(x = (dip):InProceedings {
+    pid = "SK1(" + dip.pid + ")",
+    title = dip.title,
+    bktitle = dip.booktitle,
+    year = dip.year,
+    month = dip.month,
+    pages = dip.pages,
+    vol = "SK2(" + dip.booktitle + "," + dip.year + ")",
+    num = "SK3(" + dip.booktitle + "," + dip.year + "," + dip.month + ")",
+    loc = "SK4(" + dip.booktitle + "," + dip.year + "," + dip.month + ")",
+    class = "SK6(" + dip.pid + ")",
+    note = "SK7(" + dip.pid + ")",
+    annote = "SK8(" + dip.pid + ")"
+})
+''',
+'''
+MATCH (dip:DInProceedings)
+MATCH (pa:PubAuthors)
+WHERE pa.pid = dip.pid
+GENERATE
+(x = (dip):InProceedings {
+    pid = "SK1(" + dip.pid + ")",
+    title = dip.title,
+    bktitle = dip.booktitle,
+    year = dip.year,
+    month = dip.month,
+    pages = dip.pages,
+    vol = "SK2(" + dip.booktitle + "," + dip.year + ")",
+    num = "SK3(" + dip.booktitle + "," + dip.year + "," + dip.month + ")",
+    loc = "SK4(" + dip.booktitle + "," + dip.year + "," + dip.month + ")",
+    class = "SK6(" + dip.pid + ")",
+    note = "SK7(" + dip.pid + ")",
+    annote = "SK8(" + dip.pid + ")"
+})-[():IN_PROC_PUBLISHED]->(au = (pa.author):Author {
+    name = pa.author
+})
+''',
+'''
+MATCH (w:WWW)
+GENERATE
+(m = (w):Misc {
+    miscid = "SK11(" + w.pid + ")",
+    howpub = "SK12(" + w.pid + ")",
+    confloc = "SK13(" + w.pid + ")",
+    year = w.year,
+    month = "SK14(" + w.pid + ")",
+    pages = "SK15(" + w.pid + ")",
+    vol = "SK16(" + w.pid + ")",
+    num = "SK17(" + w.pid + ")",
+    loc = "SK18(" + w.pid + ")",
+    class ="SK19(" + w.pid + ")",
+    note = "SK20(" + w.pid + ")",
+    annote = "SK21(" + w.pid + ")"
+})
+''',
+'''
+MATCH (w:WWW)
+MATCH (pa:PubAuthors)
+WHERE pa.pid = w.pid
+GENERATE
+(m = (w):Misc {
+    miscid = "SK11(" + w.pid + ")",
+    howpub = "SK12(" + w.pid + ")",
+    confloc = "SK13(" + w.pid + ")",
+    year = w.year,
+    month = "SK14(" + w.pid + ")",
+    pages = "SK15(" + w.pid + ")",
+    vol = "SK16(" + w.pid + ")",
+    num = "SK17(" + w.pid + ")",
+    loc = "SK18(" + w.pid + ")",
+    class ="SK19(" + w.pid + ")",
+    note = "SK20(" + w.pid + ")",
+    annote = "SK21(" + w.pid + ")"
+})-[():MISC_PUBLISHED]->(au = (pa.author):Author {
+    name = pa.author
+})
+''',
+'''
+MATCH (da:DArticle)
+GENERATE
+(a = (da):Article {
+    articleid = "SK22(" + da.pid + ")",
+    title = da.title,
+    journal = da.journal,
+    year = da.year,
+    month = da.month,
+    pages = da.pages,
+    vol = da.volume,
+    num = da.number,
+    loc = "SK23(" + da.pid + ")",
+    class = "SK24(" + da.pid + ")",
+    note = "SK25(" + da.pid + ")",
+    annote = "SK26(" + da.pid + ")"
+})
+''',
+'''
+MATCH (da:DArticle)
+MATCH (pa:PubAuthors)
+WHERE pa.pid = da.pid
+GENERATE
+(a = (da):Article {
+    articleid = "SK22(" + da.pid + ")",
+    title = da.title,
+    journal = da.journal,
+    year = da.year,
+    month = da.month,
+    pages = da.pages,
+    vol = da.volume,
+    num = da.number,
+    loc = "SK23(" + da.pid + ")",
+    class = "SK24(" + da.pid + ")",
+    note = "SK25(" + da.pid + ")",
+    annote = "SK26(" + da.pid + ")"
+})-[():ARTICLE_PUBLISHED]->(au = (pa.author):Author {
+    name = pa.author
+})
+''',
+'''
+MATCH (db:DBook)
+GENERATE
+(b = (db):Book {
+    bookID = "SK27(" + db.pid + ")",
+    title = db.title,
+    publisher = db.publisher,
+    year = db.year,
+    month = "SK28(" + db.pid + ")",
+    pages = "SK29(" + db.pid + ")",
+    vol = "SK30(" + db.pid + ")",
+    num = "SK31(" + db.pid + ")",
+    loc = "SK32(" + db.pid + ")",
+    class = "SK33(" + db.pid + ")",
+    note = "SK34(" + db.pid + ")",
+    annote = "SK35(" + db.pid + ")"
+})
+''',
+'''
+MATCH (db:DBook)
+MATCH (pa:PubAuthors)
+WHERE pa.pid = db.pid
+GENERATE
+(b = (db):Book {
+    bookID = "SK27(" + db.pid + ")",
+    title = db.title,
+    publisher = db.publisher,
+    year = db.year,
+    month = "SK28(" + db.pid + ")",
+    pages = "SK29(" + db.pid + ")",
+    vol = "SK30(" + db.pid + ")",
+    num = "SK31(" + db.pid + ")",
+    loc = "SK32(" + db.pid + ")",
+    class = "SK33(" + db.pid + ")",
+    note = "SK34(" + db.pid + ")",
+    annote = "SK35(" + db.pid + ")"
+})-[():BOOK_PUBLISHED]->(au = (pa.author):Author {
+    name = pa.author
+})
+''',
+'''
+MATCH (t:PhDThesis)
+GENERATE
+(m = (t):Misc {
+    miscid = "SK36(" + t.author + "," + t.title + ")",
+    title = t.title,
+    howpub = "SK37(" + t.author + "," + t.title + ")",
+    confloc = "SK38(" + t.author + "," + t.title + ")",
+    year = t.year,
+    month = t.month,
+    pages = "SK39(" + t.author + "," + t.title + ")",
+    vol = "SK40(" + t.author + "," + t.title + ")",
+    num = t.number,
+    loc = "SK41(" + t.author + "," + t.title + ")",
+    class = "SK42(" + t.author + "," + t.title + ")",
+    note = "SK43(" + t.author + "," + t.title + ")",
+    annote = t.school
+})-[():MISC_PUBLISHED]->(au = (t.author):Author {
+    name = t.author
+})
+''',
+'''
+MATCH (t:MasterThesis)
+GENERATE
+(m = (t):Misc {
+    miscid = "SK44(" + t.author + "," + t.title + ")",
+    title = t.title,
+    howpub = "SK45(" + t.author + "," + t.title + ")",
+    confloc = "SK46(" + t.author + "," + t.title + ")",
+    year = t.year,
+    month = "SK47(" + t.author + "," + t.title + ")",
+    pages = "SK48(" + t.author + "," + t.title + ")",
+    vol = "SK49(" + t.author + "," + t.title + ")",
+    num = "SK50(" + t.author + "," + t.title + ")",
+    loc = "SK51(" + t.author + "," + t.title + ")",
+    class = "SK52(" + t.author + "," + t.title + ")",
+    note = "SK53(" + t.author + "," + t.title + ")",
+    annote = t.school
+})-[():MISC_PUBLISHED]->(au = (t.author):Author {
+    name = t.author
+})
+''',
+]
+
+GUS_TO_BIOSQL = [
+'''
+MATCH (gtn:GUSTaxonName)
+MATCH (gt:GUSTaxon)
+WHERE gtn.taxonID = gt.taxonID
+GENERATE
+(x = (gtn.taxonID):BIOSQLTaxonName {
+    name = gtn.name,
+    nameClass = gtn.nameClass
+})-[():TAXON_HAS_NAME]->(y = (gt):BIOSQLTaxon {
+    taxonID = gt.taxonID,
+    ncbiTaxonID = gt.ncbiTaxonID,
+    parentTaxonID = gt.parentTaxonID,
+    nodeRank = gt.rank,
+    geneticCode = gt.geneticCodeID,
+    mitoGeneticCode = gt.mitochondialGeneticCodeID,
+    leftValue = "SK1(" + gt.taxonID + ")",
+    rightValue = "SK2(" + gt.taxonID + ")"
+})
+''',
+'''
+MATCH (gt:GUSTaxon)
+GENERATE
+(x = (gt):BIOSQLTaxon {
+    taxonID = gt.taxonID,
+    ncbiTaxonID = gt.ncbiTaxonID,
+    parentTaxonID = gt.parentTaxonID,
+    nodeRank = gt.rank,
+    geneticCode = gt.geneticCodeID,
+    mitoGeneticCode = gt.mitochondialGeneticCodeID,
+    leftValue = "SK1(" + gt.taxonID + ")",
+    rightValue = "SK2(" + gt.taxonID + ")"
+})
+''',
+'''
+MATCH (gg:GUSGene)
+GENERATE
+(x = (gg):BIOSQLBioEntry {
+    bioEntryID = gg.geneID,
+    bioDatabaseEntry = "SK3(" + gg.geneSymbol + ")",
+    taxonID = "SK4(" + gg.geneID + "," + gg.geneSymbol + "," + gg.geneCategoryID + ")",
+    name = gg.name,
+    accession = gg.geneSymbol,
+    identifier = gg.sequenceOntologyID,
+    division = gg.geneCategoryID,
+    description = gg.description,
+    version = "SK5(" + gg.geneID + "," + gg.reviewStatusID + ")"
+})-[():HAS_TAXON]->(y = (gg.geneID, gg.geneSymbol, gg.geneCategoryID):BIOSQLTaxon {
+    taxonID = "SK4(" + gg.geneID + "," + gg.geneSymbol + "," + gg.geneCategoryID + ")",
+    ncbiTaxonID = "SK6(" + gg.geneID + ")",
+    parentTaxonID = "SK7(" + gg.geneID + ")",
+    nodeRank = "SK8(" + gg.geneID + ")",
+    geneticCode = "SK9(" + gg.geneID + ")",
+    mitoGeneticCode = "SK10(" + gg.geneID + ")",
+    leftValue = "SK11(" + gg.geneID + ")",
+    rightValue ="SK12(" + gg.geneID + ")"
+})
+''',
+'''
+MATCH (ggs:GUSGeneSynonym)
+MATCH (gg:GUSGene)
+WHERE ggs.geneID = gg.geneID
+GENERATE
+(x = (ggs):BIOSQLTermSynonym {
+    synonym = ggs.geneSynonymID,
+    termID = ggs.geneID
+})-[():HAS_SYNONYM]->(y = (gg):BIOSQLTerm {
+    termID = gg.geneID,
+    name = gg.name,
+    definition = gg.description,
+    identifier = "SK13(" + gg.geneID + ")",
+    isObsolete = ggs.isObsolete,
+    ontologyID = "SK15(" + gg.sequenceOntologyID + ")"
+})
+''',
+'''
+MATCH (ggt:GUSGoTerm)
+GENERATE
+(x = (ggt):BIOSQLTerm {
+    termID = ggt.goTermID,
+    name = ggt.name,
+    definition = ggt.definition,
+    identifier = ggt.goID,
+    isObsolete = ggt.isObsolete,
+    ontologyID = "SK15(" + ggt.goTermID + ")"
+})
+''',
+'''
+MATCH (ggs:GUSGoSynonym)
+MATCH (ggt:GUSGoTerm)
+WHERE ggs.goTermID = ggt.goTermID
+GENERATE
+(x = (ggs):BIOSQLTermSynonym {
+    synonym = ggs.goSynonymID,
+    termID = ggs.goTermID
+})-[():HAS_SYNONYM]->(y = (ggt):BIOSQLTerm {
+    termID = ggt.goTermID,
+    name = ggt.name,
+    definition = ggt.definition,
+    identifier = ggt.goID,
+    isObsolete = ggt.isObsolete,
+    ontologyID = "SK15(" + ggt.goTermID + ")"
+})
+''',
+'''
+MATCH (ggr:GUSGoRelationship)
+MATCH (ggt1:GUSGoTerm)
+WHERE ggr.parentTermID = ggt1.goTermID
+MATCH (ggt2:GUSGoTerm)
+WHERE ggr.childTermID = ggt2.goTermID
+GENERATE
+(x = (ggt1):BIOSQLTerm {
+    termID = ggt1.goTermID,
+    name = ggt1.name,
+    definition = ggt1.definition,
+    identifier = ggt1.goID,
+    isObsolete = ggt1.isObsolete,
+    ontologyID = "SK21(" + ggt1.goTermID + ")"
+})-[():TERM_RELATIONSHIP {
+    termRelationshipID = ggr.goRelationshipID,
+    subjectTermID = ggr.parentTermID,
+    predicateTermID = ggr.goRelationshipTypeID,
+    objectTermID = ggr.childTermID,
+    ontologyID = "SK20(" + ggr.goRelationshipID + ")"
+}]->(y = (ggt2):BIOSQLTerm {
+    termID = ggt2.goTermID,
+    name = ggt2.name,
+    definition = ggt2.definition,
+    identifier = ggt2.goID,
+    isObsolete = ggt2.isObsolete,
+    ontologyID = "SK22(" + ggt2.goTermID + ")"
+})
+''',
+'''
+MATCH (gg:GUSGene)
+GENERATE
+(x = (gg):BIoSQLTerm {
+    termID = gg.geneID,
+    name = gg.name,
+    definition = gg.description,
+    identifier = "SK13(" + gg.geneID + ")",
+    isObsolete = "SK18(" + gg.geneID + "," + gg.reviewStatusID + ")",
+    ontologyID = "SK14(" + gg.sequenceOntologyID + ")"
+})
+''',
+]
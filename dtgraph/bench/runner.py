@@ -0,0 +1,208 @@
+"""Benchmark of the iBench scenarios.
+
+This module contains the `Benchmark` class, which loads each scenario at each size through its `Scenario` class,
+applies its reference rules, summarizes its conflicts and ejects the transformation,
+timing each phase over warm-up and measured iterations.
+Results are serialized to JSON, and can be compared against a baseline.
+"""
+import datetime
+import json
+import os
+import statistics
+import time
+
+from dtgraph.rule import Rule
+from dtgraph.transformation import Transformation
+from dtgraph.bench import rules
+from dtgraph.scenarios.ibench_a1ta3 import iBenchAmalgam1ToAmalgam3
+from dtgraph.scenarios.ibench_dta1 import iBenchDBLPToAmalgam1
+from dtgraph.scenarios.ibench_flighthotel import iBenchFlightHotel
+from dtgraph.scenarios.ibench_gtb import iBenchGUSToBIOSQL
+from dtgraph.scenarios.ibench_personaddress import iBenchPersonAddress
+from dtgraph.scenarios.ibench_persondata import iBenchPersonData
+
+SIZES = [100, 200, 500, 1_000, 2_000, 5_000, 10_000, 20_000, 50_000]
+
+# scenario class, reference rules, and sizes of the CSV files shipped in output-ibench-data
+SCENARIOS = {
+    "personaddress": (iBenchPersonAddress, rules.PERSON_ADDRESS, SIZES + [100_000]),
+    "persondata": (iBenchPersonData, rules.PERSON_DATA, SIZES),
+    "flighthotel": (iBenchFlightHotel, rules.FLIGHT_HOTEL, SIZES + [100_000]),
+    "a1ta3": (iBenchAmalgam1ToAmalgam3, rules.AMALGAM1_TO_AMALGAM3, SIZES),
+    "dta1": (iBenchDBLPToAmalgam1, rules.DBLP_TO_AMALGAM1, SIZES),
+    "gtb": (iBenchGUSToBIOSQL, rules.GUS_TO_BIOSQL, SIZES[:-1]),
+}
+
+PHASES = ["load", "apply", "diagnose", "eject"]
+
+class Benchmark(object):
+    """
+    Benchmark of the iBench scenarios on a graph.
+
+    Any graph exposing the methods of `Neo4jGraph` used to load scenarios and to apply, diagnose and eject transformations can be benchmarked,
+    e.g., a Neo4j or a Memgraph instance, or a `dtgraph.backend.memory.graph.InMemoryGraph`, which does not run arbitrary queries.
+
+    Methods
+    -------
+    run()
+        Runs every scenario at every size, and returns the results.
+    to_json(path = None)
+        Serializes the results of the last run.
+    compare(baseline, threshold = 0.2, min_time = 5)
+        Returns the phases whose median time regressed with respect to a baseline.
+    """
+
+    def __init__(self, graph, scenarios = None, sizes = None, warmup = 1, iterations = 3, csv_root = None, load_mode = "merge", sessions = 4, batch_size = 10_000, transformation_options = None):
+        """
+        Parameters
+        ----------
+        graph : dtgraph.backend.neo4j.graph.Neo4jGraph
+            Graph on which the scenarios are loaded and transformed. It is flushed before each iteration.
+        scenarios : list[str]
+            Names of the scenarios (keys of `SCENARIOS`), defaults to all of them.
+        sizes : list[int]
+            Sizes of the inputs, defaults to every size shipped for each scenario. Sizes not shipped for a scenario are skipped.
+        warmup : int
+            Number of iterations run before the measured ones, e.g., to fill the caches of the rules and of the server.
+        iterations : int
+            Number of measured iterations.
+        csv_root, load_mode, sessions, batch_size
+            How the scenarios are loaded, see `Scenario.load`.
+        transformation_options : dict
+            Keyword arguments of the transformations, e.g., {'parallel': 4}.
+        """
+        self.graph = graph
+        self.scenarios = scenarios if scenarios is not None else list(SCENARIOS)
+        for name in self.scenarios:
+            if name not in SCENARIOS:
+                raise ValueError(f"Unknown scenario {name}, expected one of {', '.join(SCENARIOS)}.")
+        self.sizes = sizes
+        self.warmup = warmup
+        self.iterations = iterations
+        self.csv_root = csv_root
+        self.load_mode = load_mode
+        self.sessions = sessions
+        self.batch_size = batch_size
+        self.transformation_options = dict(transformation_options or {})
+        self.results = None
+
+    def run(self) -> dict:
+        results = []
+        for name in self.scenarios:
+            scenario, texts, sizes = SCENARIOS[name]
+            for size in (sizes if self.sizes is None else [s for s in self.sizes if s in sizes]):
+                # rules are compiled once, during the warm-up
+                rule_set = [Rule(text) for text in texts]
+                runs = [self._iteration(scenario, rule_set, size) for _ in range(self.warmup + self.iterations)]
+                results.append(self._aggregate(name, size, runs[self.warmup:]))
+                print(f"Bench: {name} ({size}): " + ", ".join([f"{phase} {results[-1]['phases'][phase]['median']} ms" for phase in PHASES]) + ".")
+        self.results = {
+            'backend': getattr(self.graph, 'database', None),
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'warmup': self.warmup,
+            'iterations': self.iterations,
+            'load_mode': self.load_mode,
+            'transformation_options': self.transformation_options,
+            'results': results,
+        }
+        return self.results
+
+    def _iteration(self, scenario, rule_set, size) -> dict:
+        """Runs every phase once, and returns the wall-clock time (in ms) and the counters of each of them."""
+        phases = {}
+        transformation = Transformation(rule_set, **self.transformation_options)
+        steps = [
+            ("load", lambda: scenario.load(self.graph, size, csv_root=self.csv_root, sessions=self.sessions, batch_size=self.batch_size, mode=self.load_mode)),
+            ("apply", lambda: transformation.apply_on(self.graph)),
+            ("diagnose", lambda: transformation.conflict_summary() if self.transformation_options.get('with_diagnose', True) else None),
+            ("eject", lambda: transformation.eject()),
+        ]
+        for phase, step in steps:
+            metrics = getattr(self.graph, 'metrics', None)
+            position = len(metrics) if metrics is not None else None
+            start = time.perf_counter()
+            step()
+            phases[phase] = {'time': int((time.perf_counter() - start) * 1000)}
+            if metrics is not None:
+                report = metrics.since(position)
+                phases[phase]['server_time'] = report.time
+                phases[phase]['queries'] = len(report)
+                phases[phase]['counters'] = self._counters(report)
+        return phases
+
+    @staticmethod
+    def _counters(report) -> dict:
+        counters = {}
+        for totals in report.totals().values():
+            for k in ('nodes_created', 'relationships_created', 'properties_set', 'labels_added', 'labels_removed', 'nodes_deleted'):
+                counters[k] = counters.get(k, 0) + totals[k]
+        return counters
+
+    @staticmethod
+    def _aggregate(name, size, runs) -> dict:
+        phases = {}
+        for phase in PHASES:
+            times = [run[phase]['time'] for run in runs]
+            phases[phase] = {
+                'times': times,
+                'median': statistics.median(times),
+                'min': min(times),
+                'mean': statistics.mean(times),
+            }
+            if 'server_time' in runs[-1][phase]:
+                phases[phase]['server_time'] = statistics.median([run[phase]['server_time'] for run in runs])
+                phases[phase]['queries'] = runs[-1][phase]['queries']
+                phases[phase]['counters'] = runs[-1][phase]['counters']
+        return {'scenario': name, 'size': size, 'phases': phases}
+
+    def to_json(self, path = None) -> str:
+        text = json.dumps(self.results, indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def compare(self, baseline, threshold = 0.2, min_time = 5) -> list[dict]:
+        """
+        Returns the phases whose median time regressed with respect to a baseline.
+
+        Parameters
+        ----------
+        baseline : dict | str
+            Results of a previous run, or the path of their JSON serialization.
+        threshold : float
+            Relative slowdown above which a phase has regressed, e.g., 0.2 for 20% slower.
+        min_time : int
+            Absolute slowdown (in ms) below which a phase is not considered to have regressed, as such differences are mostly noise.
+        """
+        return compare(self.results, baseline, threshold = threshold, min_time = min_time)
+
+def load_results(path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(results, baseline, threshold = 0.2, min_time = 5) -> list[dict]:
+    """See `Benchmark.compare`. Scenarios, sizes or phases missing from the baseline are ignored."""
+    if isinstance(baseline, (str, os.PathLike)):
+        baseline = load_results(baseline)
+    reference = {(r['scenario'], r['size']): r['phases'] for r in baseline['results']}
+    regressions = []
+    for r in results['results']:
+        phases = reference.get((r['scenario'], r['size']))
+        if phases is None:
+            continue
+        for phase, current in r['phases'].items():
+            if phase not in phases:
+                continue
+            before = phases[phase]['median']
+            after = current['median']
+            if after - before > min_time and after > before * (1 + threshold):
+                regressions.append({
+                    'scenario': r['scenario'],
+                    'size': r['size'],
+                    'phase': phase,
+                    'baseline': before,
+                    'current': after,
+                    'ratio': after / before if before else float("inf"),
+                })
+    return regressions
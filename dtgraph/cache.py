@@ -0,0 +1,164 @@
+"""Compiled rules cache.
+
+This module contains the `RuleCache` class, which stores the openCypher scripts
+obtained by compiling rules, so that repeated transformations can skip both the
+parsing and the compilation steps.
+
+Entries are kept in an in-process LRU cache, and optionally persisted on disk
+(one JSON file per entry) to be shared across processes and sessions.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+# bump this number whenever the output of the compiler changes for a given rule
+_FORMAT_VERSION = 5
+
+# string literals of the DSL and of openCypher, whose whitespaces are significant
+_LITERAL = re.compile(r""""(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'""", re.DOTALL)
+# whitespaces around line breaks, i.e., indentation and blank lines
+_LINE_BREAK = re.compile(r"[ \t\r\f\v]*\n\s*")
+
+class RuleCache(object):
+    """
+    Cache of compiled rules, keyed by the normalized rule source, the backend and the compilation flags.
+
+    Methods
+    -------
+    key(source, database, **flags)
+        Computes the key of a compiled rule.
+    parsed(source), add_parsed(source)
+        Whether the source of a rule is known to be valid, and records that it is.
+    get(key)
+        Returns the cached entry for this key, or None.
+    put(key, entry)
+        Stores an entry in the cache.
+    clear()
+        Removes every entry from the cache, including the ones persisted on disk.
+    """
+
+    def __init__(self, path = None, maxsize = 128):
+        """
+        Initializes a cache.
+
+        Parameters
+        ----------
+        path : str
+            Directory where the entries are persisted. If None, the cache only lives in memory.
+        maxsize : int
+            Maximum number of entries kept in memory; the least recently used entries are evicted first.
+        """
+        self._path = path
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def normalize(source: str) -> str:
+        """Normalizes the source of a rule by removing indentation and blank lines, outside of string literals."""
+        parts = []
+        position = 0
+        for literal in _LITERAL.finditer(source):
+            parts.append(_LINE_BREAK.sub("\n", source[position:literal.start()]))
+            parts.append(literal.group())
+            position = literal.end()
+        parts.append(_LINE_BREAK.sub("\n", source[position:]))
+        return "".join(parts).strip()
+
+    @classmethod
+    def key(cls, source: str, database: str, **flags) -> str:
+        """
+        Computes the key of a compiled rule.
+
+        Parameters
+        ----------
+        source : str
+            Source of the rule, as given to the DSL.
+        database : str
+            Backend the rule is compiled for, i.e., "neo4j" or "memgraph".
+        flags : dict
+            Compilation flags, e.g., with_diagnose, explain, profile, parameterize.
+        """
+        material = json.dumps({
+            'version': _FORMAT_VERSION,
+            'source': cls.normalize(source),
+            'database': database,
+            'flags': flags,
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def parsed(self, source: str) -> bool:
+        """Whether the source of a rule has been parsed successfully by a rule created with this cache, see `add_parsed`."""
+        return self.get(self.key(source, None, parsed=True)) is not None
+
+    def add_parsed(self, source: str):
+        """Records that the source of a rule is valid, so that rules created with this cache defer its parsing until they are compiled."""
+        self.put(self.key(source, None, parsed=True), {'parsed': True})
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: dict):
+        with self._lock:
+            self._remember(key, entry)
+        self._store(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._path is not None:
+            for filename in os.listdir(self._path):
+                if filename.endswith(".json"):
+                    os.remove(os.path.join(self._path, filename))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key: str, entry: dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def _filename(self, key: str) -> str:
+        return os.path.join(self._path, key + ".json")
+
+    def _load(self, key: str):
+        if self._path is None:
+            return None
+        try:
+            with open(self._filename(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # missing or corrupted entries are treated as cache misses
+            return None
+
+    def _store(self, key: str, entry: dict):
+        if self._path is None:
+            return
+        # write then rename, so that concurrent readers never observe a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self._path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._filename(key))
@@ -1,11 +1,36 @@
+import re
+
+from dtgraph.backend.capabilities import Capabilities, profile_for
 from dtgraph.exceptions import CompileError
 
+# a constant expression is a sequence of "constants" and access.keys joined by '+'
+_EXPRESSION_TOKEN = re.compile(r'"[^"]*"|[^\s+]+')
+# digits of the hexadecimal digests returned by the hash functions of the backends
+_HEX_DIGITS = "0123456789abcdef"
+
 class Compiler:
-    def __init__(self, database, with_diagnose = True, explain = False, profile = False):
-        self._database = database
+    def __init__(self, database, with_diagnose = True, explain = False, profile = False, batch_size = None, parameterize = False, compact_ids = False, partitioned = False):
+        """
+        Parameters
+        ----------
+        database : str or dtgraph.backend.capabilities.Capabilities
+            Backend the rules are compiled for, given by name (e.g., "neo4j" or "memgraph") or by its capabilities.
+        """
+        self._capabilities = database if isinstance(database, Capabilities) else profile_for(database)
+        self._database = self._capabilities.name
         self._with_diagnose = with_diagnose
         self._explain = explain
         self._profile = profile
+        if batch_size is not None and batch_size < 1:
+            raise CompileError("The batch size should be a positive integer.")
+        if batch_size is not None and self._capabilities.batching is None:
+            raise CompileError(f"The backend {self._database} does not commit in batches.")
+        self._batch_size = batch_size
+        self._parameterize = parameterize
+        self._compact_ids = compact_ids
+        self._partitioned = partitioned
+        # when parameterized, the values of the constants lifted out of the last compiled script, by parameter name
+        self.parameters = {}
 
     def compile(self, dict) -> str:
         """Compiles a rule.
@@ -22,14 +47,107 @@ class Compiler:
         str
             An openCypher script implementing the transformation described by the input dictionary.
         """
-        aliases = []
-        missing_aliases = []
+        return self.compile_many([dict])
+
+    def compile_many(self, dicts) -> str:
+        """Compiles rules sharing the same lhs into a single script.
+
+        The lhs of the first rule is evaluated once, and the constructors of every rule are applied on its bindings.
+        Aliases of the subsequent rules are renamed to avoid clashes.
+        When there are several rules, the script returns a single row, so that the statistics of each rule can be reported:
+        the number of bindings (`dtgRows`), and for the i-th rule, the number of output nodes (`dtgNodes<i>`)
+        and relationships (`dtgRelationships<i>`) merged by its constructors, counted by constructor.
+        Raises a CompileError if something went wrong.
+
+        Parameters
+        ----------
+        dicts : list[dict]
+            Dictionaries describing rules with equivalent lhs.
+
+        Returns:
+        --------
+        str
+            An openCypher script implementing the transformation described by all the input dictionaries.
+        """
+        for i, dict in enumerate(dicts[1:], start=1):
+            self._rename_aliases(dict, f"r{i}_")
+        self.parameters = {}
         script = "" 
         if self._explain:
             script += "EXPLAIN "
         if self._profile:
             script += "PROFILE "
-        script += dict['lhs'].strip() + "\n"
+        # e.g., Memgraph commits periodically through a pre-query directive
+        if self._batch_size and self._capabilities.batching == "periodic_commit":
+            script += f"USING PERIODIC COMMIT {self._batch_size}\n"
+        script += dicts[0]['lhs'].strip() + "\n"
+        # aliases are shared by all the rules so that generated aliases are unique
+        aliases = []
+        self._edge_aliases = []
+        variables = []
+        for dict in dicts:
+            variables.extend([v for v in self._lhs_variables(dict) if v not in variables])
+        if self._partitioned:
+            # partitions merge elements concurrently, hence only a uniqueness constraint prevents two of them from creating the same element
+            if not self._capabilities.key_constraints:
+                raise CompileError(f"Rules can not be partitioned on {self._capabilities.name}, which has no uniqueness constraint on the identifiers of output elements.")
+            if not variables:
+                raise CompileError("Only rules whose constructors reference the lhs can be partitioned.")
+            variable = self._partition_variable(dicts[0], variables)
+            script += f"WITH {', '.join(variables)}\nWHERE {self._capabilities.numeric_id(variable)} % $dtgPartitions = $dtgPartition\n"
+        if self._batch_size and self._capabilities.batching == "call_in_transactions":
+            # e.g., on Neo4j, the MERGE section is executed per LHS binding in its own batch of transactions
+            script += "CALL {\n"
+            if variables:
+                script += "WITH " + ", ".join(variables) + "\n"
+            members = [] # position in aliases of the first alias of each rule
+            for dict in dicts:
+                members.append(len(aliases))
+                script += self._process_constructors(dict, aliases)
+            if len(dicts) > 1:
+                # the merged elements are returned by the subquery, to be counted per rule
+                script += "RETURN " + ", ".join(aliases) + "\n"
+            script += f"}} IN TRANSACTIONS OF {self._batch_size} ROWS\n"
+        else:
+            members = [] # position in aliases of the first alias of each rule
+            for dict in dicts:
+                members.append(len(aliases))
+                script += self._process_constructors(dict, aliases)
+        if len(dicts) > 1:
+            script += self._member_counts(members, aliases)
+        return script
+
+    def _member_counts(self, members: list[int], aliases: list[str]) -> str:
+        """Returns the clause counting the bindings, and the elements merged by the constructors of each of the fused rules."""
+        columns = ["count(*) AS dtgRows"]
+        for i, start in enumerate(members):
+            end = members[i + 1] if i + 1 < len(members) else len(aliases)
+            nodes = [a for a in aliases[start:end] if a not in self._edge_aliases]
+            edges = [a for a in aliases[start:end] if a in self._edge_aliases]
+            columns.append(" + ".join([f"count(DISTINCT {a})" for a in nodes] or ["0"]) + f" AS dtgNodes{i}")
+            columns.append(" + ".join([f"count(DISTINCT {a})" for a in edges] or ["0"]) + f" AS dtgRelationships{i}")
+        return "RETURN " + ", ".join(columns) + "\n"
+
+    @property
+    def batched(self) -> bool:
+        """Whether the compiled scripts commit in batches, and thus require an implicit transaction."""
+        return self._batch_size is not None
+
+    def _rename_aliases(self, dict, prefix: str):
+        def rename(element):
+            if element is not None and element.get('alias'):
+                element['alias'] = prefix + element['alias']
+        for constructor in dict.get('constructors'):
+            if constructor.get('edge'):
+                rename(constructor.get('src'))
+                rename(constructor.get('edge'))
+                rename(constructor.get('tgt'))
+            else:
+                rename(constructor)
+
+    def _process_constructors(self, dict, aliases: list[str]) -> str:
+        missing_aliases = []
+        script = ""
         # handle first the node constructors; including node constructors found in edge constructors
         for constructor in dict.get('constructors'):
             src, tgt = constructor.get('src'), constructor.get('tgt')
@@ -47,6 +165,44 @@ class Compiler:
                 script += self._process_edge_constructor(edge, aliases, src.get('alias'), tgt.get('alias'))
         return script
 
+    def _partition_variable(self, dict, variables: list[str]) -> str:
+        """Returns the variable splitting the bindings of a partitioned rule.
+
+        Bindings are split by the first element of the lhs the Skolem tuple of the first output node references,
+        so that the bindings merging the same such node are processed by the same partition, rather than contending for it.
+        Defaults to the first variable referenced by the constructors.
+        """
+        constructor = dict.get('constructors')[0]
+        node = constructor.get('src') if constructor.get('edge') else constructor
+        for id in (node or {}).get('ids') or []:
+            if id[0].islower() and '.' not in id and id in variables:
+                return id
+        return variables[0]
+
+    def _lhs_variables(self, dict) -> list[str]:
+        """Lists the variables of the lhs that are referenced by the constructors, in order of appearance."""
+        variables = []
+        def visit(element):
+            if element is None:
+                return
+            expressions = list(element.get('ids', []))
+            expressions.extend([p['value'] for p in element.get('properties', [])])
+            for expression in expressions:
+                for token in _EXPRESSION_TOKEN.findall(expression):
+                    # constants and labels do not reference the lhs
+                    if token[0].islower():
+                        variable = token.split('.')[0]
+                        if variable not in variables:
+                            variables.append(variable)
+        for constructor in dict.get('constructors'):
+            if constructor.get('edge'):
+                visit(constructor.get('src'))
+                visit(constructor.get('edge'))
+                visit(constructor.get('tgt'))
+            else:
+                visit(constructor)
+        return variables
+
     def _process_edge_constructor(self, edge, aliases: list[str], src_alias: str, tgt_alias: str) -> str:
         alias = edge.get('alias')
         ids = edge.get('ids')
@@ -55,6 +211,7 @@ class Compiler:
             raise CompileError("Using alias in edge constructor is forbidden.")
         alias = f"x_{len(aliases)}"
         aliases.append(alias)
+        self._edge_aliases.append(alias)
         edge['alias'] = alias
         labels = edge.get('labels')
         properties = edge.get('properties')
@@ -67,6 +224,7 @@ class Compiler:
         script += self._process_ids(idsE)
         script += f' \n}}]->({tgt_alias})\n'
         script += self._process_properties(alias, labels, properties, setLabels=False)
+        script += self._collision_check(alias, idsE, isNode=False)
         return script
 
     def _process_node_constructor(self, node, aliases: list[str], missing_aliases: list[str]) -> str:
@@ -94,27 +252,76 @@ class Compiler:
             script += self._process_ids(ids)
             script += f' \n}})\n'
             script += self._process_properties(alias, labels, properties)
+            script += self._collision_check(alias, ids)
         return script
 
     def _process_ids(self, ids: list[str]) -> str:
-        script = f'_id: "("'
+        if self._compact_ids:
+            # a fixed-width hash of the Skolem tuple keeps the index on _id small
+            return f'_id: {self._fold(f"{self._capabilities.hash_function}([{self._skolem(ids)}])")}'
+        return f'_id: {self._skolem(ids)}'
+
+    def _fold(self, digest: str) -> str:
+        """Returns the expression folding the first 120 bits of a hexadecimal digest into a pair of (60 bits) integers."""
+        def part(start):
+            return f'reduce(v = 0, i IN range({start}, {start + 14}) | v * 16 + size(split("{_HEX_DIGITS}", substring(h, i, 1))[0]))'
+        return f'[h IN [toLower({digest})] | [{part(0)}, {part(15)}]][0]'
+
+    def _skolem(self, ids: list[str]) -> str:
+        script = '"("'
         if ids:
             script += ' + '
         script += f'{ """ + "," + """.join(map(self._wrap_id, ids)) } + ")"'
         return script
 
+    def _collision_check(self, alias: str, ids: list[str], isNode: bool = True) -> str:
+        """With compact ids, keeps the Skolem tuple of the element to detect hash collisions in diagnose mode."""
+        if not (self._compact_ids and self._with_diagnose):
+            return ""
+        skolem = self._skolem(ids)
+        script = f"SET {alias}._key = coalesce({alias}._key, {skolem})\n"
+        script += f"FOREACH (i in CASE WHEN {alias}._key <> {skolem} THEN [1] else [] END | "
+        if isNode:
+            script += "SET " + alias + ":_hasCollision"
+        else:
+            script += "SET " + alias + "._hasCollision = True"
+        script += ")\n"
+        return script
+
     def _wrap_id(self, id: str) -> str:
         # id[0].islower() rules out both Labels and "constants"; the last check rules out access.keys
         if id[0].islower() and '.' not in id:
-            return ("element" if self._database == "neo4j" else "") + "ID(" + id + ")"
+            return self._capabilities.id_function + "(" + id + ")"
         # labels should get enclosed into quotes; we add leading and trailing colons for labels
         elif id[0].isupper():
-            return '":' + id + ':"'
+            return self._constant('":' + id + ':"')
+        elif id[0] == '"':
+            return self._constant(id)
         else:
             return id
 
+    def _constant(self, constant: str) -> str:
+        """Returns the given "constant", or the parameter standing for it if the compiler is parameterized."""
+        if not self._parameterize:
+            return constant
+        value = constant[1:-1]
+        for name, v in self.parameters.items():
+            if v == value:
+                return "$" + name
+        name = f"p{len(self.parameters)}"
+        self.parameters[name] = value
+        return "$" + name
+
+    def _expression(self, expression: str) -> str:
+        """Returns the given constant expression, where constants are replaced by parameters if the compiler is parameterized."""
+        if not self._parameterize:
+            return expression
+        return " + ".join([self._constant(t) if t[0] == '"' else t for t in _EXPRESSION_TOKEN.findall(expression)])
+
     def _process_properties(self, alias: str, labels: list[str], properties: list[dict[str, str]], setLabels: bool = True) -> str:
         script = ""
+        if properties:
+            properties = [{'key': p['key'], 'value': self._expression(p['value'])} for p in properties]
         if (setLabels and labels) or properties:
             script += f'ON CREATE\n'
             if setLabels and labels:
@@ -0,0 +1,105 @@
+"""Conflicts of transformations.
+
+This module contains the `Conflict` class, a compact record of an output element on which rules disagree,
+as streamed by `Neo4jGraph.iter_conflicts`, and the export of such records as JSON lines.
+"""
+import json
+
+# value set by the compiled rules on conflicting properties
+CONFLICT_VALUE = "Conflict Detected!"
+
+# labels used for bookkeeping, which are not reported as labels of conflicting nodes
+BOOKKEEPING_LABELS = ("_dummy", "_hasConflict", "_hasCollision", "_dtgNew")
+
+class Conflict(object):
+    """
+    Output element with at least one conflicting property.
+
+    Attributes
+    ----------
+    kind : str
+        "node" or "edge".
+    id : str
+        Identifier of the element assigned by the transformation, i.e., its Skolem tuple or its hash.
+    element_id : str | int
+        Identifier of the element assigned by the server.
+    labels : list[str]
+        Labels of the node, without bookkeeping labels, or type of the edge.
+    keys : list[str]
+        Conflicting properties.
+    """
+
+    __slots__ = ("kind", "id", "element_id", "labels", "keys")
+
+    def __init__(self, kind, id, element_id, labels, keys):
+        self.kind = kind
+        self.id = id
+        self.element_id = element_id
+        self.labels = labels
+        self.keys = keys
+
+    @classmethod
+    def from_record(cls, kind, record):
+        labels = [record['type']] if kind == "edge" else [l for l in record['labels'] if l not in BOOKKEEPING_LABELS]
+        return cls(kind, record['id'], record['element_id'], labels, sorted(record['keys']))
+
+    def to_dict(self) -> dict:
+        return {'kind': self.kind, 'id': self.id, 'element_id': self.element_id, 'labels': self.labels, 'keys': self.keys}
+
+    def __repr__(self):
+        return f"Conflict({self.kind}, {self.id!r}, labels={self.labels}, keys={self.keys})"
+
+def summary_order(row):
+    """Sorts the rows of a conflict summary by decreasing count, nodes without label (i.e., a null label) coming first."""
+    return (-row['count'], row['kind'], row['label'] or "", row['key'])
+
+def format_summary(rows) -> str:
+    """Formats the rows of a conflict summary (see `Neo4jGraph.conflict_summary`) as a table, null labels being printed as "-"."""
+    if not rows:
+        return ""
+    width = max([len(r['label'] or "-") for r in rows] + [len("label")])
+    key_width = max([len(r['key']) for r in rows] + [len("property")])
+    lines = [f"  {'kind':<4}  {'label':<{width}}  {'property':<{key_width}}  count"]
+    for r in rows:
+        lines.append(f"  {r['kind']:<4}  {r['label'] or '-':<{width}}  {r['key']:<{key_width}}  {r['count']}")
+    return "\n".join(lines)
+
+def print_summary(rows):
+    """Prints the rows of a conflict summary as a table, see `format_summary`."""
+    if rows:
+        print(format_summary(rows))
+
+def to_jsonl(conflicts, path) -> int:
+    """
+    Writes conflicts as JSON lines, one per element, while they are streamed.
+
+    Parameters
+    ----------
+    conflicts : iterable[Conflict]
+        Conflicts to export, e.g., as returned by `Neo4jGraph.iter_conflicts`.
+    path : str
+        Path of the output file.
+
+    Returns
+    -------
+    int
+        Number of exported conflicts.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for conflict in conflicts:
+            f.write(_jsonl_line(conflict))
+            count += 1
+    return count
+
+async def to_jsonl_async(conflicts, path) -> int:
+    """See `to_jsonl`. The conflicts are given by an asynchronous iterable, e.g., as returned by `AsyncNeo4jGraph.iter_conflicts`."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        async for conflict in conflicts:
+            f.write(_jsonl_line(conflict))
+            count += 1
+    return count
+
+def _jsonl_line(conflict) -> str:
+    return json.dumps(conflict.to_dict(), default=str) + "\n"
@@ -24,4 +24,10 @@ class TransformationDeactivationError(DTGraphException):
     """Error in transformation deactivation."""
 
 class TransformationDiagnosisError(DTGraphException):
-    """Error in transformation diagnosis."""
\ No newline at end of file
+    """Error in transformation diagnosis."""
+
+class PlanError(DTGraphException):
+    """Error in rule planning."""
+
+class TransformationExportError(DTGraphException):
+    """Error in transformation export."""
@@ -0,0 +1,226 @@
+"""Export of output graphs.
+
+This module writes the nodes and relationships streamed by `Neo4jGraph.iter_output` to files, in batches,
+so that the memory of the client is bounded whatever the size of the graph. The supported formats are:
+- "csv": the files of `neo4j-admin database import`, i.e., `nodes-<i>.csv` files with `:ID` and `:LABEL` columns
+  and `relationships-<i>.csv` files with `:START_ID`, `:END_ID` and `:TYPE` columns, followed by a column per property;
+- "jsonl": a JSON object per element;
+- "parquet": a row per element, properties being encoded as JSON since their types may differ between elements.
+  This format requires pyarrow.
+
+Elements are split by identifier into partitions, each read by its own session and written to its own files.
+The files of all partitions are then imported at once, e.g., `neo4j-admin database import full --nodes=nodes-0.csv --nodes=nodes-1.csv ...`.
+"""
+import asyncio
+import contextvars
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dtgraph.conflict import BOOKKEEPING_LABELS
+from dtgraph.exceptions import TransformationExportError
+from dtgraph.metrics import log
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+KINDS = ("nodes", "relationships")
+
+# properties used for bookkeeping, which are not exported
+BOOKKEEPING_PROPERTIES = ("_id", "_key", "_hasConflict", "_hasCollision")
+
+def _clean(record) -> dict:
+    """Removes the bookkeeping labels and properties of an exported element, and turns its identifiers into strings."""
+    record = dict(record)
+    for key in ('id', 'start', 'end'):
+        if key in record:
+            record[key] = str(record[key])
+    if 'labels' in record:
+        record['labels'] = [l for l in record['labels'] if l not in BOOKKEEPING_LABELS]
+    record['properties'] = {k: v for k, v in record['properties'].items() if k not in BOOKKEEPING_PROPERTIES}
+    return record
+
+def _csv_value(value) -> str:
+    # arrays are separated by the default delimiter of neo4j-admin
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ";".join([_csv_value(v) for v in value])
+    return str(value)
+
+class CsvWriter(object):
+    """Writes elements to a CSV file of `neo4j-admin database import`, with a column per property key."""
+
+    def __init__(self, path, kind, keys):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._kind = kind
+        self._keys = keys
+        header = [":ID", ":LABEL"] if kind == "nodes" else [":START_ID", ":END_ID", ":TYPE"]
+        self._writer.writerow(header + keys)
+
+    def write(self, records):
+        rows = []
+        for r in records:
+            row = [r['id'], ";".join(r['labels'])] if self._kind == "nodes" else [r['start'], r['end'], r['type']]
+            rows.append(row + [_csv_value(r['properties'].get(k)) for k in self._keys])
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+class JsonlWriter(object):
+    """Writes elements as JSON lines."""
+
+    def __init__(self, path, kind, keys):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, records):
+        self._file.write("".join([json.dumps(r, default=str) + "\n" for r in records]))
+
+    def close(self):
+        self._file.close()
+
+class ParquetWriter(object):
+    """Writes elements to a Parquet file, a row group per batch."""
+
+    def __init__(self, path, kind, keys):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise TransformationExportError("Exporting to Parquet requires pyarrow, which can be installed with `pip install pyarrow`.") from e
+        self._pyarrow = pyarrow
+        if kind == "nodes":
+            fields = [("id", pyarrow.string()), ("labels", pyarrow.list_(pyarrow.string())), ("properties", pyarrow.string())]
+        else:
+            fields = [("id", pyarrow.string()), ("type", pyarrow.string()), ("start", pyarrow.string()), ("end", pyarrow.string()), ("properties", pyarrow.string())]
+        self._schema = pyarrow.schema(fields)
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, records):
+        rows = [dict(r, properties=json.dumps(r['properties'], default=str)) for r in records]
+        self._writer.write_table(self._pyarrow.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+def _check(format, partitions, batch_size):
+    if format not in FORMATS:
+        raise TransformationExportError(f"Unknown export format {format}, expected one of {', '.join(FORMATS)}.")
+    if partitions < 1 or batch_size < 1:
+        raise TransformationExportError("The number of partitions and the batch size should be positive integers.")
+
+def _kinds(types) -> tuple:
+    # an empty list of types selects no relationship
+    return KINDS if types is None or types else KINDS[:1]
+
+def _keys(keys) -> list[str]:
+    return [k for k in keys if k not in BOOKKEEPING_PROPERTIES]
+
+def _report(graph, path, format, counts, files, start, stats):
+    report = {'nodes': counts.get("nodes", 0), 'relationships': counts.get("relationships", 0), 'files': sorted(files)}
+    log(graph, f"Export: Wrote {report['nodes']} nodes and {report['relationships']} relationships to {len(files)} {format} file(s) in {path}, "
+        f"completed after {int((time.monotonic() - start) * 1000)} ms.", display=stats)
+    return report
+
+def _export_part(graph, path, format, kind, labels, types, keys, partition, partitions, batch_size) -> tuple[str, int]:
+    """Streams a partition of the nodes or relationships into its own file, and returns the path of the file and the number of elements."""
+    file = os.path.join(path, f"{kind}-{partition}.{format}")
+    writer = WRITERS[format](file, kind, keys)
+    count = 0
+    try:
+        batch = []
+        for record in graph.iter_output(kind, labels=labels, types=types, partition=partition, partitions=partitions, fetch_size=batch_size):
+            batch.append(_clean(record))
+            if len(batch) == batch_size:
+                writer.write(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    return file, count
+
+def export_graph(graph, path, format = "csv", labels = None, types = None, partitions = 4, batch_size = 10_000, stats = True) -> dict:
+    """
+    Writes the nodes and relationships of a graph to files in the directory `path`, one file per kind of element and partition.
+
+    Parameters
+    ----------
+    graph : dtgraph.backend.neo4j.graph.Neo4jGraph
+        Graph streaming the elements, see `Neo4jGraph.iter_output`.
+    format : str
+        One of `FORMATS`.
+    labels : list[str]
+        Labels of the exported nodes, and of the endpoints of the exported relationships.
+        If None, the output elements of the transformation active on the graph are exported.
+    types : list[str]
+        If provided, types of the exported relationships.
+    partitions : int
+        Number of parts the elements are split into by identifier, each read by its own thread.
+    batch_size : int
+        Number of elements fetched from the server, and written to the file, at once.
+
+    Returns
+    -------
+    dict
+        The number of exported 'nodes' and 'relationships', and the paths of the written 'files'.
+    """
+    _check(format, partitions, batch_size)
+    start = time.monotonic()
+    os.makedirs(path, exist_ok=True)
+    kinds = _kinds(types)
+    keys = {kind: _keys(graph.output_keys(kind, labels=labels, types=types)) if format == "csv" else [] for kind in kinds}
+    counts, files = {}, []
+    with ThreadPoolExecutor(max_workers=partitions) as executor:
+        # each reader runs in a copy of the current context, hence its spans are nested in the span of the export
+        futures = [(kind, executor.submit(contextvars.copy_context().run, _export_part, graph, path, format, kind, labels, types, keys[kind], partition, partitions, batch_size))
+                   for kind in kinds for partition in range(partitions)]
+        for kind, future in futures:
+            file, count = future.result()
+            files.append(file)
+            counts[kind] = counts.get(kind, 0) + count
+    return _report(graph, path, format, counts, files, start, stats)
+
+async def _export_part_async(graph, path, format, kind, labels, types, keys, partition, partitions, batch_size) -> tuple[str, int]:
+    """See `_export_part`."""
+    file = os.path.join(path, f"{kind}-{partition}.{format}")
+    writer = WRITERS[format](file, kind, keys)
+    count = 0
+    try:
+        batch = []
+        async for record in graph.iter_output(kind, labels=labels, types=types, partition=partition, partitions=partitions, fetch_size=batch_size):
+            batch.append(_clean(record))
+            if len(batch) == batch_size:
+                writer.write(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    return file, count
+
+async def export_graph_async(graph, path, format = "csv", labels = None, types = None, partitions = 4, batch_size = 10_000, stats = True) -> dict:
+    """See `export_graph`. Partitions are read by concurrent tasks from a `dtgraph.backend.neo4j.async_graph.AsyncNeo4jGraph`."""
+    _check(format, partitions, batch_size)
+    start = time.monotonic()
+    os.makedirs(path, exist_ok=True)
+    kinds = _kinds(types)
+    keys = {kind: _keys(await graph.output_keys(kind, labels=labels, types=types)) if format == "csv" else [] for kind in kinds}
+    parts = [(kind, partition) for kind in kinds for partition in range(partitions)]
+    results = await asyncio.gather(*[_export_part_async(graph, path, format, kind, labels, types, keys[kind], partition, partitions, batch_size) for kind, partition in parts])
+    counts, files = {}, []
+    for (kind, _), (file, count) in zip(parts, results):
+        files.append(file)
+        counts[kind] = counts.get(kind, 0) + count
+    return _report(graph, path, format, counts, files, start, stats)
@@ -0,0 +1,313 @@
+"""Hand-written parser for the DSL.
+
+This module contains a recursive-descent parser for transformation rules.
+It recognizes the same language as the pyparsing grammar of `dtgraph.parser`,
+which remains the reference implementation, and produces exactly the same
+dictionaries (i.e., those obtained with `parseString(..., parseAll=True).asDict()`).
+It is however an order of magnitude faster, which matters for large rule sets.
+
+Functions
+---------
+parse_rule(text)
+    Parses an entire rule, i.e., a lhs followed by a rhs.
+parse_rhs(text)
+    Parses the rhs of a rule.
+parse_lhs(text)
+    Parses the node patterns of the lhs of a rule.
+"""
+import re
+
+from dtgraph.exceptions import ParseError
+
+# whitespaces skipped between tokens, as in pyparsing
+_WHITESPACE = re.compile(r"[ \n\t\r]*")
+# characters preventing a keyword to match when immediately preceding or following it
+_KEYWORD_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_$")
+
+_CONSTANT = re.compile(r'"[^"\n\r]*"')
+_ACCESSKEY = re.compile(r"[a-z][A-Za-z0-9_]*\.[A-Za-z][A-Za-z0-9_]*")
+_FREEVAR = re.compile(r"[a-z][A-Za-z0-9_]*")
+_ATTRIBUTE = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+_LABEL = re.compile(r"[A-Z][A-Za-z0-9_]*")
+
+# tokens of a lhs (i.e., of an openCypher read query): comments, string literals, escaped names, identifiers, numbers and symbols
+_LHS_TOKEN = re.compile(r"""(?P<comment>//[^\n]*|/\*.*?\*/)|(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|(?P<name>`[^`]*`)|(?P<identifier>[A-Za-z_][A-Za-z0-9_$]*)|(?P<number>[0-9][0-9.]*)|(?P<symbol>\S)""", re.DOTALL)
+# clauses ending a `MATCH` clause
+_LHS_CLAUSES = frozenset(["MATCH", "OPTIONAL", "WHERE", "WITH", "UNWIND", "CALL", "RETURN", "UNION"])
+
+class _Failure(Exception):
+    """Internal backtracking signal."""
+
+class _Parser(object):
+    """Recursive-descent parser over a single input string."""
+
+    def __init__(self, text):
+        # pyparsing expands tabs before parsing
+        self.text = text.expandtabs()
+        # furthest failure, for error reporting
+        self.error_pos = -1
+        self.error_msg = None
+
+    def fail(self, pos, expected):
+        if pos > self.error_pos:
+            self.error_pos = pos
+            self.error_msg = expected
+        raise _Failure()
+
+    def skip(self, pos):
+        return _WHITESPACE.match(self.text, pos).end()
+
+    def literal(self, pos, literal):
+        pos = self.skip(pos)
+        if not self.text.startswith(literal, pos):
+            self.fail(pos, f"'{literal}'")
+        return pos + len(literal)
+
+    def token(self, pos, regex, expected):
+        pos = self.skip(pos)
+        match = regex.match(self.text, pos)
+        if match is None:
+            self.fail(pos, expected)
+        return match.group(), match.end()
+
+    def delimited(self, pos, element):
+        """Parses a comma-separated list of elements, allowing a trailing delimiter."""
+        value, pos = element(pos)
+        values = [value]
+        while True:
+            try:
+                after = self.literal(pos, ",")
+            except _Failure:
+                return values, pos
+            try:
+                value, pos = element(after)
+            except _Failure:
+                # trailing delimiter
+                return values, after
+            values.append(value)
+
+    def id_element(self, pos):
+        pos = self.skip(pos)
+        for regex in (_CONSTANT, _ACCESSKEY, _FREEVAR, _LABEL):
+            match = regex.match(self.text, pos)
+            if match is not None:
+                return match.group(), match.end()
+        self.fail(pos, "a constant, an access key, a variable or a label")
+
+    def id_tuple(self, pos):
+        pos = self.literal(pos, "(")
+        try:
+            ids, pos = self.delimited(pos, self.id_element)
+        except _Failure:
+            ids = []
+        pos = self.literal(pos, ")")
+        return ids, pos
+
+    def operand(self, pos):
+        pos = self.skip(pos)
+        match = _ACCESSKEY.match(self.text, pos) or _CONSTANT.match(self.text, pos)
+        if match is None:
+            self.fail(pos, "a constant or an access key")
+        return match.group(), match.end()
+
+    def const_expression(self, pos):
+        operand, pos = self.operand(pos)
+        tokens = [operand]
+        while True:
+            try:
+                after = self.literal(pos, "+")
+                operand, after = self.operand(after)
+            except _Failure:
+                return " ".join(tokens), pos
+            tokens.extend(("+", operand))
+            pos = after
+
+    def property_element(self, pos):
+        key, pos = self.token(pos, _ATTRIBUTE, "a property name")
+        pos = self.literal(pos, "=")
+        value, pos = self.const_expression(pos)
+        return {'key': key, 'value': value}, pos
+
+    def label(self, pos):
+        return self.token(pos, _LABEL, "a label")
+
+    def content_constructor(self, pos):
+        content = {}
+        try:
+            alias, after = self.token(pos, _FREEVAR, "a variable")
+            pos = self.literal(after, "=")
+            content['alias'] = alias
+        except _Failure:
+            pass
+        content['ids'], pos = self.id_tuple(pos)
+        pos = self.literal(pos, ":")
+        try:
+            content['labels'], pos = self.delimited(pos, self.label)
+        except _Failure:
+            pass
+        try:
+            after = self.literal(pos, "{")
+            properties, after = self.delimited(after, self.property_element)
+            pos = self.literal(after, "}")
+            content['properties'] = properties
+        except _Failure:
+            pass
+        return content, pos
+
+    def node_constructor(self, pos):
+        pos = self.literal(pos, "(")
+        try:
+            node, pos = self.content_constructor(pos)
+        except _Failure:
+            alias, pos = self.token(pos, _FREEVAR, "a variable")
+            node = {'alias': alias}
+        pos = self.literal(pos, ")")
+        return node, pos
+
+    def constructor(self, pos):
+        node, pos = self.node_constructor(pos)
+        try:
+            after = self.literal(pos, "-[")
+            edge, after = self.content_constructor(after)
+            after = self.literal(after, "]->")
+            tgt, after = self.node_constructor(after)
+            return {'src': node, 'edge': edge, 'tgt': tgt}, after
+        except _Failure:
+            pass
+        try:
+            after = self.literal(pos, "<-[")
+            edge, after = self.content_constructor(after)
+            after = self.literal(after, "]-")
+            src, after = self.node_constructor(after)
+            return {'tgt': node, 'edge': edge, 'src': src}, after
+        except _Failure:
+            pass
+        return node, pos
+
+    def rhs(self, pos):
+        constructors, pos = self.delimited(pos, self.constructor)
+        return {'constructors': constructors}, pos
+
+    def middle_delimiter(self, pos):
+        """Finds the first occurrence of the keyword '=>' or 'GENERATE' (case insensitive), from pos."""
+        text = self.text
+        length = len(text)
+        for match in re.finditer(r"=>|(?i:generate)", text[pos:]):
+            start = pos + match.start()
+            end = pos + match.end()
+            if match.group() == "=>":
+                before = start > 0 and text[start - 1] in _KEYWORD_CHARS
+                after = end < length and text[end] in _KEYWORD_CHARS
+            else:
+                before = start > 0 and text[start - 1].upper() in _KEYWORD_CHARS
+                after = end < length and text[end].upper() in _KEYWORD_CHARS
+            if not before and not after:
+                return start, end
+        self.fail(pos, "'=>' or 'GENERATE'")
+
+    def end(self, pos):
+        pos = self.skip(pos)
+        if pos != len(self.text):
+            self.fail(pos, "end of text")
+
+    def run(self, rule):
+        try:
+            pos = self.skip(0)
+            if rule:
+                # the lhs is skipped up to the delimiter, and does not include the whitespaces preceding it
+                lhs_start = pos
+                lhs_end, pos = self.middle_delimiter(pos)
+                while lhs_end > lhs_start and self.text[lhs_end - 1] in " \n\t\r":
+                    lhs_end -= 1
+                result = {'lhs': self.text[lhs_start:lhs_end]}
+            else:
+                result = {}
+            rhs, pos = self.rhs(pos)
+            self.end(pos)
+        except _Failure:
+            raise ParseError(self._message()) from None
+        result.update(rhs)
+        return result
+
+    def _message(self):
+        pos = self.error_pos
+        line = self.text.count("\n", 0, pos) + 1
+        col = pos - (self.text.rfind("\n", 0, pos) + 1) + 1
+        found = repr(self.text[pos]) if pos < len(self.text) else "end of text"
+        return f"Expected {self.error_msg}, found {found}  (at char {pos}), (line:{line}, col:{col})"
+
+def parse_rule(text: str) -> dict:
+    """Parses a rule, and returns the same dictionary as `RuleParser` would.
+
+    Raises a ParseError if the text is not a valid rule.
+    """
+    return _Parser(text).run(rule=True)
+
+def parse_rhs(text: str) -> dict:
+    """Parses the rhs of a rule, and returns the same dictionary as `RightHandSide` would.
+
+    Raises a ParseError if the text is not a valid rhs.
+    """
+    return _Parser(text).run(rule=False)
+
+def parse_lhs(text: str) -> dict:
+    """Parses the node patterns of the `MATCH` clauses of a lhs.
+
+    Comments, string literals, escaped names and property maps are skipped, hence never mistaken for patterns.
+
+    Returns
+    -------
+    dict
+        The keywords of the lhs, in upper case (`keywords`), i.e., its identifiers other than labels, types and property keys,
+        whether a `MATCH` clause calls a function, e.g., `shortestPath` (`calls`),
+        and its node patterns in order of occurrence (`nodes`), each given by its variable (`variable`, None if unnamed),
+        the position right after the variable, where labels can be inserted (`anchor`),
+        and whether its labels are given by an expression rather than a conjunction, e.g., `(n:A|B)` (`expression`).
+
+    Raises a ParseError if the brackets of the lhs are not balanced.
+    """
+    tokens = []
+    for match in _LHS_TOKEN.finditer(text):
+        if match.lastgroup != "comment":
+            tokens.append((match.lastgroup, match.group(), match.start(), match.end()))
+    keywords, nodes, calls = set(), [], False
+    # open brackets, and whether the tokens are in a MATCH clause
+    stack, matching = [], False
+    for i, (kind, value, start, end) in enumerate(tokens):
+        previous = tokens[i - 1] if i > 0 else (None, None, 0, 0)
+        following = tokens[i + 1] if i + 1 < len(tokens) else (None, None, len(text), len(text))
+        if kind == "identifier":
+            # variables are followed by a symbol or a clause, labels and types preceded by a colon or a label operator,
+            # and property keys preceded by a dot or followed by a colon in a map
+            if previous[1] in (".", ":", "|", "&", "!") or (stack and stack[-1] == "{" and following[1] == ":"):
+                continue
+            if not stack and value.upper() in _LHS_CLAUSES:
+                matching = value.upper() == "MATCH"
+            if following[1] == "(" and not stack and matching and value.upper() != "MATCH":
+                calls = True
+            keywords.add(value.upper())
+        elif kind == "symbol" and value in "([{":
+            # in a MATCH clause, node patterns follow the clause, a comma, a path variable or a relationship pattern
+            if value == "(" and not stack and matching and (previous[0] != "identifier" or previous[1].upper() == "MATCH"):
+                nodes.append(_node_pattern(tokens, i + 1, text))
+            stack.append(value)
+        elif kind == "symbol" and value in ")]}":
+            if not stack or "([{"[")]}".index(value)] != stack.pop():
+                raise ParseError(f"Unbalanced '{value}' in the lhs (at char {start})")
+    if stack:
+        raise ParseError(f"Unbalanced '{stack[-1]}' in the lhs")
+    return {'keywords': keywords, 'calls': calls, 'nodes': nodes}
+
+def _node_pattern(tokens, i, text):
+    """Returns the node pattern whose content starts with the i-th token."""
+    kind, value, start, end = tokens[i] if i < len(tokens) else (None, None, len(text), len(text))
+    node = {'variable': None, 'anchor': tokens[i - 1][3], 'expression': False}
+    if kind in ("identifier", "name"):
+        node['variable'], node['anchor'] = value, end
+        i += 1
+    # labels, up to the property map or the end of the pattern
+    while i < len(tokens) and tokens[i][1] not in ("{", ")"):
+        if tokens[i][0] == "symbol" and tokens[i][1] != ":":
+            node['expression'] = True
+        i += 1
+    return node
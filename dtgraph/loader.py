@@ -0,0 +1,183 @@
+"""Client-side loading of CSV files.
+
+This module contains the `CsvLoader` class, which reads local CSV files and sends their rows to the server
+in batches of parameters, i.e., `UNWIND $rows AS row` followed by the command of the file.
+Unlike `LOAD CSV`, the files need not be copied into the import directory of the server,
+and the batches of a file are executed by several sessions in parallel.
+"""
+import asyncio
+import contextvars
+import csv
+import mmap
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, unquote
+
+from dtgraph.metrics import COUNTERS, log
+
+# string literals and comments of a command, masked before looking for the patterns binding a variable
+_MASKED = re.compile(r"""//[^\n]*|/\*.*?\*/|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'""", re.DOTALL)
+
+def new_variable(mergeCMD, mark_new) -> str:
+    """Returns the variable bound by mergeCMD to the nodes to mark as new, i.e., `mark_new`, or `n` if mark_new is True.
+
+    Raises a ValueError if it is not a variable, or if no node pattern of the command binds it, e.g., `(n:Person ...)`.
+    """
+    variable = "n" if mark_new is True else mark_new
+    if not isinstance(variable, str) or re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", variable) is None:
+        raise ValueError(f"mark_new should be True or the name of a variable, not {mark_new!r}.")
+    if re.search(rf"(?<![\w`])\(\s*{variable}\s*[:){{]", _MASKED.sub('""', mergeCMD)) is None:
+        raise ValueError(f"The command does not bind the variable `{variable}` to a node, hence the new nodes can not be marked.")
+    return variable
+
+def resolve_csv_path(path, csv_root = None) -> str:
+    """
+    Maps the URL of a CSV file, as given to `LOAD CSV`, to a local path.
+
+    Parameters
+    ----------
+    path : str
+        URL of the file, e.g., "file:///gtb/gusgene1000-5.csv", or local path.
+    csv_root : str
+        Local directory standing for the import directory of the server, e.g., "output-ibench-data".
+    """
+    url = urlparse(path)
+    if url.scheme not in ("", "file"):
+        raise ValueError(f"Only local CSV files can be loaded by the client, got {path}.")
+    local = unquote(url.path) if url.scheme == "file" else path
+    if csv_root is not None:
+        local = os.path.join(csv_root, local.lstrip("/"))
+    return local
+
+def _lines(path):
+    """Iterates over the lines of a file through a read-only memory map, without reading the file at once."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                yield line.decode("utf-8")
+
+def iter_csv_rows(path, fieldterminator = "|"):
+    """Streams the rows of a CSV file as lists of strings, empty fields being null, as with `LOAD CSV`."""
+    for row in csv.reader(_lines(path), delimiter=fieldterminator):
+        yield [field if field != "" else None for field in row]
+
+def iter_batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class CsvLoader(object):
+    """
+    Loads local CSV files with parallel batches of `UNWIND $rows AS row` queries.
+
+    Rows are read lazily: at most `max_pending` batches are held in memory,
+    reading the file being paused until a session completes its batch.
+    Since batches run concurrently, commands merging the same node from different rows should be backed by a uniqueness constraint,
+    or executed with a single session, for nodes not to be duplicated.
+
+    Methods
+    -------
+    load(path, mergeCMD, fieldterminator = "|", stats = False, mark_new = False)
+        Executes the command on each row of the file.
+    load_async(...)
+        Coroutine counterpart of the above method, for graphs accessed through the asyncio API.
+    """
+
+    def __init__(self, graph, sessions = 4, batch_size = 10_000, max_pending = None, csv_root = None):
+        """
+        Parameters
+        ----------
+        graph : dtgraph.backend.neo4j.graph.Neo4jGraph
+            Graph on which the rows are loaded.
+        sessions : int
+            Number of batches executed concurrently.
+        batch_size : int
+            Number of rows sent by each query.
+        max_pending : int
+            Maximum number of batches read but not yet completed. Defaults to twice the number of sessions.
+        csv_root : str
+            Local directory standing for the import directory of the server, see `resolve_csv_path`.
+        """
+        self.graph = graph
+        self.sessions = sessions
+        self.batch_size = batch_size
+        self.max_pending = max_pending if max_pending is not None else 2 * sessions
+        self.csv_root = csv_root
+
+    def load(self, path, mergeCMD, fieldterminator = "|", stats = False, mark_new = False) -> int:
+        """Executes mergeCMD on each row of the CSV file, and returns the number of rows.
+
+        See `Neo4jGraph.populate_with_csv` for mark_new, which is checked before any row is sent.
+        """
+        if mark_new:
+            new_variable(mergeCMD, mark_new)
+        start = time.monotonic()
+        batches = iter_batches(iter_csv_rows(resolve_csv_path(path, self.csv_root), fieldterminator), self.batch_size)
+        pending = threading.BoundedSemaphore(self.max_pending)
+        summaries = []
+        errors = []
+        rows = 0
+        def done(future):
+            if future.exception() is not None:
+                errors.append(future.exception())
+            else:
+                summaries.append(future.result())
+            pending.release()
+        with ThreadPoolExecutor(max_workers=self.sessions) as executor:
+            for batch in batches:
+                pending.acquire()
+                if errors:
+                    pending.release()
+                    break
+                rows += len(batch)
+                future = executor.submit(contextvars.copy_context().run, self.graph.populate_with_rows, batch, mergeCMD, mark_new=mark_new)
+                future.add_done_callback(done)
+        if errors:
+            raise errors[0]
+        self._print_stats(path, rows, summaries, start, stats)
+        return rows
+
+    async def load_async(self, path, mergeCMD, fieldterminator = "|", stats = False, mark_new = False) -> int:
+        """See `load`. The graph is expected to be a `dtgraph.backend.neo4j.async_graph.AsyncNeo4jGraph`."""
+        if mark_new:
+            new_variable(mergeCMD, mark_new)
+        start = time.monotonic()
+        batches = iter_batches(iter_csv_rows(resolve_csv_path(path, self.csv_root), fieldterminator), self.batch_size)
+        pending = asyncio.Semaphore(self.max_pending)
+        sessions = asyncio.Semaphore(self.sessions)
+        async def run(batch):
+            try:
+                async with sessions:
+                    return await self.graph.populate_with_rows(batch, mergeCMD, mark_new=mark_new)
+            finally:
+                pending.release()
+        tasks = []
+        rows = 0
+        for batch in batches:
+            await pending.acquire()
+            if any(t.done() and t.exception() is not None for t in tasks):
+                pending.release()
+                break
+            rows += len(batch)
+            tasks.append(asyncio.ensure_future(run(batch)))
+        summaries = await asyncio.gather(*tasks)
+        self._print_stats(path, rows, summaries, start, stats)
+        return rows
+
+    def _print_stats(self, path, rows, summaries, start, stats):
+        if not (self.graph.verbose or stats):
+            return
+        counters = {c: sum([getattr(s.counters, c, 0) for s in summaries]) for c in COUNTERS}
+        log(self.graph, f"CSV:    Added {counters['labels_added']} labels, created {counters['nodes_created']} nodes, "
+            f"set {counters['properties_set']} properties, created {counters['relationships_created']} relationships from {rows} rows of {os.path.basename(path)} "
+            f"in {len(summaries)} batch(es), completed after {int((time.monotonic() - start) * 1000)} ms.")
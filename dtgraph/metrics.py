@@ -0,0 +1,240 @@
+"""Execution metrics.
+
+This module contains the `RunStats` class, a registry of the statistics of the queries sent to a graph,
+e.g., by rules, loaders or the ejection of a transformation.
+Statistics are recorded as `QueryStats` objects, and forwarded to sinks, such as `print_sink` which prints them.
+Registries can be serialized to JSON and CSV.
+"""
+import csv
+import io
+import json
+import threading
+
+# output of a rule fused with others, see `QueryStats.outputs`
+OUTPUTS = ["rows", "nodes_merged", "relationships_merged"]
+
+# counters of neo4j.SummaryCounters, also reported by Memgraph
+COUNTERS = [
+    "nodes_created", "nodes_deleted", "relationships_created", "relationships_deleted",
+    "properties_set", "labels_added", "labels_removed",
+    "indexes_added", "indexes_removed", "constraints_added", "constraints_removed",
+]
+
+# number of items of a list parameter serialized to estimate its size
+SAMPLE_SIZE = 16
+
+def _parameters_size(parameters) -> int:
+    """Returns the size of the parameters of a query, serialized as JSON.
+
+    Lists longer than `SAMPLE_SIZE`, e.g., the rows of an `UNWIND $rows` batch, are not serialized again:
+    their size is extrapolated from their first items.
+    """
+    # `{"key": value, ...}`
+    size = 2 * len(parameters)
+    for key, value in parameters.items():
+        size += len(json.dumps(key)) + 2
+        if isinstance(value, (list, tuple)) and len(value) > SAMPLE_SIZE:
+            # each item takes its size and a separator, as do the brackets of the sample
+            sample = json.dumps(list(value[:SAMPLE_SIZE]), default=str).encode("utf-8")
+            size += len(sample) * len(value) // SAMPLE_SIZE
+        else:
+            size += len(json.dumps(value, default=str).encode("utf-8"))
+    return size
+
+class QueryStats(object):
+    """
+    Statistics of a single query.
+
+    Attributes
+    ----------
+    phase : str
+        Kind of query, e.g., "rule", "csv", "eject" or "diagnose".
+    label : str
+        Short description of the query, e.g., the first line of a rule.
+    available_after : int
+        Time (in ms) the server took to make the first result available.
+    consumed_after : int
+        Time (in ms) the server took to stream the remaining results. For write queries, this includes the commit.
+    counters : dict[str, int]
+        Updates performed by the query.
+    bytes_sent : int
+        Size of the query text and of its parameters, as sent to the server.
+        The size of large list parameters, e.g., the rows of a batch, is estimated from a sample of their items.
+    message : str
+        Human-readable description of the statistics.
+    display : bool
+        Whether the message has been requested to be displayed.
+    rule : str
+        Identifier of the rule of a transformation the statistics are attributed to, e.g., "#2", if any.
+    outputs : dict[str, int]
+        Output of a rule fused with others, as counted by their shared query: the number of bindings of the lhs (`rows`),
+        and of the nodes (`nodes_merged`) and relationships (`relationships_merged`) merged by its constructors.
+    """
+
+    def __init__(self, phase, label = None, available_after = None, consumed_after = None, counters = None, bytes_sent = 0, message = None, display = False, rule = None, outputs = None):
+        self.phase = phase
+        self.label = label
+        self.available_after = available_after
+        self.consumed_after = consumed_after
+        self.counters = counters or {}
+        self.bytes_sent = bytes_sent
+        self.message = message
+        self.display = display
+        self.rule = rule
+        self.outputs = outputs or {}
+
+    @classmethod
+    def from_summary(cls, phase, summary, message = None, display = False):
+        query = getattr(summary, 'query', None) or ""
+        if not isinstance(query, str):
+            # queries may be given as neo4j.Query objects
+            query = getattr(query, 'text', str(query))
+        parameters = getattr(summary, 'parameters', None)
+        bytes_sent = len(query.encode("utf-8")) + (_parameters_size(parameters) if parameters else 0)
+        lines = query.strip().splitlines()
+        return cls(
+            phase,
+            label = lines[0].strip()[:80] if lines else None,
+            available_after = summary.result_available_after,
+            consumed_after = summary.result_consumed_after,
+            counters = {name: getattr(summary.counters, name, 0) for name in COUNTERS},
+            bytes_sent = bytes_sent,
+            message = message,
+            display = display)
+
+    @property
+    def time(self) -> int:
+        """Time (in ms) spent by the server on the query."""
+        return (self.available_after or 0) + (self.consumed_after or 0)
+
+    def to_dict(self) -> dict:
+        d = {
+            'phase': self.phase,
+            'label': self.label,
+            'available_after': self.available_after,
+            'consumed_after': self.consumed_after,
+            'time': self.time,
+            'bytes_sent': self.bytes_sent,
+            'rule': self.rule,
+        }
+        d.update(self.counters)
+        d.update(self.outputs)
+        return d
+
+def print_sink(stats: QueryStats):
+    """Prints the message of the statistics, if they have been requested to be displayed."""
+    if stats.display and stats.message:
+        print(stats.message)
+
+def log(graph, message, display = True):
+    """Forwards a message to the sinks of the metrics of the given graph (see `RunStats.log`), or prints it if the graph does not record metrics."""
+    metrics = getattr(graph, 'metrics', None)
+    if metrics is not None:
+        metrics.log(message, display = display)
+    elif display:
+        print(message)
+
+class RunStats(object):
+    """
+    Registry of query statistics.
+
+    Methods
+    -------
+    record(phase, summary, message = None, display = False)
+        Records the statistics of a query from its summary, and forwards them to the sinks.
+    log(message, display = True)
+        Forwards a message which does not describe a query to the sinks, without recording it.
+    since(position)
+        Returns a registry with the statistics recorded after the given position.
+    totals()
+        Aggregates the statistics by phase.
+    to_json(path = None), to_csv(path = None)
+        Serializes the statistics.
+    """
+
+    def __init__(self, sinks = None, records = None):
+        """
+        Parameters
+        ----------
+        sinks : list[callable]
+            Functions called with each new QueryStats, e.g., `print_sink`.
+        records : list[QueryStats]
+            Initial statistics.
+        """
+        self.sinks = list(sinks) if sinks is not None else []
+        self.records = list(records) if records is not None else []
+        self._lock = threading.Lock()
+
+    def record(self, phase, summary, message = None, display = False) -> QueryStats:
+        stats = QueryStats.from_summary(phase, summary, message = message, display = display)
+        self.add(stats)
+        return stats
+
+    def add(self, stats: QueryStats):
+        with self._lock:
+            self.records.append(stats)
+        for sink in self.sinks:
+            sink(stats)
+
+    def log(self, message, display = True):
+        """Forwards a message to the sinks, e.g., progress, warnings or the conflicts listed by a diagnosis, without recording it.
+        
+        The message is given as the message of statistics of the phase "log", hence `print_sink` prints it if `display` is set.
+        """
+        stats = QueryStats("log", message = message, display = display)
+        for sink in self.sinks:
+            sink(stats)
+
+    def __len__(self):
+        return len(self.records)
+
+    def since(self, position: int):
+        with self._lock:
+            return RunStats(records = self.records[position:])
+
+    @property
+    def time(self) -> int:
+        """Time (in ms) spent by the server on all the queries."""
+        return sum([r.time for r in self.records])
+
+    def totals(self) -> dict:
+        totals = {}
+        for r in self.records:
+            t = totals.setdefault(r.phase, dict({'queries': 0, 'available_after': 0, 'consumed_after': 0, 'time': 0, 'bytes_sent': 0}, **{c: 0 for c in COUNTERS}))
+            t['queries'] += 1
+            t['available_after'] += r.available_after or 0
+            t['consumed_after'] += r.consumed_after or 0
+            t['time'] += r.time
+            t['bytes_sent'] += r.bytes_sent
+            for c in COUNTERS:
+                t[c] += r.counters.get(c, 0) or 0
+        return totals
+
+    def to_dict(self) -> dict:
+        return {'queries': [r.to_dict() for r in self.records], 'totals': self.totals()}
+
+    def to_json(self, path = None) -> str:
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def to_csv(self, path = None) -> str:
+        """Serializes the statistics of each query as a CSV row."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=['phase', 'label', 'available_after', 'consumed_after', 'time', 'bytes_sent', 'rule'] + COUNTERS + OUTPUTS)
+        writer.writeheader()
+        for r in self.records:
+            writer.writerow(r.to_dict())
+        text = buffer.getvalue()
+        if path is not None:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+        return text
+
+    def __str__(self):
+        lines = [f"{len(self.records)} queries, {self.time} ms."]
+        for phase, t in self.totals().items():
+            lines.append(f"  {phase}: {t['queries']} queries, {t['time']} ms, created {t['nodes_created']} nodes and {t['relationships_created']} relationships, set {t['properties_set']} properties.")
+        return "\n".join(lines)
@@ -0,0 +1,108 @@
+"""Execution plans.
+
+This module contains the `PlanNode` class, which represents the plans returned by the server
+when a rule is executed with EXPLAIN or PROFILE, as a tree of operators.
+"""
+
+class PlanNode(object):
+    """
+    Operator of an execution plan, along with its children.
+
+    Estimated rows are always available; actual rows, db hits, memory and time are only available for profiled queries.
+
+    Methods
+    -------
+    from_summary(summary)
+        Builds the plan of an executed query from its summary.
+    walk()
+        Iterates over the operators of the plan, in depth-first order.
+    max_estimated_rows()
+        Returns the largest number of rows an operator of the plan is estimated to produce.
+    to_dict()
+        Returns a JSON-serializable representation of the plan.
+    """
+
+    def __init__(self, operator, identifiers = None, details = None, estimated_rows = None, rows = None, db_hits = None,
+                 memory = None, time = None, children = None, representation = None):
+        self.operator = operator
+        self.identifiers = identifiers or []
+        self.details = details
+        self.estimated_rows = estimated_rows
+        self.rows = rows
+        self.db_hits = db_hits
+        self.memory = memory
+        self.time = time
+        self.children = children or []
+        # textual rendering of the whole plan by the server, only set on the root operator
+        self._representation = representation
+
+    @classmethod
+    def from_dict(cls, plan: dict):
+        """Builds a plan from the dictionary returned by the driver, i.e., `summary.plan` or `summary.profile`."""
+        args = plan.get('args', {})
+        # operator types may carry the name of the runtime, e.g., "Filter@neo4j"
+        operator = plan.get('operatorType', "").split("@")[0]
+        return cls(
+            operator,
+            identifiers = list(plan.get('identifiers', [])),
+            details = args.get('Details'),
+            estimated_rows = args.get('EstimatedRows'),
+            rows = plan.get('rows'),
+            db_hits = plan.get('dbHits'),
+            memory = args.get('Memory', args.get('GlobalMemory')),
+            time = plan.get('time'),
+            children = [cls.from_dict(child) for child in plan.get('children', [])],
+            representation = args.get('string-representation'))
+
+    @classmethod
+    def from_summary(cls, summary):
+        """Builds the plan of an executed query from its summary, or returns None if the query was neither explained nor profiled."""
+        plan = summary.profile or summary.plan
+        if not plan:
+            return None
+        return cls.from_dict(plan)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def max_estimated_rows(self) -> float:
+        return max([node.estimated_rows or 0 for node in self.walk()])
+
+    def total_db_hits(self) -> int:
+        """Returns the db hits of the whole plan, or None if the query has not been profiled."""
+        hits = [node.db_hits for node in self.walk() if node.db_hits is not None]
+        return sum(hits) if hits else None
+
+    def to_dict(self) -> dict:
+        return {
+            'operator': self.operator,
+            'identifiers': self.identifiers,
+            'details': self.details,
+            'estimated_rows': self.estimated_rows,
+            'rows': self.rows,
+            'db_hits': self.db_hits,
+            'memory': self.memory,
+            'time': self.time,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    def __str__(self):
+        if self._representation:
+            return self._representation
+        return "\n".join(self._lines(0))
+
+    def _lines(self, depth):
+        line = "  " * depth + "+" + self.operator
+        if self.details:
+            line += f" ({self.details})"
+        line += f" estimated rows: {self.estimated_rows}"
+        if self.rows is not None:
+            line += f", rows: {self.rows}, db hits: {self.db_hits}"
+        if self.memory is not None:
+            line += f", memory: {self.memory} bytes"
+        lines = [line]
+        for child in self.children:
+            lines.extend(child._lines(depth + 1))
+        return lines
@@ -3,9 +3,28 @@
 This module contains the `Rule` class for representation of a declarative 
 property graph transformation rule.
 """
-from dtgraph.parser import RuleParser, RightHandSide
+import asyncio
+import contextvars
+import copy
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from neo4j.exceptions import TransientError
+
+from dtgraph.backend.capabilities import Capabilities, capabilities_of, profile_for
+from dtgraph.fast_parser import parse_rule, parse_rhs, parse_lhs
 from dtgraph.compiler import Compiler
-from dtgraph.exceptions import RuleInitializationError
+from dtgraph.plan import PlanNode
+from dtgraph.metrics import OUTPUTS, log
+from dtgraph.exceptions import RuleInitializationError, RunTimeError
+
+# labels and relationship types mentioned in a lhs, including label expressions such as `:A|B`
+_LHS_LABEL = re.compile(r"[:|&]\s*`?([A-Za-z_][A-Za-z0-9_]*)`?")
+# node patterns without label, e.g., `(n)`, and relationship patterns without type, e.g., `-[r]->` or `-->`
+_LHS_ANY = re.compile(r"(?<![\w`\]])\(\s*(?:[A-Za-z_]\w*)?\s*(?:\{[^}]*\})?\s*\)|-\[\s*(?:[A-Za-z_]\w*)?\s*(?:\*[^\]]*)?(?:\{[^}]*\})?\s*\]-|<?-->?")
+# keywords after which the bindings of a lhs are not monotone in its input, or can not be anchored
+_LHS_NOT_MONOTONE = frozenset(["OPTIONAL", "NOT", "CALL", "UNION", "WITH", "UNWIND", "RETURN", "EXISTS", "COUNT", "COLLECT", "SUM", "AVG", "MIN", "MAX", "DISTINCT"])
 
 class Rule(object):
     """ Class representing a declarative transformation rule.
@@ -18,15 +37,26 @@ class Rule(object):
         Execute the query on the Neo4jGraph.
     """
 
-    _dict = None
+    _parsed = None
+    _source = None
+    _lhs = None
     _compiled = None
+    _batched = False
+    _parameters = None
+    _members = None
+    _partitioned = None # whether the compiled script filters the bindings of a partition, if the rule has been processed by the DSL
+    _variants = None # compiled scripts, batching and parameters of the rule, by value of `_partitioned`
+    last_plan = None # dtgraph.plan.PlanNode of the last application of the rule, if it was explained or profiled
+    last_retries = 0 # number of executions of the last application of the rule which have been retried after transient errors
+    last_outputs = None # for fused rules, output of each of their rules in the last application, see dtgraph.metrics.QueryStats.outputs
 
-    def __init__(self, ascii = None, raw = None, lhs = None, rhs = None):
+    def __init__(self, ascii = None, raw = None, lhs = None, rhs = None, batch_size = None, partitions = None, cache = None):
         """Initializes a rule.
 
         The type of operation is defined by which arguments are provided.
         If an invalid combination of arguments is provided, raises an RuleInitializationError exception.
         Supported combinations: raw; lhs + rhs; lhs + ascii; ascii.
+        Rules processed by the DSL are parsed when they are created, and raise a dtgraph.exceptions.ParseError if they are malformed.
 
         Parameters
         ----------
@@ -41,19 +71,52 @@ class Rule(object):
             A string describing the lhs of the rule as an executable openCypher script.
         rhs : str
             A string describing the rhs of the rule in openCypher.
+        batch_size : int
+            If provided, the output of the rule is committed in transactions of `batch_size` lhs bindings.
+            Only applies to rules processed by the DSL.
+        partitions : int
+            If provided, the bindings of the lhs are split into `partitions` parts, which are processed concurrently.
+            Only applies to rules processed by the DSL, on backends with uniqueness constraints on output identifiers (e.g., Neo4j).
+        cache : dtgraph.cache.RuleCache
+            If provided, and a rule with the same source has already been parsed with this cache (possibly in a previous session), 
+            parsing is deferred until the rule is compiled, which a compiled script found in the cache skips entirely.
         """
+        self._batch_size = batch_size
+        self._partitions = partitions
         if raw:
             self._compiled = raw
         elif lhs and rhs:
             self._compiled = f"{lhs}\n{rhs}"
-        elif lhs and ascii:
-            rhs_dict = RightHandSide.parseString(ascii, parseAll=True).asDict()
-            self._dict = {'lhs': lhs, 'constructors': rhs_dict['constructors']}
         elif ascii:
-            self._dict = RuleParser.parseString(ascii, parseAll=True).asDict()
+            self._source = ascii
+            self._lhs = lhs
+            # a source known to be valid is only parsed if it has to be compiled
+            if cache is None or not cache.parsed(self._source_key()):
+                self._parse()
+                if cache is not None:
+                    cache.add_parsed(self._source_key())
         else:
             raise RuleInitializationError("Invalid set of parameters.")
 
+    @property
+    def _dict(self):
+        """The dictionary obtained by processing the rule with the DSL, if any. The source of the rule is parsed on first access."""
+        if self._parsed is None and self._source is not None:
+            self._parse()
+        return self._parsed
+
+    def _parse(self):
+        """Processes the source of the rule with the DSL, and stores the resulting dictionary in `_parsed`.
+        
+        Raises a dtgraph.exceptions.ParseError if the source is malformed.
+        """
+        # the hand-written parser is equivalent to, and much faster than, the pyparsing grammar of dtgraph.parser
+        if self._lhs:
+            rhs_dict = parse_rhs(self._source)
+            self._parsed = {'lhs': self._lhs, 'constructors': rhs_dict['constructors']}
+        else:
+            self._parsed = parse_rule(self._source)
+
     @classmethod
     def from_ascii(cls, ascii, lhs = None):
         """Creates a rule object from an ASCII representation. """
@@ -67,13 +130,188 @@ class Rule(object):
         """Creates a rule object from a raw representation. """
         return cls(raw = raw)
 
-    def _compile(self, database="neo4j", with_diagnose = True, explain = False, profile = False):
-        # the compilation step is not idempotent
-        if self._compiled is None:
-            compiler = Compiler(database, with_diagnose=with_diagnose, explain = explain, profile = profile)
-            self._compiled = compiler.compile(self._dict)
+    @classmethod
+    def fuse(cls, rules):
+        """Creates a rule evaluating once the lhs shared by the given rules, and then the constructors of all of them. 
+        
+        Raises a RuleInitializationError if the rules do not have equivalent lhs.
+        """
+        if len(rules) < 2 or any(r.lhs_key() is None or r.lhs_key() != rules[0].lhs_key() for r in rules):
+            raise RuleInitializationError("Only two or more rules processed by the DSL with equivalent lhs can be fused.")
+        fused = cls.__new__(cls)
+        fused._members = list(rules)
+        fused._batch_size = rules[0]._batch_size
+        fused._partitions = rules[0]._partitions
+        return fused
+
+    def lhs_key(self):
+        """Returns the lhs of the rule with normalized whitespaces, or None if the rule has not been processed by the DSL.
+
+        Rules having the same key match the same bindings.
+        """
+        if self._dict is None:
+            return None
+        # collapse whitespaces outside of string literals
+        return re.sub(r"""("[^"]*"|'[^']*')|\s+""", lambda m: m.group(1) or " ", self._dict['lhs']).strip()
+
+    def output_labels(self) -> tuple[set[str], set[str]]:
+        """Returns the labels of the output nodes and the types of the output relationships of the rule.
 
-    def apply_on(self, graph, with_diagnose = True, explain = False, profile = False) -> int:
+        Both sets are empty if the rule has not been processed by the DSL.
+        """
+        if self._members is not None:
+            labels, types = set(), set()
+            for r in self._members:
+                l, t = r.output_labels()
+                labels |= l
+                types |= t
+            return labels, types
+        labels, types = set(), set()
+        if self._dict is None:
+            return labels, types
+        for constructor in self._dict['constructors']:
+            for node in (constructor.get('src'), constructor.get('tgt'), constructor):
+                if node and 'edge' not in node:
+                    labels.update(node.get('labels', []))
+            if constructor.get('edge'):
+                types.update(constructor['edge'].get('labels', []))
+        return labels, types
+
+    def input_labels(self):
+        """Returns the labels and relationship types the lhs of the rule may read, 
+        or None if it may read any element (or if the rule has not been processed by the DSL).
+
+        This is an over-approximation, computed syntactically.
+        """
+        if self._members is not None:
+            return self._members[0].input_labels()
+        if self._dict is None:
+            return None
+        lhs = re.sub(r"""("[^"]*"|'[^']*')""", '""', self._dict['lhs'])
+        if _LHS_ANY.search(lhs):
+            return None
+        return set(_LHS_LABEL.findall(lhs))
+
+    def _key_signatures(self):
+        """Returns the signatures of the Skolem tuples of the output nodes and relationships of the rule.
+
+        A signature is a tuple with one entry per id, which is the id itself if it is a constant, and None otherwise.
+        Two Skolem tuples can only be equal if their signatures agree on every position where both are constants.
+        """
+        if self._members is not None:
+            signatures = [r._key_signatures() for r in self._members]
+            return [s for n, _ in signatures for s in n], [s for _, e in signatures for s in e]
+        def signature(ids):
+            return tuple([i if i.startswith('"') else f'":{i}:"' if i[0].isupper() else None for i in ids])
+        nodes, edges = [], []
+        for constructor in self._dict['constructors']:
+            for node in (constructor.get('src'), constructor.get('tgt'), constructor):
+                if node and 'edge' not in node and 'ids' in node:
+                    nodes.append(signature(node['ids']))
+            edge = constructor.get('edge')
+            if edge:
+                edges.append(signature(edge.get('labels', []) + edge['ids']) + (None, None))
+        return nodes, edges
+
+    def interferes_with(self, other) -> bool:
+        """Whether the rule and the other rule can not safely be executed concurrently.
+
+        This is the case if one of them may read elements written by the other, 
+        or if they may both write the same output element.
+        Rules not processed by the DSL interfere with every other rule.
+        """
+        if self.lhs_key() is None or other.lhs_key() is None:
+            return True
+        for a, b in ((self, other), (other, self)):
+            reads = b.input_labels()
+            labels, types = a.output_labels()
+            if reads is None or (labels | types | {"_dummy"}) & reads:
+                return True
+        def overlap(s1, s2):
+            return len(s1) == len(s2) and all(x is None or y is None or x == y for x, y in zip(s1, s2))
+        nodes, edges = self._key_signatures()
+        other_nodes, other_edges = other._key_signatures()
+        return any(overlap(s1, s2) for s1 in nodes for s2 in other_nodes) \
+            or any(overlap(s1, s2) for s1 in edges for s2 in other_edges)
+
+    def delta_variants(self):
+        """Returns rules, whose lhs only match bindings where at least one node is new (i.e., has the `_dtgNew` label),
+        and which together match every such binding of the lhs of the rule.
+
+        There is one variant per node pattern of the `MATCH` clauses of the lhs (see `dtgraph.fast_parser.parse_lhs`), where this node is required to be new.
+        Unnamed nodes are named so that they can be anchored.
+        Returns None if the rule has not been processed by the DSL, or if its lhs is not monotone 
+        (e.g., uses OPTIONAL MATCH, negations or aggregations) or can not be anchored (e.g., calls `shortestPath` or uses label expressions such as `(n:A|B)`),
+        in which case the rule must be applied on the whole input.
+        """
+        if self._dict is None or self._members is not None:
+            return None
+        lhs = self._dict['lhs']
+        patterns = parse_lhs(lhs)
+        if patterns['keywords'] & _LHS_NOT_MONOTONE or patterns['calls'] or any(node['expression'] for node in patterns['nodes']):
+            return None
+        # name unnamed nodes, and locate the first occurrence of each node
+        named, anchors, shift = lhs, {}, 0
+        for i, node in enumerate(patterns['nodes']):
+            variable, end = node['variable'], node['anchor'] + shift
+            if variable is None:
+                variable = f"_dtg{i}"
+                named = named[:end] + variable + named[end:]
+                shift += len(variable)
+                end += len(variable)
+            anchors.setdefault(variable, end)
+        variants = []
+        for variable, position in anchors.items():
+            variant = copy.copy(self)
+            variant._parsed = {'lhs': named[:position] + ":_dtgNew" + named[position:], 'constructors': copy.deepcopy(self._dict['constructors'])}
+            variant._source = f"{self._source_key()}\n-- delta on {variable}"
+            variant._lhs = None
+            variant._compiled = None
+            variant._partitioned = None
+            variant._variants = None
+            variants.append(variant)
+        return variants or None
+
+    def _source_key(self):
+        if self._members is not None:
+            return "\n;\n".join([r._source_key() for r in self._members])
+        return f"{self._lhs or ''}\n=>\n{self._source}"
+
+    def _compile(self, database="neo4j", with_diagnose = True, explain = False, profile = False, batch_size = None, cache = None, parameterize = False, compact_ids = False, partitioned = False):
+        # raw rules are compiled as soon as they are created, whether they are partitioned or not
+        if self._compiled is not None and self._partitioned in (None, partitioned):
+            return
+        if self._variants is None:
+            self._variants = {}
+        if partitioned in self._variants:
+            self._compiled, self._batched, self._parameters = self._variants[partitioned]
+            self._partitioned = partitioned
+            return
+        capabilities = database if isinstance(database, Capabilities) else profile_for(database)
+        key = None
+        entry = None
+        if cache is not None:
+            key = cache.key(
+                self._source_key(), capabilities.name, dialect=capabilities.dialect,
+                with_diagnose=with_diagnose, explain=explain, profile=profile, batch_size=batch_size, parameterize=parameterize, compact_ids=compact_ids, partitioned=partitioned)
+            entry = cache.get(key)
+        if entry is not None:
+            self._compiled, self._batched, self._parameters = entry['compiled'], entry['batched'], entry.get('parameters')
+        else:
+            compiler = Compiler(capabilities, with_diagnose=with_diagnose, explain = explain, profile = profile, batch_size = batch_size, parameterize = parameterize, compact_ids = compact_ids, partitioned = partitioned)
+            # the compilation step is not idempotent, hence we compile a copy of the source dictionaries
+            if self._members is not None:
+                self._compiled = compiler.compile_many([copy.deepcopy(r._dict) for r in self._members])
+            else:
+                self._compiled = compiler.compile(copy.deepcopy(self._dict))
+            self._batched = compiler.batched
+            self._parameters = compiler.parameters or None
+            if cache is not None:
+                cache.put(key, {'compiled': self._compiled, 'batched': self._batched, 'parameters': self._parameters})
+        self._partitioned = partitioned
+        self._variants[partitioned] = (self._compiled, self._batched, self._parameters)
+
+    def apply_on(self, graph, with_diagnose = True, explain = False, profile = False, batch_size = None, cache = None, parameterize = False, compact_ids = False, partitions = None, retries = 0) -> int:
         """
         Applies the rule on the given graph, in the context of a graph transformation scenario.
 
@@ -81,16 +319,187 @@ class Rule(object):
         ----------
         graph : dtgraph.backend.neo4j.graph.Neo4jGraph
             Graph to be transformed by the rule.
+        batch_size : int
+            Overrides the batch size given at initialization, if any.
+        cache : dtgraph.cache.RuleCache
+            If provided, the compiled rule is looked up in (or added to) this cache.
+        parameterize : bool
+            Whether the constants of the rule should be passed as query parameters rather than inlined in the compiled script.
+            Rules only differing by their constants then share the same execution plan on the server.
+        compact_ids : bool
+            Whether output elements should be identified by a fixed-width hash of their Skolem tuple.
+        partitions : int
+            Overrides the number of partitions given at initialization, if any.
+            Each partition is processed in its own session, concurrently with the others.
+        retries : int
+            Number of times an execution of the rule (i.e., a partition) is executed again after a transient error, 
+            e.g., a deadlock between concurrent partitions or rules. Rules are idempotent, hence can safely be executed again.
+            The number of retried executions is stored in `last_retries`.
+
+        Returns
+        -------
+        tuple[int, neo4j.ResultSummary]
+            The time (in ms) the server took to execute the rule and consume its results, and the summary of the query.
+        """
+        if capabilities_of(graph).evaluates_rules:
+            return self._apply_natively(graph, with_diagnose)
+        executions = self._prepare(graph, with_diagnose, explain, profile, batch_size, cache, parameterize, compact_ids, partitions)
+        if len(executions) == 1:
+            results = [self._execute(graph, executions[0], retries)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(executions)) as executor:
+                # each partition runs in a copy of the current context, hence its spans are nested in the span of the rule
+                futures = [executor.submit(contextvars.copy_context().run, self._execute, graph, parameters, retries) for parameters in executions]
+                results = [future.result() for future in futures]
+        summary = self._slowest([summary for summary, _, _ in results])
+        self.last_retries = sum([attempts for _, _, attempts in results])
+        self.last_plan = PlanNode.from_summary(summary)
+        self.last_outputs = self._outputs([records for _, records, _ in results])
+        return self._time(summary), summary
+
+    async def apply_on_async(self, graph, with_diagnose = True, explain = False, profile = False, batch_size = None, cache = None, parameterize = False, compact_ids = False, partitions = None, retries = 0) -> int:
+        """
+        Applies the rule on the given `dtgraph.backend.neo4j.async_graph.AsyncNeo4jGraph`. 
+        Partitions run as concurrent tasks.
+
+        See `apply_on` for the parameters.
+        """
+        executions = self._prepare(graph, with_diagnose, explain, profile, batch_size, cache, parameterize, compact_ids, partitions)
+        results = await asyncio.gather(*[self._execute_async(graph, parameters, retries) for parameters in executions])
+        summary = self._slowest([summary for summary, _, _ in results])
+        self.last_retries = sum([attempts for _, _, attempts in results])
+        self.last_plan = PlanNode.from_summary(summary)
+        self.last_outputs = self._outputs([records for _, records, _ in results])
+        return self._time(summary), summary
+
+    def _execute(self, graph, parameters, retries) -> tuple:
+        """Executes the compiled script once with the given parameters, retrying it after transient errors.
+        
+        Returns the summary of the query, its records if the rule is fused (None otherwise), and the number of times it has been retried.
+        """
+        for attempt in range(retries + 1):
+            try:
+                if self._members is not None:
+                    records, summary = graph.exec_rule(self._compiled, stats=True, autocommit=self._batched, parameters=parameters, with_records=True)
+                    return summary, records, attempt
+                return graph.exec_rule(self._compiled, stats=True, autocommit=self._batched, parameters=parameters), None, attempt
+            except TransientError as e:
+                if attempt == retries:
+                    raise
+                log(graph, f"Retry: {self._execution_name(parameters)} failed with a transient error ({e.code}), retrying ({attempt + 1}/{retries}).")
+                time.sleep(0.1 * 2 ** attempt)
+
+    async def _execute_async(self, graph, parameters, retries) -> tuple:
+        """See `_execute`."""
+        for attempt in range(retries + 1):
+            try:
+                if self._members is not None:
+                    records, summary = await graph.exec_rule(self._compiled, stats=True, autocommit=self._batched, parameters=parameters, with_records=True)
+                    return summary, records, attempt
+                return await graph.exec_rule(self._compiled, stats=True, autocommit=self._batched, parameters=parameters), None, attempt
+            except TransientError as e:
+                if attempt == retries:
+                    raise
+                log(graph, f"Retry: {self._execution_name(parameters)} failed with a transient error ({e.code}), retrying ({attempt + 1}/{retries}).")
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+    def _outputs(self, results) -> list:
+        """Sums the statistics of each rule of a fused rule returned by its executions, see `dtgraph.compiler.Compiler.compile_many`.
+
+        Returns None if the rule is not fused.
         """
-        if self._compiled is None:
-            self._compile(graph.database, with_diagnose=with_diagnose, explain = explain, profile = profile)
-        summary = graph.exec_rule(self._compiled, stats=True)
-        return summary.result_available_after, summary
+        if self._members is None:
+            return None
+        outputs = [dict.fromkeys(OUTPUTS, 0) for _ in self._members]
+        for records in results:
+            for record in records or []:
+                for i, output in enumerate(outputs):
+                    output['rows'] += record['dtgRows'] or 0
+                    output['nodes_merged'] += record[f"dtgNodes{i}"] or 0
+                    output['relationships_merged'] += record[f"dtgRelationships{i}"] or 0
+        return outputs
+
+    @staticmethod
+    def _execution_name(parameters) -> str:
+        if parameters and 'dtgPartition' in parameters:
+            return f"Partition {parameters['dtgPartition'] + 1}/{parameters['dtgPartitions']} of rule"
+        return "Rule"
+
+    def _apply_natively(self, graph, with_diagnose):
+        """Applies the rule on a graph evaluating the dictionaries of rules itself, e.g., `dtgraph.backend.memory.graph.InMemoryGraph`.
+
+        Options about the compiled script (batches, partitions, parameters, plans, compact identifiers) do not apply.
+        """
+        members = self._members if self._members is not None else [self]
+        if any(r._dict is None for r in members):
+            raise RunTimeError("Only rules processed by the DSL can be evaluated by a graph not executing openCypher.")
+        if self._members is not None:
+            records, summary = graph.exec_rule([r._dict for r in members], stats=True, with_diagnose=with_diagnose, with_records=True)
+        else:
+            records, summary = None, graph.exec_rule([r._dict for r in members], stats=True, with_diagnose=with_diagnose)
+        self.last_plan = None
+        self.last_retries = 0
+        self.last_outputs = self._outputs([records])
+        return self._time(summary), summary
+
+    def explain(self, graph, with_diagnose = True, explain = False, profile = False, batch_size = None, cache = None, parameterize = False, compact_ids = False, partitions = None):
+        """
+        Returns the plan of the rule estimated by the server of the given graph, without executing the rule.
+        Returns None if the server does not report plans in the summary of queries (e.g., Memgraph), 
+        or if the graph evaluates rules itself.
+
+        See `apply_on` for the parameters.
+        """
+        if not capabilities_of(graph).reports_plans:
+            return None
+        executions = self._prepare(graph, with_diagnose, explain, profile, batch_size, cache, parameterize, compact_ids, partitions)
+        query = re.sub(r"^(EXPLAIN |PROFILE )+", "", self._compiled)
+        summary = graph.explain_rule("EXPLAIN " + query, autocommit=self._batched, parameters=executions[0])
+        return PlanNode.from_summary(summary)
+
+    async def explain_async(self, graph, with_diagnose = True, explain = False, profile = False, batch_size = None, cache = None, parameterize = False, compact_ids = False, partitions = None):
+        """See `explain`."""
+        if not capabilities_of(graph).reports_plans:
+            return None
+        executions = self._prepare(graph, with_diagnose, explain, profile, batch_size, cache, parameterize, compact_ids, partitions)
+        query = re.sub(r"^(EXPLAIN |PROFILE )+", "", self._compiled)
+        summary = await graph.explain_rule("EXPLAIN " + query, autocommit=self._batched, parameters=executions[0])
+        return PlanNode.from_summary(summary)
+
+    def _prepare(self, graph, with_diagnose, explain, profile, batch_size, cache, parameterize, compact_ids, partitions) -> list:
+        """Compiles the rule if needed, and returns the parameters of each execution of the compiled script."""
+        if partitions is None:
+            partitions = self._partitions
+        partitioned = partitions is not None and partitions > 1
+        # a rule processed by the DSL is compiled again if it has been compiled for the other mode of partitioning
+        if self._compiled is None or self._partitioned not in (None, partitioned):
+            capabilities = capabilities_of(graph)
+            if batch_size is None:
+                batch_size = self._batch_size
+            if batch_size is None:
+                batch_size = capabilities.batch_size
+            self._compile(capabilities, with_diagnose=with_diagnose, explain = explain, profile = profile, batch_size = batch_size, cache = cache, parameterize = parameterize, compact_ids = compact_ids, partitioned = partitioned)
+        # raw rules are never partitioned
+        if not self._partitioned:
+            return [self._parameters]
+        return [dict(self._parameters or {}, dtgPartitions=partitions, dtgPartition=partition) for partition in range(partitions)]
+
+    @staticmethod
+    def _time(summary) -> int:
+        # writes are performed while the results are consumed, hence the available time alone underestimates the cost of a rule
+        return (summary.result_available_after or 0) + (getattr(summary, 'result_consumed_after', None) or 0)
+
+    @classmethod
+    def _slowest(cls, summaries):
+        # the partitions run concurrently, hence the rule completes with the slowest of them
+        return max(summaries, key=cls._time)
 
     def __str__(self):
         repr = ""
         if self._compiled:
             repr += "Compiled:\n" + self._compiled + "\n"
+        if self._parameters:
+            repr += "Parameters:\n" + str(self._parameters) + "\n"
         if self._dict:
             repr += "Source dictionary:\n" + str(self._dict)
         return repr
@@ -2,8 +2,8 @@ from dtgraph.scenarios.scenario import Scenario
 
 class iBenchDBLPToAmalgam1(Scenario):
     @staticmethod
-    def load(graph, size = 1_000):
-        graph.flush_database()
+    def csv_files(size = 1_000):
+        files = []
         # csv#1
         rel_dinproceedings_cmd = """MERGE (n:DInProceedings {
             pid: row[1], 
@@ -16,7 +16,7 @@ class iBenchDBLPToAmalgam1(Scenario):
             year: row[8]
         })"""
         dinproceedings_filepath = "file:///dta1/dinproceedings"+str(size)+"-5.csv"
-        graph.populate_with_csv(dinproceedings_filepath, rel_dinproceedings_cmd, stats=True)
+        files.append((dinproceedings_filepath, rel_dinproceedings_cmd))
         # csv#2
         rel_darticle_cmd = """MERGE (n:DArticle {
             pid: row[1], 
@@ -31,14 +31,14 @@ class iBenchDBLPToAmalgam1(Scenario):
             url: row[10]
         })"""
         darticle_filepath = "file:///dta1/darticle"+str(size)+"-5.csv"
-        graph.populate_with_csv(darticle_filepath, rel_darticle_cmd, stats=True)
+        files.append((darticle_filepath, rel_darticle_cmd))
         # csv#3
         rel_pubauthors_cmd = """MERGE (n:PubAuthors {
             pid: row[1],
             author: row[2]
         })"""
         pubauthors_filepath = "file:///dta1/pubauthors"+str(size)+"-5.csv"
-        graph.populate_with_csv(pubauthors_filepath, rel_pubauthors_cmd, stats=True)
+        files.append((pubauthors_filepath, rel_pubauthors_cmd))
         # csv#4
         rel_dbook_cmd = """MERGE (n:DBook {
             pid: row[1],
@@ -52,7 +52,7 @@ class iBenchDBLPToAmalgam1(Scenario):
             url: row[9]
         })"""
         dbook_filepath = "file:///dta1/dbook"+str(size)+"-5.csv"
-        graph.populate_with_csv(dbook_filepath, rel_dbook_cmd, stats=True)
+        files.append((dbook_filepath, rel_dbook_cmd))
         # csv#5
         rel_masterthesis_cmd = """MERGE (n:MasterThesis {
             author: row[1],
@@ -61,7 +61,7 @@ class iBenchDBLPToAmalgam1(Scenario):
             school: row[4]
         })"""
         masterthesis_filepath = "file:///dta1/masterthesis"+str(size)+"-5.csv"
-        graph.populate_with_csv(masterthesis_filepath, rel_masterthesis_cmd, stats=True)
+        files.append((masterthesis_filepath, rel_masterthesis_cmd))
         # csv#6
         rel_phdthesis_cmd = """MERGE (n:PhDThesis {
             author: row[1],
@@ -75,7 +75,7 @@ class iBenchDBLPToAmalgam1(Scenario):
             isbn: row[9]
         })"""
         phdthesis_filepath = "file:///dta1/phdthesis"+str(size)+"-5.csv"
-        graph.populate_with_csv(phdthesis_filepath, rel_phdthesis_cmd, stats=True)
+        files.append((phdthesis_filepath, rel_phdthesis_cmd))
         # csv#7
         rel_www_cmd = """MERGE (n:WWW {
             pid: row[1],
@@ -84,4 +84,5 @@ class iBenchDBLPToAmalgam1(Scenario):
             url: row[4]
         })"""
         www_filepath = "file:///dta1/www"+str(size)+"-5.csv"
-        graph.populate_with_csv(www_filepath, rel_www_cmd, stats=True)
\ No newline at end of file
+        files.append((www_filepath, rel_www_cmd))
+        return files
@@ -2,13 +2,14 @@ from dtgraph.scenarios.scenario import Scenario
 
 class iBenchFlightHotel(Scenario):
     @staticmethod
-    def load(graph, size = 1_000):
-        graph.flush_database()
+    def csv_files(size = 1_000):
+        files = []
         # csv#1
         rel_flight_cmd = "MERGE (n:Flight {fid: row[1], src: row[2], dest: row[3]})"
         flight_filepath = "file:///flighthotel/flight"+str(size)+"-5.csv"
-        graph.populate_with_csv(flight_filepath, rel_flight_cmd, stats=True)
+        files.append((flight_filepath, rel_flight_cmd))
         # csv#2
         rel_hotel_cmd = "MERGE (n:Hotel {flid: row[1], hid: row[2]})"
         hotel_filepath = "file:///flighthotel/hotel"+str(size)+"-5.csv"
-        graph.populate_with_csv(hotel_filepath, rel_hotel_cmd, stats=True)
\ No newline at end of file
+        files.append((hotel_filepath, rel_hotel_cmd))
+        return files
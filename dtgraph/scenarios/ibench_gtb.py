@@ -2,8 +2,8 @@ from dtgraph.scenarios.scenario import Scenario
 
 class iBenchGUSToBIOSQL(Scenario):
     @staticmethod
-    def load(graph, size = 1_000):
-        graph.flush_database()
+    def csv_files(size = 1_000):
+        files = []
         # csv#1
         rel_gusgene_cmd = """MERGE (n:GUSGene {
             geneID: row[1], 
@@ -16,7 +16,7 @@ class iBenchGUSToBIOSQL(Scenario):
             sequenceOntologyID: row[8]
         })"""
         gusgene_filepath = "file:///gtb/gusgene"+str(size)+"-5.csv"
-        graph.populate_with_csv(gusgene_filepath, rel_gusgene_cmd, stats=True)
+        files.append((gusgene_filepath, rel_gusgene_cmd))
         # csv#2
         rel_gusgenesynonym_cmd = """MERGE (n:GUSGeneSynonym {
             geneSynonymID: row[1], 
@@ -26,7 +26,7 @@ class iBenchGUSToBIOSQL(Scenario):
             isObsolete: row[5]
         })"""
         gusgenesynonym_filepath = "file:///gtb/gusgenesynonym"+str(size)+"-5.csv"
-        graph.populate_with_csv(gusgenesynonym_filepath, rel_gusgenesynonym_cmd, stats=True)
+        files.append((gusgenesynonym_filepath, rel_gusgenesynonym_cmd))
         # csv#3
         rel_gusgorelationship_cmd = """MERGE (n:GUSGoRelationship {
             goRelationshipID: row[1], 
@@ -35,7 +35,7 @@ class iBenchGUSToBIOSQL(Scenario):
             goRelationshipTypeID: row[4]
         })"""
         gusgorelationship_filepath = "file:///gtb/gusgorelationship"+str(size)+"-5.csv"
-        graph.populate_with_csv(gusgorelationship_filepath, rel_gusgorelationship_cmd, stats=True)
+        files.append((gusgorelationship_filepath, rel_gusgorelationship_cmd))
         # csv#4
         rel_gusgosynonym_cmd = """MERGE (n:GUSGoSynonym {
             goSynonymID: row[1], 
@@ -45,7 +45,7 @@ class iBenchGUSToBIOSQL(Scenario):
             text: row[5]
         })"""
         gusgosynonym_filepath = "file:///gtb/gusgosynonym"+str(size)+"-5.csv"
-        graph.populate_with_csv(gusgosynonym_filepath, rel_gusgosynonym_cmd, stats=True)
+        files.append((gusgosynonym_filepath, rel_gusgosynonym_cmd))
         # csv#5
         rel_gusgoterm_cmd = """MERGE (n:GUSGoTerm {
             goTermID: row[1], 
@@ -62,7 +62,7 @@ class iBenchGUSToBIOSQL(Scenario):
             isObsolete: row[12]
         })"""
         gusgoterm_filepath = "file:///gtb/gusgoterm"+str(size)+"-5.csv"
-        graph.populate_with_csv(gusgoterm_filepath, rel_gusgoterm_cmd, stats=True)
+        files.append((gusgoterm_filepath, rel_gusgoterm_cmd))
         # csv#6
         rel_gustaxon_cmd = """MERGE (n:GUSTaxon {
             taxonID: row[1],
@@ -73,7 +73,7 @@ class iBenchGUSToBIOSQL(Scenario):
             mitochondrialGeneticCodeID: row[6]
         })"""
         gustaxon_filepath = "file:///gtb/gustaxon"+str(size)+"-5.csv"
-        graph.populate_with_csv(gustaxon_filepath, rel_gustaxon_cmd, stats=True)
+        files.append((gustaxon_filepath, rel_gustaxon_cmd))
         # csv#7
         rel_gustaxonname_cmd = """MERGE (n:GUSTaxonName {
             taxonNameID: row[1],
@@ -83,4 +83,5 @@ class iBenchGUSToBIOSQL(Scenario):
             nameClass: row[5]
         })"""
         gustaxonname_filepath = "file:///gtb/gustaxonname"+str(size)+"-5.csv"
-        graph.populate_with_csv(gustaxonname_filepath, rel_gustaxonname_cmd, stats=True)
+        files.append((gustaxonname_filepath, rel_gustaxonname_cmd))
+        return files
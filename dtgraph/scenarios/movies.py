@@ -2,8 +2,8 @@ from dtgraph.scenarios.scenario import Scenario
 
 class Movies(Scenario):
     @staticmethod
-    def load(graph, size = None):
-        script = """
+    def script():
+        return """
             CREATE (TheMatrix:Movie {title:'The Matrix', released:1999, tagline:'Welcome to the Real World'})
             CREATE (Keanu:Person {name:'Keanu Reeves', born:1964})
             CREATE (Carrie:Person {name:'Carrie-Anne Moss', born:1967})
@@ -513,5 +513,13 @@ class Movies(Scenario):
             WITH TomH as a
             MATCH (a)-[:ACTED_IN]->(m)<-[:DIRECTED]-(d) RETURN a,m,d LIMIT 10;
         """
+
+    @classmethod
+    def load(cls, graph, size = None):
         graph.flush_database()
-        _ = graph.load_scenario_script(script, stats=True)
\ No newline at end of file
+        _ = graph.load_scenario_script(cls.script(), stats=True)
+
+    @classmethod
+    async def load_async(cls, graph, size = None):
+        await graph.flush_database()
+        _ = await graph.load_scenario_script(cls.script(), stats=True)
@@ -1,7 +1,172 @@
-from abc import ABC, abstractmethod
+import asyncio
+import re
+import time
+from abc import ABC
+
+from dtgraph.backend.capabilities import Capabilities, capabilities_of, profile_for
+
+# commands of the scenarios, merging a single node with all the columns of the row
+_MERGE_NODE = re.compile(r"^\s*MERGE\s*\(\s*(\w+)\s*:\s*(\w+)\s*\{(.*)\}\s*\)\s*$", re.DOTALL)
+
+MODES = ("merge", "create", "indexed")
+
+def merged_node(cmd):
+    """Returns the label and the properties of the node merged by a command, or None if the command is not a single MERGE of a node."""
+    m = _MERGE_NODE.match(cmd)
+    if m is None:
+        return None
+    return m.group(2), re.findall(r"(\w+)\s*:", m.group(3))
+
+def create_command(cmd):
+    """Rewrites a MERGE of a node into a CREATE, which does not look up existing nodes."""
+    return re.sub(r"^\s*MERGE\b", "CREATE", cmd, count=1)
+
+def index_command(capabilities, label, properties):
+    """Returns the name and the query of the index used by a MERGE of a node, or None if the backend has no schema.
+
+    Parameters
+    ----------
+    capabilities : dtgraph.backend.capabilities.Capabilities or str
+        Capabilities of the backend, or the name of its database.
+    """
+    if not isinstance(capabilities, Capabilities):
+        capabilities = profile_for(capabilities)
+    name = f"dtg_load_{label}"
+    # a composite index, if supported, matches the equality on all the properties merged upon
+    query = capabilities.create_index(name, label, properties)
+    return (name, query) if query is not None else None
+
+class Scenario(ABC):
+    """Base class of the scenarios, loading an input graph from CSV files.
+
+    Each CSV file is given with the openCypher command that is executed on each of its rows.
+    """
+
+    @staticmethod
+    def csv_files(size = None) -> list[tuple[str, str]]:
+        """Returns the paths of the CSV files of the scenario, along with their command."""
+        return []
+
+    @classmethod
+    def _files(cls, size):
+        return cls.csv_files() if size is None else cls.csv_files(size)
+
+    @classmethod
+    def load(cls, graph, size = None, csv_root = None, sessions = 4, batch_size = 10_000, mode = "merge") -> list[dict]:
+        """
+        Loads the scenario on the graph.
+
+        Parameters
+        ----------
+        csv_root : str
+            If provided, the CSV files are read by the client from this directory (e.g., "output-ibench-data"),
+            and their rows are sent in batches by `sessions` parallel sessions, see `Neo4jGraph.load_csv`.
+            Otherwise, the files are read by the server from its import directory with `LOAD CSV`.
+        mode : str
+            "merge" executes the commands as given, each MERGE scanning the nodes with the same label.
+            "create" rewrites the MERGE of nodes into CREATE, which is only correct if the files have no duplicate rows.
+            "indexed" keeps the MERGE semantics, but first creates an index on the label and the properties of each merged node.
+            Indexes are named `dtg_load_<label>`, and are kept after the load.
+
+        Returns
+        -------
+        list[dict]
+            Timings of each file: its path, the time (in ms) spent creating its index, the time (in ms) spent loading it,
+            and the counters of its queries, if the graph records metrics.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown load mode {mode}, expected one of {', '.join(MODES)}.")
+        graph.flush_database()
+        timings = []
+        for path, cmd in cls._files(size):
+            timing = {'path': path, 'mode': mode, 'index_time': 0}
+            start = time.monotonic()
+            cmd = cls._prepare(graph, cmd, mode)
+            if mode == "indexed":
+                cls._create_index(graph, cmd)
+                timing['index_time'] = int((time.monotonic() - start) * 1000)
+            position = cls._metrics_position(graph)
+            start = time.monotonic()
+            if csv_root is None:
+                graph.populate_with_csv(path, cmd, stats=True)
+            else:
+                graph.load_csv(path, cmd, stats=True, csv_root=csv_root, sessions=sessions, batch_size=batch_size)
+            timing['load_time'] = int((time.monotonic() - start) * 1000)
+            timings.append(cls._with_counters(graph, position, timing))
+        return timings
+
+    @classmethod
+    async def load_async(cls, graph, size = None, csv_root = None, sessions = 4, batch_size = 10_000, mode = "merge") -> list[dict]:
+        """Loads the scenario on a `dtgraph.backend.neo4j.async_graph.AsyncNeo4jGraph`, with concurrent loads of the CSV files.
+
+        See `load` for the parameters. As files are loaded concurrently, counters are not reported by file.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown load mode {mode}, expected one of {', '.join(MODES)}.")
+        await graph.flush_database()
+        files = [(path, cls._prepare(graph, cmd, mode)) for path, cmd in cls._files(size)]
+        async def load_file(path, cmd):
+            timing = {'path': path, 'mode': mode, 'index_time': 0}
+            start = time.monotonic()
+            if mode == "indexed":
+                await cls._create_index_async(graph, cmd)
+                timing['index_time'] = int((time.monotonic() - start) * 1000)
+            start = time.monotonic()
+            if csv_root is None:
+                await graph.populate_with_csv(path, cmd, stats=True)
+            else:
+                await graph.load_csv(path, cmd, stats=True, csv_root=csv_root, sessions=sessions, batch_size=batch_size)
+            timing['load_time'] = int((time.monotonic() - start) * 1000)
+            return timing
+        return list(await asyncio.gather(*[load_file(path, cmd) for path, cmd in files]))
+
+    @staticmethod
+    def _prepare(graph, cmd, mode):
+        if mode == "create" and merged_node(cmd) is not None:
+            return create_command(cmd)
+        return cmd
+
+    @staticmethod
+    def _create_index(graph, cmd):
+        capabilities = capabilities_of(graph)
+        node = merged_node(cmd)
+        index = index_command(capabilities, *node) if node is not None else None
+        if index is None:
+            return
+        name, query = index
+        if capabilities.schema_autocommit:
+            graph.run_schema_command(query)
+        else:
+            graph.addIndex(query, stats=True)
+            if capabilities.index_population_async:
+                graph.await_indexes([name])
+
+    @staticmethod
+    async def _create_index_async(graph, cmd):
+        capabilities = capabilities_of(graph)
+        node = merged_node(cmd)
+        index = index_command(capabilities, *node) if node is not None else None
+        if index is None:
+            return
+        name, query = index
+        if capabilities.schema_autocommit:
+            await graph.run_schema_command(query)
+        else:
+            await graph.addIndex(query, stats=True)
+            if capabilities.index_population_async:
+                await graph.await_indexes([name])
+
+    @staticmethod
+    def _metrics_position(graph):
+        metrics = getattr(graph, 'metrics', None)
+        return len(metrics) if metrics is not None else None
 
-class Scenario(ABC): 
     @staticmethod
-    @abstractmethod
-    def load(graph, size = None):
-        pass
\ No newline at end of file
+    def _with_counters(graph, position, timing):
+        metrics = getattr(graph, 'metrics', None)
+        if metrics is None or position is None:
+            return timing
+        totals = metrics.since(position).totals().get("csv")
+        if totals is not None:
+            timing.update({k: totals[k] for k in ('queries', 'available_after', 'consumed_after', 'nodes_created', 'properties_set', 'labels_added')})
+        return timing
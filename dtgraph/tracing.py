@@ -0,0 +1,184 @@
+"""Tracing of transformations.
+
+This module contains the `Tracer` class, which opens nested spans around the phases of a transformation,
+the application of each rule and each query sent to the backend, and notifies hooks when spans start and end.
+The `ChromeTraceExporter` hook writes the spans as a Chrome trace-event JSON file,
+which can be opened offline with chrome://tracing or https://ui.perfetto.dev.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+
+# span in which the current thread or task is running
+_current = contextvars.ContextVar("dtgraph_span", default=None)
+
+def query_hash(query) -> str:
+    """Returns a short hash identifying a compiled query, e.g., to match the spans of a rule across runs."""
+    if query is None:
+        return None
+    if not isinstance(query, str):
+        query = getattr(query, 'text', str(query))
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+
+def _track() -> int:
+    """Returns the identifier of the current asyncio task when called from a running loop, and of the current thread otherwise,
+    so that the spans of concurrent tasks sharing a thread are not laid out on the same track."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        # no running event loop
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+class Span(object):
+    """
+    Timed section of a run.
+
+    Attributes
+    ----------
+    name : str
+        Name of the section, e.g., "rule" or "exec_rule".
+    category : str
+        Kind of section: "transformation", "phase", "rule" or "query".
+    attributes : dict
+        Data attached to the section, e.g., the rule identifier, the hash of the compiled query or the counters of the query.
+    parent : Span
+        Span in which this span is nested, if any.
+    start, end : float
+        Bounds of the section, in seconds (see `time.perf_counter`).
+    thread : int
+        Identifier of the thread which opened the section.
+    track : int
+        Identifier of the asyncio task which opened the section, or of the thread outside of an event loop.
+    """
+
+    def __init__(self, name, category, attributes = None, parent = None):
+        self.name = name
+        self.category = category
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.thread = threading.get_ident()
+        self.track = _track()
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+class TraceHook(object):
+    """Interface of the objects notified by a `Tracer`. Both callbacks do nothing by default."""
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        pass
+
+class Tracer(object):
+    """
+    Opens spans and notifies its hooks.
+    Spans opened while another span is open, in the same thread or task, are nested in it.
+    Without hooks, spans are not created at all.
+
+    Methods
+    -------
+    span(name, category, **attributes)
+        Context manager opening a span.
+    annotate(**attributes)
+        Attaches data to the innermost open span.
+    """
+
+    def __init__(self, hooks = None):
+        self.hooks = list(hooks) if hooks is not None else []
+
+    @contextlib.contextmanager
+    def span(self, name, category, **attributes):
+        if not self.hooks:
+            yield None
+            return
+        span = Span(name, category, attributes, parent=_current.get())
+        token = _current.set(span)
+        for hook in self.hooks:
+            hook.on_start(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes['error'] = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current.reset(token)
+            for hook in self.hooks:
+                hook.on_end(span)
+
+    def annotate(self, **attributes):
+        span = _current.get()
+        if self.hooks and span is not None:
+            span.attributes.update(attributes)
+
+def traced(category):
+    """Decorates a method of a graph, so that each call runs in a span of its tracer, named after the method."""
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def wrapper(self, *args, **kwargs):
+                tracer = getattr(self, 'tracer', None)
+                if tracer is None:
+                    return await method(self, *args, **kwargs)
+                with tracer.span(method.__name__, category):
+                    return await method(self, *args, **kwargs)
+        else:
+            @functools.wraps(method)
+            def wrapper(self, *args, **kwargs):
+                tracer = getattr(self, 'tracer', None)
+                if tracer is None:
+                    return method(self, *args, **kwargs)
+                with tracer.span(method.__name__, category):
+                    return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+class ChromeTraceExporter(TraceHook):
+    """
+    Collects the spans of a tracer as Chrome trace events.
+
+    Methods
+    -------
+    write(path)
+        Writes the collected events as a JSON file.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        event = {
+            'name': span.name if 'rule' not in span.attributes else f"{span.name} {span.attributes['rule']}",
+            'cat': span.category,
+            'ph': "X", # complete event, i.e., with a duration
+            'ts': (span.start - self._origin) * 1_000_000,
+            'dur': (span.end - span.start) * 1_000_000,
+            'pid': os.getpid(),
+            'tid': span.track,
+            'args': {k: v if isinstance(v, (int, float, str, bool)) or v is None else str(v) for k, v in span.attributes.items()},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {'traceEvents': sorted(self.events, key=lambda e: e['ts']), 'displayTimeUnit': "ms"}
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
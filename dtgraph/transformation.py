@@ -9,8 +9,18 @@ An instance manages a set of transformation rules, and provide several facilitie
 - Efficient lookup and investigation of conflicts;
 - Ejection mechanism: when a transformation is validated, removes internal bookeeping data.
 """
+import asyncio
+import contextlib
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dtgraph.backend.capabilities import capabilities_of
+from dtgraph.export import export_graph, export_graph_async
+from dtgraph.metrics import QueryStats, log
 from dtgraph.rule import Rule
-from dtgraph.exceptions import TransformationActivationError, TransformationDeactivationError, TransformationDiagnosisError
+from dtgraph.tracing import query_hash
+from dtgraph.exceptions import TransformationActivationError, TransformationDeactivationError, TransformationDiagnosisError, TransformationExportError, PlanError
 
 class Transformation(object):
     """
@@ -18,7 +28,7 @@ class Transformation(object):
 
     Methods
     -------
-    abort()
+    abort(keep_index = False, batch_size = None)
         Abort the transformation by removing output data from the underlying graph. 
         The transformation is deactivated.
     add(rule)
@@ -27,20 +37,34 @@ class Transformation(object):
     apply_on(graph)
         Execute the query on the Neo4jGraph graph. 
         The transformation is activated.
+        The statistics of the queries it sent are stored in `report`, see `dtgraph.metrics.RunStats`.
+    plan(graph, budget = None)
+        Explains every rule on the given graph, and checks their estimated cardinalities against a budget.
+    apply_delta()
+        Applies the rules on the input nodes added since the transformation has been applied.
     diagnose()
         List all conflicting attributes on each output element.
-    eject(destrutive = False)
-        Remove internal bookeeping data (if any). 
+    conflict_summary()
+        Count the conflicts by output label or relationship type and property, on the server.
+    conflicts(elements = "all", fetch_size = 1000, limit = None), export_conflicts(path, ...)
+        Stream the conflicting output elements in pages, or write them to a JSON lines file.
+    export(path, format = "csv", graph = None, labels = None, partitions = 4, batch_size = 10_000)
+        Write the output graph to bulk-import CSV, JSON lines or Parquet files, before or after eject.
+    eject(destrutive = False, batch_size = None, background = False)
+        Remove internal bookeeping data (if any), optionally in batches and in a background thread. 
         The transformation is deactivated.
         This is useful if you want to keep both the input and output for later use.
+        Returns the statistics of the queries sent since the transformation has been applied.
     exec(graph, destructive = False)
         Perform apply_on(graph) followed by eject(destructive)
         The transformation is deactivated.
+    apply_on_async(graph), eject_async(destructive = False), abort_async(), diagnose_async(), conflict_summary_async(), export_conflicts_async(path, ...)
+        Coroutines counterparts of the above methods, for graphs accessed through the asyncio API.
     """
 
     _graph = None # when not none, stores a Neo4jGraph object on which the transformation is currently active
 
-    def __init__(self, rules, with_diagnose=True, explain = False, profile = False):
+    def __init__(self, rules, with_diagnose=True, explain = False, profile = False, batch_size = None, cache = None, fuse = False, parameterize = False, compact_ids = False, parallel = None, retries = 5, incremental = False, budget = None, strict_budget = True, tracer = None):
         """
         Initializes a transformation with a list of rules.
 
@@ -48,11 +72,61 @@ class Transformation(object):
         ----------
         rules : list[dtgraph.rule.Rule]
             A list of rules.
+        batch_size : int
+            If provided, each rule commits its output in transactions of `batch_size` lhs bindings.
+            This keeps the transaction state bounded on large inputs.
+        cache : dtgraph.cache.RuleCache
+            If provided, compiled rules are looked up in this cache before being compiled.
+            Rules created with the same cache (see `Rule`) also skip their parsing when their compiled script is found.
+        fuse : bool
+            Whether rules with equivalent lhs should be executed as a single statement, evaluating their lhs only once.
+            A fused statement runs at the position of the first of its rules, hence a rule is only fused with an earlier one
+            if it does not interfere with the rules in between (see `Rule.interferes_with`).
+        parameterize : bool
+            Whether the constants of the rules should be passed as query parameters, so that similar rules share their execution plans.
+        compact_ids : bool
+            Whether output elements should be identified by a fixed-width hash of their Skolem tuple, a pair of integers, instead of the tuple itself.
+            This reduces the size of the index on identifiers. Hash collisions are reported by diagnose().
+            Requires APOC on Neo4j, and MAGE on Memgraph, which is checked when the transformation is applied.
+        parallel : int
+            If provided, rules are executed by this number of concurrent sessions.
+            Rules that may interfere (see `Rule.interferes_with`) are still executed in order.
+        retries : int
+            Number of times a rule, or a partition of a partitioned rule, is executed again after a transient error, e.g., a deadlock between concurrent rules.
+        incremental : bool
+            Whether the input nodes added after the application of the transformation are processed by `apply_delta`.
+            The marks of new nodes are then cleared each time the transformation is applied.
+        budget : int
+            If provided, every rule is explained before the transformation is applied (see `plan`),
+            and none is executed if an operator of one of them is estimated to produce more rows than `budget`.
+        strict_budget : bool
+            Whether exceeding the budget raises a PlanError, or only prints a warning.
+        tracer : dtgraph.tracing.Tracer
+            Tracer opening a span around the application, ejection, abortion and diagnosis of the transformation, 
+            its phases and each rule. Defaults to the tracer of the graph the transformation is applied on.
         """
         self._rules = rules
         self._with_diagnose = with_diagnose
         self._explain = explain
         self._profile = profile
+        self._batch_size = batch_size
+        self._cache = cache
+        self._fuse = fuse
+        self._parameterize = parameterize
+        self._compact_ids = compact_ids
+        self._parallel = parallel
+        self._retries = retries
+        self._incremental = incremental
+        self._deltas = {} # delta variants of the rules, by identifier of the rule
+        self._budget = budget
+        self._strict_budget = strict_budget
+        self._tracer = tracer
+        self.plans = [] # plans of the rules, in order of execution, if the transformation has been explained or profiled
+        self.report = None # statistics of the queries sent by the last application of the transformation
+        self._metrics_start = None # position of the active graph's metrics when the transformation has been applied
+        self._fused = {} # fused rules, by tuple of identifiers of their members
+        self._constraints = {} # queries dropping the constraints (or indexes) created on the active graph, and whether they are constraints, by name
+        self._storage_mode = None # storage mode of the active graph before it has been switched to the one of its capabilities, if it has been
 
     def add(self, rule):
         """
@@ -66,7 +140,8 @@ class Transformation(object):
         """
         self._rules.append(rule)
         if self._graph:
-            rule.apply_on(self._graph, with_diagnose=self._with_diagnose, explain = self._explain, profile = self._profile)
+            self._create_constraints([rule])
+            self._apply_rule(rule)
 
     def exec(self, graph, destructive = False):
         """
@@ -101,39 +176,304 @@ class Transformation(object):
             raise TransformationActivationError("The transformation is already active on another graph.")
         else:
             self._graph = graph
-        self._pre_apply()
-        tt = 0
+        self._metrics_start = self._metrics_position()
+        with self._span("apply_on", "transformation", rules=len(self._rules)):
+            if self._budget is not None:
+                try:
+                    with self._span("plan", "phase"):
+                        self.plan(graph, self._budget)
+                except PlanError:
+                    self._graph = None
+                    raise
+            with self._span("pre_apply", "phase"):
+                self._pre_apply()
+            rules = [self._unit_rule(unit) for unit in self._units()]
+            if self._parallel and self._parallel > 1:
+                tt = self._apply_concurrently(rules)
+            else:
+                tt = 0
+                for r in rules:
+                    t = self._apply_rule(r)
+                    tt += t if t else 0
+            if self._explain or self._profile:
+                self.plans = [r.last_plan for r in rules]
+            if self._incremental:
+                self._graph.clear_new_marks(stats=True)
+        self.report = self._metrics_since(self._metrics_start)
+        return tt
+
+    def plan(self, graph, budget = None) -> list:
+        """
+        Explains every rule on the given graph, without executing them nor activating the transformation.
+
+        Parameters
+        ----------
+        graph : dtgraph.backend.neo4j.graph.Neo4jGraph
+            Graph on which the rules would be executed.
+        budget : int
+            If provided, maximum number of rows an operator of a rule is estimated to produce, 
+            e.g., to detect unintended cartesian products.
+            Exceeding it raises a PlanError if the transformation has a strict budget, or prints a warning otherwise.
+
+        Returns:
+        --------
+        list[dtgraph.plan.PlanNode]
+            The plan of each rule (fused rules having a single plan), None if the backend does not report plans.
+        """
+        plans = [r.explain(graph, with_diagnose=self._with_diagnose, explain = self._explain, profile = self._profile, batch_size = self._batch_size, cache = self._cache, parameterize = self._parameterize, compact_ids = self._compact_ids)
+                 for r in [self._unit_rule(unit) for unit in self._units()]]
+        self._check_budget(graph, plans, budget)
+        return plans
+
+    def _check_budget(self, graph, plans, budget):
+        if budget is None:
+            return
+        for i, plan in enumerate(plans):
+            if plan is None:
+                continue
+            estimated_rows = plan.max_estimated_rows()
+            if estimated_rows > budget:
+                operator = max(plan.walk(), key=lambda node: node.estimated_rows or 0)
+                message = f"Rule #{i} is estimated to produce {int(estimated_rows)} rows in operator {operator.operator}, exceeding the budget of {budget} rows."
+                if self._strict_budget:
+                    raise PlanError(message)
+                log(graph, "Plan: Warning: " + message)
+
+    def apply_delta(self) -> int:
+        """
+        Applies the rules on the input nodes added since the transformation has been applied, 
+        i.e., the nodes marked as new by the loaders (see `Neo4jGraph.populate_with_csv`).
+        Relationships added to the input should have their endpoints marked as new.
+
+        Each rule is evaluated on the bindings of its lhs where at least one node is new, see `Rule.delta_variants`.
+        As rules are idempotent, the output is the same as if the transformation had been applied on the whole input.
+        Rules whose lhs is not monotone, or reads the output of the transformation, are applied on the whole input.
+        """
+        if self._graph is None:
+            raise TransformationActivationError("This transformation is not currently active.")
+        if not self._incremental:
+            raise TransformationActivationError("This transformation has not been initialized as incremental.")
+        outputs = set()
         for r in self._rules:
-            t = r.apply_on(self._graph, with_diagnose=self._with_diagnose, explain = self._explain, profile = self._profile)[0]
-            tt += t if t else 0
+            labels, types = r.output_labels()
+            outputs |= labels | types | {"_dummy"}
+        tt = 0
+        with self._span("apply_delta", "transformation", rules=len(self._rules)):
+            for i, r in enumerate(self._rules):
+                if id(r) not in self._deltas:
+                    reads = r.input_labels()
+                    self._deltas[id(r)] = r.delta_variants() if reads is not None and not reads & outputs else None
+                variants = self._deltas[id(r)]
+                if variants is None:
+                    log(self._graph, f"Delta: Rule #{i} is applied on the whole input.")
+                    variants = [r]
+                for v in variants:
+                    t = self._apply_rule(v)
+                    tt += t if t else 0
+            self._graph.clear_new_marks(stats=True)
+        return tt
+
+    def _metrics_position(self):
+        metrics = getattr(self._graph, 'metrics', None)
+        return len(metrics) if metrics is not None else None
+
+    def _metrics_since(self, position, graph = None):
+        metrics = getattr(graph if graph is not None else self._graph, 'metrics', None)
+        if metrics is None:
+            return None
+        return metrics.since(position or 0)
+
+    def _unit_rule(self, unit: list[Rule]) -> Rule:
+        """Returns the rule executing a unit, fusing its rules if needed."""
+        if len(unit) == 1:
+            return unit[0]
+        key = tuple(map(id, unit))
+        if key not in self._fused:
+            self._fused[key] = Rule.fuse(unit)
+        log(self._graph, f"Fused: Rules {', '.join(['#' + str(self._rules.index(m)) for m in unit])} share a single evaluation of their lhs.")
+        return self._fused[key]
+
+    def _apply_rule(self, r: Rule) -> int:
+        """Applies a single rule, each of its partitions being retried after transient errors, see `Rule.apply_on`."""
+        with self._span("rule", "rule", rule=self._rule_id(r)) as span:
+            t = r.apply_on(self._graph, with_diagnose=self._with_diagnose, explain = self._explain, profile = self._profile, batch_size = self._batch_size, cache = self._cache, parameterize = self._parameterize, compact_ids = self._compact_ids, retries = self._retries)[0]
+            self._annotate_rule(span, r, t, r.last_retries)
+            self._record_outputs(r)
+            return t
+
+    def _apply_concurrently(self, rules: list[Rule]) -> int:
+        """Applies the rules with a pool of threads, each rule waiting for the previous rules it interferes with."""
+        start = time.monotonic()
+        pending = {i: {j for j in range(i) if r.interferes_with(rules[j])} for i, r in enumerate(rules)}
+        done = set()
+        running = {}
+        tt = 0
+        with ThreadPoolExecutor(max_workers=self._parallel) as executor:
+            while pending or running:
+                for i in sorted(pending):
+                    if pending[i] <= done:
+                        # the rules run in copies of the current context, hence their spans are nested in the span of the transformation
+                        running[executor.submit(contextvars.copy_context().run, self._apply_rule, rules[i])] = i
+                        del pending[i]
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    t = future.result()
+                    tt += t if t else 0
+                    done.add(running.pop(future))
+        log(self._graph, f"Parallel: Applied {len(rules)} rules with {self._parallel} sessions, completed after {int((time.monotonic() - start) * 1000)} ms.")
         return tt
 
+    def _span(self, name, category, graph = None, **attributes):
+        """Returns a context manager opening a span of the tracer, if any, i.e., the tracer of the transformation or of the graph."""
+        tracer = self._tracer if self._tracer is not None else getattr(graph if graph is not None else self._graph, 'tracer', None)
+        if tracer is None:
+            return contextlib.nullcontext()
+        return tracer.span(name, category, **attributes)
+
+    def _rule_id(self, r: Rule) -> str:
+        """Identifies a rule by its position in the transformation, e.g., "#2", "#0+#3" for fused rules, or "#1/delta" for delta variants."""
+        for i, member in enumerate(self._rules):
+            if member is r:
+                return f"#{i}"
+        for key, fused in self._fused.items():
+            if fused is r:
+                return "+".join([f"#{i}" for i, member in enumerate(self._rules) if id(member) in key])
+        for i, member in enumerate(self._rules):
+            if any(v is r for v in self._deltas.get(id(member)) or []):
+                return f"#{i}/delta"
+        return "?"
+
+    def _record_outputs(self, r: Rule):
+        """Records the statistics of each rule of a fused rule, as counted by their shared query (see `Rule.last_outputs`),
+        under the phase "fused". The time and counters of the query are only recorded once, under the phase "rule".
+        """
+        metrics = getattr(self._graph, 'metrics', None)
+        if metrics is None or r.last_outputs is None:
+            return
+        for member, outputs in zip(r._members, r.last_outputs):
+            rule = self._rule_id(member)
+            metrics.add(QueryStats("fused", label=member.lhs_key()[:80], rule=rule, outputs=outputs,
+                message=f"Fused: Rule {rule} matched {outputs['rows']} bindings, merged {outputs['nodes_merged']} nodes and {outputs['relationships_merged']} relationships."))
+
+    @staticmethod
+    def _annotate_rule(span, r: Rule, t: int, attempt: int):
+        if span is None:
+            return
+        span.attributes['query_hash'] = query_hash(r._compiled)
+        span.attributes['time'] = t
+        span.attributes['retries'] = attempt
+
+    def _units(self) -> list[list[Rule]]:
+        """Splits the rules into units of execution, in order; rules with equivalent lhs form a single unit if fusion is enabled.
+
+        A fused unit runs at the position of its first rule, hence a rule only joins an earlier unit 
+        if it does not interfere with any of the rules between them, i.e., with the rules of the subsequent units.
+        Otherwise, it starts a new unit, which later rules with the same lhs may join.
+        """
+        if not self._fuse:
+            return [[r] for r in self._rules]
+        units = []
+        by_lhs = {} # lhs key -> position of the last unit of rules with this lhs
+        for r in self._rules:
+            key = r.lhs_key()
+            position = by_lhs.get(key) if key is not None else None
+            if position is not None and not any(r.interferes_with(other) for unit in units[position + 1:] for other in unit):
+                units[position].append(r)
+                continue
+            units.append([r])
+            if key is not None:
+                by_lhs[key] = len(units) - 1
+        return units
+
     def _pre_apply(self):
         """Sets-up the environment for executing the transformation."""
         if self._graph is None:
             raise TransformationActivationError("This transformation is not currently active.")
-        elif self._graph.database == "neo4j":
-            indexDummy = """
-            CREATE INDEX idx_dummy IF NOT EXISTS
-            FOR (n:_dummy)
-            ON (n._id)
-            """
-            self._graph.addIndex(indexDummy, stats=True)
-        elif self._graph.database == "memgraph":
-            with self._graph.driver.session(database="memgraph") as session:
-                session.run("CREATE INDEX ON :_dummy(_id)")
-        
+        capabilities = capabilities_of(self._graph)
+        if self._compact_ids and not capabilities.evaluates_rules and not self._graph.has_hash_function(capabilities.hash_function):
+            self._missing_hash_function(capabilities)
+        if capabilities.key_constraints:
+            # a range index from previous versions would conflict with the uniqueness constraint on the same property
+            self._graph.dropIndex(capabilities.drop_index("idx_dummy", "_dummy", ["_id"]), stats=False)
+        self._create_constraints(self._rules)
+        if capabilities.storage_mode is not None and self._storage_mode is None:
+            current = self._graph.storage_mode()
+            if current != capabilities.storage_mode:
+                self._graph.set_storage_mode(capabilities.storage_mode, stats=True)
+                self._storage_mode = current
+
+    def _missing_hash_function(self, capabilities):
+        """Deactivates the transformation, which can not identify its output by compact identifiers on this server."""
+        self._graph = None
+        raise TransformationActivationError(f"Compact identifiers require the function {capabilities.hash_function}, which the server does not provide "
+                                            "(it is part of APOC on Neo4j, and of MAGE on Memgraph).")
+
+    def _create_constraints(self, rules):
+        """Creates uniqueness constraints (or indexes) on the identifiers of output elements, and waits until they can be used."""
+        names = []
+        for name, query, constraint in self._new_constraints(rules):
+            self._schema_command(query, constraint=constraint)()
+            names.append(name)
+        if names and capabilities_of(self._graph).index_population_async:
+            self._graph.await_indexes(names, stats=True)
+
+    def _new_constraints(self, rules) -> list[tuple[str, str, bool]]:
+        """Returns the names and the creation queries of the constraints required by the rules which have not been created yet,
+        and whether they are key constraints rather than plain indexes.
+
+        MERGE clauses then perform unique index seeks from their first row, and concurrent writers cannot duplicate an element.
+        Output nodes are all looked up through the `_dummy` label, whereas output relationships are looked up by type.
+        Backends without uniqueness constraints get indexes instead, and relationships are only indexed if the backend supports it,
+        see `dtgraph.backend.capabilities.Capabilities.create_key`.
+        If the capabilities of the graph ask for it, the identifiers of output nodes are also indexed by output label,
+        so that rules (e.g., delta rules) and queries reading the output by label seek an index rather than scanning the label.
+        """
+        capabilities = capabilities_of(self._graph)
+        keys = []
+        if "cns_dummy" not in self._constraints:
+            keys.append(("cns_dummy", "_dummy", False))
+        labels, types = set(), set()
+        for r in rules:
+            l, t = r.output_labels()
+            labels |= l
+            types |= t
+        keys.extend([(f"cns_dummy_{t}", t, True) for t in sorted(types) if f"cns_dummy_{t}" not in self._constraints])
+        constraints = []
+        for name, label, relationship in keys:
+            query = capabilities.create_key(name, label, "_id", relationship=relationship)
+            if query is not None:
+                constraints.append((name, query, True))
+                self._constraints[name] = (capabilities.drop_key(name, label, "_id", relationship=relationship), True)
+        if capabilities.index_output_labels:
+            for label in sorted(labels):
+                name = f"idx_dtg_{label}"
+                query = capabilities.create_index(name, label, ["_id"])
+                if name in self._constraints or query is None:
+                    continue
+                constraints.append((name, query, False))
+                self._constraints[name] = (capabilities.drop_index(name, label, ["_id"]), False)
+        return constraints
+
+    def _schema_command(self, query, drop = False, constraint = True):
+        """Returns the call running a schema command on the active graph, through the method its backend requires."""
+        capabilities = capabilities_of(self._graph)
+        if capabilities.schema_autocommit:
+            return lambda: self._graph.run_schema_command(query)
+        if constraint and capabilities.key_constraints:
+            method = self._graph.dropConstraint if drop else self._graph.addConstraint
+        else:
+            method = self._graph.dropIndex if drop else self._graph.addIndex
+        return lambda: method(query, stats=True)
+
     def _pre_eject(self):
         """Destroys the transformation's execution environment."""
         if self._graph is None:
             raise TransformationDeactivationError("This transformation is not currently active.")
-        elif self._graph.database == "neo4j":
-            self._graph.dropIndex("DROP INDEX idx_dummy IF EXISTS", stats=True)
-        elif self._graph.database == "memgraph":
-            with self._graph.driver.session(database="memgraph") as session:
-                session.run("DROP INDEX ON :_dummy(_id)")
+        for query, constraint in self._constraints.values():
+            self._schema_command(query, drop=True, constraint=constraint)()
+        self._constraints = {}
 
-    def eject(self, destructive = False):
+    def eject(self, destructive = False, batch_size = None, background = False):
         """
         Removes all internal data on the current active graph, 
         and deactivates the transformation.
@@ -143,26 +483,64 @@ class Transformation(object):
         ----------
         destructive : bool
             Whether or not eject should remove input data.
+        batch_size : int
+            If provided, bookkeeping data is removed in transactions of `batch_size` output nodes, see `Neo4jGraph.remove_bookkeeping`,
+            and input data is deleted in transactions of `batch_size` elements.
+        background : bool
+            Whether bookkeeping data is removed by a background thread. 
+            The transformation is deactivated immediately, but should not be applied again on the graph before the removal is done.
+
+        Returns
+        -------
+        dtgraph.metrics.RunStats | concurrent.futures.Future
+            Statistics of the queries sent since the transformation has been applied, including the ejection.
+            None if the graph does not record metrics.
+            In background, a future of these statistics, which can be awaited with `result()` or polled with `done()`.
         """
-        self._pre_eject()
         if self._graph is None:
             raise TransformationDeactivationError("This transformation is not currently active.")
-        if destructive:
-            self._graph.destruct_input(stats=True)
-        self._graph.remove_bookkeeping(stats=True)
+        graph = self._graph
+        with self._span("pre_eject", "phase"):
+            self._pre_eject()
+        # the storage mode is restored once the bookkeeping has been removed, which is faster in the switched mode
+        storage_mode, self._storage_mode = self._storage_mode, None
         # finally, set the transformation to be inactive
         self._graph = None
+        if background:
+            executor = ThreadPoolExecutor(max_workers=1)
+            future = executor.submit(contextvars.copy_context().run, self._eject, graph, destructive, batch_size, self._metrics_start, storage_mode)
+            # the thread of the executor terminates once the removal is done
+            executor.shutdown(wait=False)
+            return future
+        return self._eject(graph, destructive, batch_size, self._metrics_start, storage_mode)
 
-    def abort(self, keep_index = False):
+    def _eject(self, graph, destructive, batch_size, start, storage_mode = None):
+        """Removes the input data if destructive, then bookkeeping data, and returns the statistics of the queries sent from `start`.
+        The storage mode of the graph is then restored to `storage_mode`, if provided."""
+        with self._span("eject", "transformation", graph = graph, destructive = destructive):
+            if destructive:
+                graph.destruct_input(stats=True, batch_size=batch_size)
+            graph.remove_bookkeeping(stats=True, batch_size=batch_size)
+            if storage_mode is not None:
+                graph.set_storage_mode(storage_mode, stats=True)
+        return self._metrics_since(start, graph)
+
+    def abort(self, keep_index = False, batch_size = None):
         """
         Removes all current output data for the active transformation,
         and deactivates the transformation.
+        If `batch_size` is provided, output data is deleted in transactions of `batch_size` elements, relationships first.
         """
-        if not keep_index:
-            self._pre_eject()
         if self._graph is None:
             raise TransformationDeactivationError("This transformation is not currently active.")
-        self._graph.abort(stats=True)
+        with self._span("abort", "transformation"):
+            if not keep_index:
+                with self._span("pre_eject", "phase"):
+                    self._pre_eject()
+            self._graph.abort(stats=True, batch_size=batch_size)
+            if self._storage_mode is not None:
+                self._graph.set_storage_mode(self._storage_mode, stats=True)
+                self._storage_mode = None
         # finally, set the transformation to be inactive
         self._graph = None
 
@@ -175,6 +553,249 @@ class Transformation(object):
             raise TransformationDiagnosisError("This transformation is not currently active.")
         if self._with_diagnose == False:
             raise TransformationDiagnosisError("Diagnosis have been explicitely deactivated for this transformation.")
-        nb_c_n = self._graph.diagnose_nodes(stats=True)
-        nb_c_e = self._graph.diagnose_edges(stats=True)
-        return (nb_c_n, nb_c_e)
\ No newline at end of file
+        with self._span("diagnose", "transformation"):
+            nb_c_n = self._graph.diagnose_nodes(stats=True)
+            nb_c_e = self._graph.diagnose_edges(stats=True)
+            if self._compact_ids:
+                self._graph.diagnose_collisions(stats=True)
+        return (nb_c_n, nb_c_e)
+
+    def conflict_summary(self) -> list[dict]:
+        """
+        Counts the conflicting properties by output label (or relationship type) and property, in a single query
+        (made of a scan of the conflicting nodes and a scan of the relationships, see `Neo4jGraph.conflict_summary`).
+        Unlike `diagnose`, conflicting elements are not transferred to the client.
+
+        Returns
+        -------
+        list[dict]
+            Rows with keys 'kind' ("node" or "edge"), 'label', 'key' and 'count', by decreasing count.
+            The label is None for nodes without output label.
+        """
+        self._check_diagnosable()
+        with self._span("conflict_summary", "transformation"):
+            return self._graph.conflict_summary(stats=True)
+
+    def conflicts(self, elements = "all", fetch_size = 1000, limit = None):
+        """
+        Streams the conflicting output elements as compact records, see `Neo4jGraph.iter_conflicts`.
+        Unlike `diagnose`, conflicts are never held in memory all at once.
+        """
+        self._check_diagnosable()
+        return self._graph.iter_conflicts(elements=elements, fetch_size=fetch_size, limit=limit)
+
+    def export_conflicts(self, path, elements = "all", fetch_size = 1000, limit = None) -> int:
+        """Writes the conflicting output elements to a JSON lines file, and returns their number."""
+        self._check_diagnosable()
+        with self._span("export_conflicts", "transformation"):
+            return self._graph.export_conflicts(path, elements=elements, fetch_size=fetch_size, limit=limit)
+
+    def export(self, path, format = "csv", graph = None, labels = None, partitions = 4, batch_size = 10_000) -> dict:
+        """
+        Writes the output graph to files in the directory `path`, in batches, see `dtgraph.export`.
+
+        While the transformation is active, its output elements (the `_dummy` nodes and the relationships they identify) are exported.
+        After eject, the nodes with one of the output labels of the rules, and the relationships of the output types between them, are exported.
+
+        Parameters
+        ----------
+        format : str
+            "csv" (files of `neo4j-admin database import`), "jsonl" or "parquet".
+        graph : dtgraph.backend.neo4j.graph.Neo4jGraph
+            Graph to export from, required once the transformation has been ejected. Defaults to the active graph.
+        labels : list[str]
+            If provided, labels of the exported nodes (and of the endpoints of the exported relationships), instead of the output labels of the rules.
+        partitions : int
+            Number of parts the elements are split into by identifier, each read concurrently and written to its own files.
+        batch_size : int
+            Number of elements fetched from the server, and written to the files, at once.
+
+        Returns
+        -------
+        dict
+            The number of exported 'nodes' and 'relationships', and the paths of the written 'files'.
+        """
+        graph, labels, types = self._export_selection(graph, labels)
+        with self._span("export", "transformation", graph = graph, format = format):
+            return export_graph(graph, path, format=format, labels=labels, types=types, partitions=partitions, batch_size=batch_size)
+
+    def _export_selection(self, graph, labels):
+        """Returns the graph to export from, and the labels and types of the exported elements, see `Neo4jGraph.iter_output`."""
+        if graph is None:
+            graph = self._graph
+        if graph is None:
+            raise TransformationExportError("This transformation is not currently active, hence the graph its output has been ejected to should be given.")
+        if graph is self._graph and labels is None:
+            # the output is identified by the bookkeeping of the transformation
+            return graph, None, None
+        if labels is not None:
+            return graph, list(labels), None
+        labels, types = set(), set()
+        for r in self._rules:
+            l, t = r.output_labels()
+            labels |= l
+            types |= t
+        if not labels:
+            raise TransformationExportError("The output labels of the rules are unknown, hence the labels to export should be given.")
+        return graph, sorted(labels), sorted(types)
+
+    def _check_diagnosable(self):
+        if self._graph is None:
+            raise TransformationDiagnosisError("This transformation is not currently active.")
+        if self._with_diagnose == False:
+            raise TransformationDiagnosisError("Diagnosis have been explicitely deactivated for this transformation.")
+
+    async def apply_on_async(self, graph) -> int:
+        """
+        Applies all the rules on the given `dtgraph.backend.neo4j.async_graph.AsyncNeo4jGraph`.
+        Sets the transformation in active state.
+        If `parallel` was given, non-interfering rules run as concurrent tasks.
+        """
+        if self._graph:
+            raise TransformationActivationError("The transformation is already active on another graph.")
+        else:
+            self._graph = graph
+        self._metrics_start = self._metrics_position()
+        with self._span("apply_on", "transformation", rules=len(self._rules)):
+            if self._budget is not None:
+                try:
+                    with self._span("plan", "phase"):
+                        await self.plan_async(graph, self._budget)
+                except PlanError:
+                    self._graph = None
+                    raise
+            with self._span("pre_apply", "phase"):
+                await self._pre_apply_async()
+            rules = [self._unit_rule(unit) for unit in self._units()]
+            if not self._parallel or self._parallel < 2:
+                tt = 0
+                for r in rules:
+                    t = await self._apply_rule_async(r)
+                    tt += t if t else 0
+            else:
+                tt = await self._apply_concurrently_async(rules)
+            if self._explain or self._profile:
+                self.plans = [r.last_plan for r in rules]
+            if self._incremental:
+                await self._graph.clear_new_marks(stats=True)
+        self.report = self._metrics_since(self._metrics_start)
+        return tt
+
+    async def plan_async(self, graph, budget = None) -> list:
+        """See `plan`."""
+        plans = []
+        for r in [self._unit_rule(unit) for unit in self._units()]:
+            plans.append(await r.explain_async(graph, with_diagnose=self._with_diagnose, explain = self._explain, profile = self._profile, batch_size = self._batch_size, cache = self._cache, parameterize = self._parameterize, compact_ids = self._compact_ids))
+        self._check_budget(graph, plans, budget)
+        return plans
+
+    async def _apply_concurrently_async(self, rules: list[Rule]) -> int:
+        """See `_apply_concurrently`."""
+        start = time.monotonic()
+        semaphore = asyncio.Semaphore(self._parallel)
+        async def run(r, dependencies):
+            await asyncio.gather(*dependencies)
+            async with semaphore:
+                return await self._apply_rule_async(r)
+        tasks = []
+        for i, r in enumerate(rules):
+            tasks.append(asyncio.ensure_future(run(r, [tasks[j] for j in range(i) if r.interferes_with(rules[j])])))
+        times = await asyncio.gather(*tasks)
+        log(self._graph, f"Parallel: Applied {len(rules)} rules with {self._parallel} tasks, completed after {int((time.monotonic() - start) * 1000)} ms.")
+        return sum([t for t in times if t])
+
+    async def _apply_rule_async(self, r: Rule) -> int:
+        """See `_apply_rule`."""
+        with self._span("rule", "rule", rule=self._rule_id(r)) as span:
+            t = (await r.apply_on_async(self._graph, with_diagnose=self._with_diagnose, explain = self._explain, profile = self._profile, batch_size = self._batch_size, cache = self._cache, parameterize = self._parameterize, compact_ids = self._compact_ids, retries = self._retries))[0]
+            self._annotate_rule(span, r, t, r.last_retries)
+            self._record_outputs(r)
+            return t
+
+    async def _pre_apply_async(self):
+        """See `_pre_apply`."""
+        if self._graph is None:
+            raise TransformationActivationError("This transformation is not currently active.")
+        capabilities = capabilities_of(self._graph)
+        if self._compact_ids and not capabilities.evaluates_rules and not await self._graph.has_hash_function(capabilities.hash_function):
+            self._missing_hash_function(capabilities)
+        if capabilities.key_constraints:
+            await self._graph.dropIndex(capabilities.drop_index("idx_dummy", "_dummy", ["_id"]), stats=False)
+        constraints = self._new_constraints(self._rules)
+        for name, query, constraint in constraints:
+            await self._schema_command(query, constraint=constraint)()
+        if constraints and capabilities.index_population_async:
+            await self._graph.await_indexes([name for name, _, _ in constraints], stats=True)
+        if capabilities.storage_mode is not None and self._storage_mode is None:
+            current = await self._graph.storage_mode()
+            if current != capabilities.storage_mode:
+                await self._graph.set_storage_mode(capabilities.storage_mode, stats=True)
+                self._storage_mode = current
+
+    async def _pre_eject_async(self):
+        """See `_pre_eject`."""
+        if self._graph is None:
+            raise TransformationDeactivationError("This transformation is not currently active.")
+        for query, constraint in self._constraints.values():
+            await self._schema_command(query, drop=True, constraint=constraint)()
+        self._constraints = {}
+
+    async def eject_async(self, destructive = False, batch_size = None):
+        """See `eject`. The removal can continue in background by wrapping this coroutine in a task."""
+        with self._span("eject", "transformation", destructive=destructive):
+            with self._span("pre_eject", "phase"):
+                await self._pre_eject_async()
+            if destructive:
+                await self._graph.destruct_input(stats=True, batch_size=batch_size)
+            await self._graph.remove_bookkeeping(stats=True, batch_size=batch_size)
+            if self._storage_mode is not None:
+                await self._graph.set_storage_mode(self._storage_mode, stats=True)
+                self._storage_mode = None
+        report = self._metrics_since(self._metrics_start)
+        self._graph = None
+        return report
+
+    async def abort_async(self, keep_index = False, batch_size = None):
+        """See `abort`."""
+        if self._graph is None:
+            raise TransformationDeactivationError("This transformation is not currently active.")
+        with self._span("abort", "transformation"):
+            if not keep_index:
+                with self._span("pre_eject", "phase"):
+                    await self._pre_eject_async()
+            await self._graph.abort(stats=True, batch_size=batch_size)
+            if self._storage_mode is not None:
+                await self._graph.set_storage_mode(self._storage_mode, stats=True)
+                self._storage_mode = None
+        self._graph = None
+
+    async def diagnose_async(self) -> tuple[int, int]:
+        """See `diagnose`."""
+        if self._graph is None:
+            raise TransformationDiagnosisError("This transformation is not currently active.")
+        if self._with_diagnose == False:
+            raise TransformationDiagnosisError("Diagnosis have been explicitely deactivated for this transformation.")
+        with self._span("diagnose", "transformation"):
+            nb_c_n = await self._graph.diagnose_nodes(stats=True)
+            nb_c_e = await self._graph.diagnose_edges(stats=True)
+            if self._compact_ids:
+                await self._graph.diagnose_collisions(stats=True)
+        return (nb_c_n, nb_c_e)
+
+    async def export_conflicts_async(self, path, elements = "all", fetch_size = 1000, limit = None) -> int:
+        """See `export_conflicts`. Conflicts can be streamed with `conflicts`, as an asynchronous generator."""
+        self._check_diagnosable()
+        with self._span("export_conflicts", "transformation"):
+            return await self._graph.export_conflicts(path, elements=elements, fetch_size=fetch_size, limit=limit)
+
+    async def export_async(self, path, format = "csv", graph = None, labels = None, partitions = 4, batch_size = 10_000) -> dict:
+        """See `export`. Partitions are read by concurrent tasks."""
+        graph, labels, types = self._export_selection(graph, labels)
+        with self._span("export", "transformation", graph = graph, format = format):
+            return await export_graph_async(graph, path, format=format, labels=labels, types=types, partitions=partitions, batch_size=batch_size)
+
+    async def conflict_summary_async(self) -> list[dict]:
+        """See `conflict_summary`."""
+        self._check_diagnosable()
+        with self._span("conflict_summary", "transformation"):
+            return await self._graph.conflict_summary(stats=True)
@@ -14,7 +14,11 @@ setuptools.setup(
     url = "https://github.com/yannramusat/DTGraph",
     packages = [
         "dtgraph",
+        "dtgraph.backend",
         "dtgraph.backend.neo4j",
+        "dtgraph.backend.memory",
+        "dtgraph.scenarios",
+        "dtgraph.bench",
     ],
     package_dir = {
         "dtgraph": "dtgraph"
@@ -28,4 +32,8 @@ setuptools.setup(
         "neo4j",
         "pyparsing",
     ],
+    extras_require = {
+        # export of output graphs to Parquet files
+        "parquet": ["pyarrow"],
+    },
 )
@@ -0,0 +1,58 @@
+import unittest
+from types import SimpleNamespace
+from dtgraph.bench import Benchmark, SCENARIOS, compare
+
+class BenchGraph(object):
+    """Stands for a Memgraph instance, answering every query without executing it."""
+
+    database = "memgraph"
+
+    def __init__(self):
+        self.calls = []
+
+    def flush_database(self):
+        self.calls.append("flush")
+
+    def populate_with_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False):
+        self.calls.append("csv")
+
+    def run_schema_command(self, query):
+        pass
+
+    def exec_rule(self, query, stats=False, autocommit=False, parameters=None):
+        self.calls.append("rule")
+        return SimpleNamespace(result_available_after=1, result_consumed_after=1, plan=None, profile=None)
+
+    def conflict_summary(self, stats=True):
+        self.calls.append("diagnose")
+        return []
+
+    def remove_bookkeeping(self, stats=False, batch_size=None):
+        self.calls.append("eject")
+
+def results(times):
+    return {'results': [{'scenario': "gtb", 'size': 100, 'phases': {phase: {'median': t} for phase, t in times.items()}}]}
+
+class BenchTestCase(unittest.TestCase):
+
+    def testRun(self):
+        graph = BenchGraph()
+        benchmark = Benchmark(graph, scenarios=["personaddress"], sizes=[100, 123], warmup=1, iterations=2)
+        out = benchmark.run()
+        self.assertEqual([(r['scenario'], r['size']) for r in out['results']], [("personaddress", 100)])
+        self.assertEqual(len(out['results'][0]['phases']['apply']['times']), 2)
+        # each iteration loads the two files of the scenario and applies its two rules
+        self.assertEqual(graph.calls.count("csv"), 6)
+        self.assertEqual(graph.calls.count("rule"), 6)
+        self.assertEqual(graph.calls[-3:], ["rule", "diagnose", "eject"])
+        self.assertIn('"scenario": "personaddress"', benchmark.to_json())
+
+    def testCompare(self):
+        baseline = results({'load': 100, 'apply': 100, 'eject': 2})
+        regressions = compare(results({'load': 110, 'apply': 150, 'eject': 4}), baseline, threshold=0.2)
+        # eject is twice slower, but only by 2 ms
+        self.assertEqual([(r['phase'], r['ratio']) for r in regressions], [("apply", 1.5)])
+        self.assertEqual(set(SCENARIOS), {"personaddress", "persondata", "flighthotel", "a1ta3", "dta1", "gtb"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from dtgraph import Rule, RuleCache
+from dtgraph.exceptions import ParseError
+
+RULE = '''
+MATCH (n:Person)
+=>
+(x = (n) : Actor {
+    name = n.name
+})
+'''
+
+class RuleCacheTestCase(unittest.TestCase):
+
+    def testKey(self):
+        key = RuleCache.key(RULE, "neo4j", with_diagnose=True)
+        # indentation and blank lines are not significant
+        self.assertEqual(key, RuleCache.key("\n    ".join(RULE.splitlines()), "neo4j", with_diagnose=True))
+        self.assertNotEqual(key, RuleCache.key(RULE, "memgraph", with_diagnose=True))
+        self.assertNotEqual(key, RuleCache.key(RULE, "neo4j", with_diagnose=False))
+        # whitespaces inside string literals are significant
+        self.assertNotEqual(RuleCache.key('(x = ("a  b", n) : A)', "neo4j"), RuleCache.key('(x = ("a b", n) : A)', "neo4j"))
+        self.assertEqual(RuleCache.normalize('  MATCH (n)\n\n  WHERE n.a = "x \n  y"\n=> (x)'), 'MATCH (n)\nWHERE n.a = "x \n  y"\n=> (x)')
+
+    def testEviction(self):
+        cache = RuleCache(maxsize=2)
+        cache.put("a", {'compiled': "A"})
+        cache.put("b", {'compiled': "B"})
+        cache.get("a")
+        cache.put("c", {'compiled': "C"})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {'compiled': "A"})
+
+    def testSkipParsing(self):
+        with tempfile.TemporaryDirectory() as path:
+            first = Rule(RULE, cache=RuleCache(path))
+            self.assertIsNotNone(first._parsed)
+            first._compile(cache=RuleCache(path))
+            # a fresh in-memory cache on the same directory simulates a new session
+            second = Rule(RULE, cache=RuleCache(path))
+            second._compile(cache=RuleCache(path))
+            self.assertEqual(first._compiled, second._compiled)
+            self.assertIsNone(second._parsed)
+
+    def testParseOnCreation(self):
+        # malformed rules fail where they are written, unless their source is known to be valid
+        with self.assertRaises(ParseError):
+            Rule('MATCH (n:Person) => (x = (n) : actor)')
+        with self.assertRaises(ParseError):
+            Rule('MATCH (n:Person) => (x = (n) : actor)', cache=RuleCache())
+
+if __name__ == "__main__":
+    unittest.main()
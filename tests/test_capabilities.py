@@ -0,0 +1,129 @@
+import unittest
+from types import SimpleNamespace
+from dtgraph import Rule, Transformation
+from dtgraph.backend.capabilities import Capabilities, NEO4J, MEMGRAPH, MEMGRAPH_ANALYTICAL, capabilities_of, profile_for, register_profile, PROFILES
+from dtgraph.compiler import Compiler
+from dtgraph.exceptions import CompileError
+from dtgraph.scenarios.scenario import index_command
+
+RULE = 'MATCH (n:Person)-[:ACTED_IN]->(m:Movie) GENERATE (x = (n):Actor)-[():PLAYED_IN]->(y = (m):Film)'
+
+class SchemaGraph(object):
+    """Stands for a graph of the given database, recording the schema commands sent to it."""
+
+    def __init__(self, database, capabilities = None):
+        self.database = database
+        if capabilities is not None:
+            self.capabilities = capabilities
+        self.log = []
+        self.mode = "IN_MEMORY_TRANSACTIONAL"
+
+    def exec_rule(self, query, stats=False, autocommit=False, parameters=None):
+        self.log.append(("rule", query.splitlines()[0], self.mode))
+        return SimpleNamespace(result_available_after=1, plan=None, profile=None)
+
+    def storage_mode(self):
+        return self.mode
+
+    def set_storage_mode(self, mode, stats=False):
+        self.log.append(("storage", mode))
+        self.mode = mode
+
+    def remove_bookkeeping(self, stats=False, batch_size=None):
+        self.log.append(("eject", self.mode))
+
+    def run_schema_command(self, query):
+        self.log.append(("schema", query))
+
+    def addConstraint(self, query, stats=False):
+        self.log.append(("addConstraint", query))
+
+    def dropConstraint(self, query, stats=False):
+        self.log.append(("dropConstraint", query))
+
+    def dropIndex(self, query, stats=False):
+        self.log.append(("dropIndex", query))
+
+    def await_indexes(self, names, stats=False):
+        self.log.append(("await", sorted(names)))
+
+    def abort(self, stats=False, batch_size=None):
+        pass
+
+class CapabilitiesTestCase(unittest.TestCase):
+
+    def testProfiles(self):
+        self.assertIs(profile_for("neo4j"), NEO4J)
+        self.assertIs(capabilities_of(SchemaGraph("memgraph")), MEMGRAPH)
+        # unknown databases get a generic profile, without schema
+        generic = profile_for("movies")
+        self.assertEqual(generic.name, "movies")
+        self.assertIsNone(generic.create_key("cns_dummy", "_dummy", "_id"))
+        self.assertEqual(NEO4J.create_key("cns_dummy_T", "T", "_id", relationship=True),
+                         "CREATE CONSTRAINT `cns_dummy_T` IF NOT EXISTS FOR ()-[r:`T`]-() REQUIRE r.`_id` IS UNIQUE")
+        self.assertIsNone(MEMGRAPH.create_key("cns_dummy_T", "T", "_id", relationship=True))
+        self.assertEqual(MEMGRAPH.drop_key("cns_dummy", "_dummy", "_id"), "DROP INDEX ON :`_dummy`(`_id`)")
+        self.assertEqual(index_command("memgraph", "Person", ["id", "name"]), ("dtg_load_Person", "CREATE INDEX ON :`Person`(`id`)"))
+        self.assertEqual(index_command(NEO4J, "Person", ["id", "name"])[1], "CREATE INDEX `dtg_load_Person` IF NOT EXISTS FOR (n:`Person`) ON (n.`id`, n.`name`)")
+        self.assertEqual(NEO4J.read_query("MATCH (n) RETURN n"), "MATCH (n) RETURN n")
+        self.assertTrue(NEO4J.derive(parallel_runtime=True).read_query("\nMATCH (n) RETURN n").startswith("CYPHER runtime=parallel\nMATCH"))
+        self.assertFalse(NEO4J.parallel_runtime)
+        with self.assertRaises(ValueError):
+            NEO4J.derive(unknown=True)
+
+    def testCompiler(self):
+        # a backend is added by registering its profile, without changing the compiler
+        register_profile(Capabilities("other", id_function="uid", batching="periodic_commit"))
+        try:
+            script = Compiler("other", batch_size=10).compile(Rule(RULE)._dict)
+        finally:
+            del PROFILES["other"]
+        self.assertTrue(script.startswith("USING PERIODIC COMMIT 10\n"))
+        self.assertIn('_id: "(" + uid(n) + ")"', script)
+        with self.assertRaises(CompileError):
+            Compiler(NEO4J.derive(batching=None), batch_size=10)
+
+    def testSchema(self):
+        graph = SchemaGraph("neo4j")
+        t = Transformation([Rule(RULE)])
+        t.apply_on(graph)
+        self.assertEqual([entry[0] for entry in graph.log], ["dropIndex", "addConstraint", "addConstraint", "await", "rule"])
+        self.assertEqual(graph.log[3][1], ["cns_dummy", "cns_dummy_PLAYED_IN"])
+        t.abort()
+        self.assertEqual(graph.log[-2:], [("dropConstraint", "DROP CONSTRAINT `cns_dummy` IF EXISTS"), ("dropConstraint", "DROP CONSTRAINT `cns_dummy_PLAYED_IN` IF EXISTS")])
+        # the relationships are indexed by the profile of a server supporting it
+        graph = SchemaGraph("memgraph", capabilities=MEMGRAPH.derive(relationship_indexes=True))
+        t = Transformation([Rule(RULE)])
+        t.apply_on(graph)
+        t.abort()
+        self.assertEqual([entry for entry in graph.log if entry[0] == "schema"], [
+            ("schema", "CREATE INDEX ON :`_dummy`(`_id`)"), ("schema", "CREATE EDGE INDEX ON :`PLAYED_IN`(`_id`)"),
+            ("schema", "DROP INDEX ON :`_dummy`(`_id`)"), ("schema", "DROP EDGE INDEX ON :`PLAYED_IN`(`_id`)")])
+
+    def testAnalytical(self):
+        graph = SchemaGraph("memgraph", capabilities=MEMGRAPH_ANALYTICAL)
+        t = Transformation([Rule(RULE)])
+        t.apply_on(graph)
+        self.assertEqual(graph.log, [
+            ("schema", "CREATE INDEX ON :`_dummy`(`_id`)"), ("schema", "CREATE INDEX ON :`Actor`(`_id`)"), ("schema", "CREATE INDEX ON :`Film`(`_id`)"),
+            ("storage", "IN_MEMORY_ANALYTICAL"),
+            # rules without batch size commit periodically
+            ("rule", "USING PERIODIC COMMIT 10000", "IN_MEMORY_ANALYTICAL")])
+        del graph.log[:]
+        t.eject()
+        self.assertEqual(graph.log, [
+            ("schema", "DROP INDEX ON :`_dummy`(`_id`)"), ("schema", "DROP INDEX ON :`Actor`(`_id`)"), ("schema", "DROP INDEX ON :`Film`(`_id`)"),
+            ("eject", "IN_MEMORY_ANALYTICAL"), ("storage", "IN_MEMORY_TRANSACTIONAL")])
+        # the storage mode is restored on abort as well, and is not switched if already analytical
+        t = Transformation([Rule(RULE)])
+        t.apply_on(graph)
+        t.abort(keep_index=True)
+        self.assertEqual(graph.mode, "IN_MEMORY_TRANSACTIONAL")
+        graph.mode = "IN_MEMORY_ANALYTICAL"
+        del graph.log[:]
+        t.apply_on(graph)
+        t.abort()
+        self.assertNotIn(("storage", "IN_MEMORY_TRANSACTIONAL"), graph.log)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from dtgraph import Rule
+from dtgraph.compiler import Compiler
+from dtgraph.exceptions import CompileError
+
+RULE = '''
+MATCH (n:Person)-[:ACTED_IN]->(m:Movie)
+=>
+(x = (n) : Actor {
+    name = n.name
+})-[(m) : PLAYED_IN]->(y = (m) : Film {
+    title = "SK1(" + m.title + ")"
+})
+'''
+
+class CompilerTestCase(unittest.TestCase):
+    maxDiff = None
+
+    def testBatchedNeo4j(self):
+        script = Compiler("neo4j", batch_size=1000).compile(Rule(RULE)._dict)
+        self.assertTrue(script.startswith("MATCH (n:Person)-[:ACTED_IN]->(m:Movie)\nCALL {\nWITH n, m\nMERGE (x:_dummy {"))
+        self.assertTrue(script.endswith("} IN TRANSACTIONS OF 1000 ROWS\n"))
+
+    def testBatchedMemgraph(self):
+        script = Compiler("memgraph", batch_size=1000).compile(Rule(RULE)._dict)
+        self.assertTrue(script.startswith("USING PERIODIC COMMIT 1000\nMATCH (n:Person)-[:ACTED_IN]->(m:Movie)\nMERGE (x:_dummy {"))
+        self.assertNotIn("IN TRANSACTIONS", script)
+
+    def testNotBatched(self):
+        compiler = Compiler("neo4j")
+        script = compiler.compile(Rule(RULE)._dict)
+        self.assertFalse(compiler.batched)
+        self.assertNotIn("CALL {", script)
+        with self.assertRaises(CompileError):
+            Compiler("neo4j", batch_size=0)
+
+    def testCompileMany(self):
+        other = Rule('''
+            MATCH   (n:Person)-[:ACTED_IN]->(m:Movie)
+            =>
+            (x = (n) : Person {
+                name = n.name
+            })
+        ''')
+        self.assertEqual(Rule(RULE).lhs_key(), other.lhs_key())
+        script = Compiler("neo4j").compile_many([Rule(RULE)._dict, other._dict])
+        # the lhs is evaluated once, and aliases of the second rule are renamed
+        self.assertEqual(script.count("MATCH (n:Person)"), 1)
+        self.assertIn("MERGE (x:_dummy {", script)
+        self.assertIn("MERGE (r1_x:_dummy {", script)
+        self.assertIn("SET r1_x:Person", script)
+        # the elements merged by each rule are counted, e.g., the nodes x, y and relationship of the first rule
+        self.assertIn("count(*) AS dtgRows", script)
+        self.assertIn("count(DISTINCT r1_x) AS dtgNodes1, 0 AS dtgRelationships1", script)
+        self.assertEqual(script.count("count(DISTINCT"), 4)
+
+    def testParameterize(self):
+        compiler = Compiler("neo4j", parameterize=True)
+        script = compiler.compile(Rule(RULE)._dict)
+        self.assertIn('x_2:PLAYED_IN {\n    _id: "(" + $p2 + "," + elementID(m)', script)
+        self.assertIn('y.title = $p0 + m.title + $p1', script)
+        self.assertNotIn('SK1(', script)
+        self.assertEqual(compiler.parameters, {'p0': 'SK1(', 'p1': ')', 'p2': ':PLAYED_IN:'})
+
+    def testCompactIds(self):
+        script = Compiler("neo4j", compact_ids=True).compile(Rule(RULE)._dict)
+        self.assertIn('_id: [h IN [toLower(apoc.util.md5(["(" + elementID(n) + ")"]))] | [reduce(v = 0, i IN range(0, 14) | v * 16 + size(split("0123456789abcdef", substring(h, i, 1))[0])), reduce(v = 0, i IN range(15, 29) |', script)
+        # the full Skolem tuple is kept aside to detect collisions
+        self.assertIn('SET x._key = coalesce(x._key, "(" + elementID(n) + ")")', script)
+        self.assertIn('SET x:_hasCollision', script)
+        self.assertIn('SET x_2._hasCollision = True', script)
+        script = Compiler("memgraph", with_diagnose=False, compact_ids=True).compile(Rule(RULE)._dict)
+        self.assertIn('_id: [h IN [toLower(util_module.md5(["(" + ID(n) + ")"]))] |', script)
+        self.assertNotIn('_key', script)
+
+    def testPartitioned(self):
+        script = Compiler("neo4j", partitioned=True).compile(Rule(RULE)._dict)
+        self.assertIn('MATCH (n:Person)-[:ACTED_IN]->(m:Movie)\nWITH n, m\nWHERE toInteger(split(elementId(n), ":")[-1]) % $dtgPartitions = $dtgPartition\nMERGE', script)
+        # bindings are split by the element the first output node is identified by
+        script = Compiler("neo4j", partitioned=True).compile(Rule('MATCH (n)-[:R]->(m) => (x = (n.name, m) : A)')._dict)
+        self.assertIn('WITH n, m\nWHERE toInteger(split(elementId(m), ":")[-1]) % $dtgPartitions', script)
+        with self.assertRaises(CompileError):
+            Compiler("neo4j", partitioned=True).compile(Rule('MATCH (n) => (x = ("c") : A)')._dict)
+        # without uniqueness constraints, concurrent partitions could duplicate output elements
+        with self.assertRaises(CompileError):
+            Compiler("memgraph", partitioned=True).compile(Rule(RULE)._dict)
+
+    def testOutputLabels(self):
+        self.assertEqual(Rule(RULE).output_labels(), ({'Actor', 'Film'}, {'PLAYED_IN'}))
+        self.assertEqual(Rule(raw="MATCH (n) RETURN n").output_labels(), (set(), set()))
+
+if __name__ == "__main__":
+    unittest.main()
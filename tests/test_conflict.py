@@ -0,0 +1,143 @@
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from dtgraph import RunStats
+from dtgraph.backend.neo4j.async_graph import AsyncNeo4jGraph
+from dtgraph.backend.neo4j.graph import Neo4jGraph
+
+NODES = [{'id': f"(n{i:03})", 'element_id': f"4:x:{i}", 'labels': ["Person", "_dummy", "_hasConflict"], 'keys': ["name"]} for i in range(25)]
+EDGES = {'KNOWS': [{'id': f"(e{i:03})", 'element_id': f"5:x:{i}", 'type': "KNOWS", 'keys': ["since", "at"]} for i in range(3)]}
+
+class ConflictingGraph(Neo4jGraph):
+    """Stands for a Neo4jGraph, answering the pages of conflicts from in-memory records."""
+
+    def __init__(self):
+        self.database = "neo4j"
+        self.verbose = False
+        self.metrics = RunStats()
+        self.driver = SimpleNamespace(execute_query=self._execute_query)
+        self.pages = []
+
+    def _execute_query(self, query, parameters_=None, database=None):
+        summary = SimpleNamespace(query=query, parameters=parameters_, result_available_after=0, result_consumed_after=0, counters=SimpleNamespace())
+        if "count(*)" in query:
+            self.summary_parameters = parameters_
+            self.summary_query = query
+            return [{'kind': "node", 'label': "Person", 'key': "name", 'count': 25}, {'kind': "edge", 'label': "KNOWS", 'key': "at", 'count': 3},
+                    {'kind': "node", 'label': None, 'key': "name", 'count': 3},
+                    {'kind': "edge", 'label': "KNOWS", 'key': "since", 'count': 30}], summary, ["kind", "label", "key", "count"]
+        if "RETURN DISTINCT type(r)" in query:
+            return [{'type': t} for t in EDGES], summary, ["type"]
+        records = EDGES['KNOWS'] if "KNOWS" in query else NODES
+        self.pages.append(parameters_['after'])
+        page = [r for r in records if r['id'] > parameters_['after']][:parameters_['limit']]
+        return page, summary, []
+
+class StreamingGraph(ConflictingGraph):
+    """Stands for a Memgraph database, which can not index the identifiers of relationships, hence streams their conflicts."""
+
+    def __init__(self):
+        ConflictingGraph.__init__(self)
+        self.database = "memgraph"
+        self.driver.session = self._session
+        self.streams = []
+
+    @contextlib.contextmanager
+    def _session(self, database=None, fetch_size=None):
+        yield SimpleNamespace(run=lambda query, parameters: self._run(query, parameters, fetch_size))
+
+    def _run(self, query, parameters, fetch_size):
+        self.streams.append((fetch_size, parameters['limit'], "LIMIT $limit" in query))
+        summary = SimpleNamespace(query=query, parameters=parameters, result_available_after=0, result_consumed_after=0, counters=SimpleNamespace())
+        return StreamedResult(EDGES['KNOWS'][:parameters['limit']], summary)
+
+class StreamedResult(object):
+    """Stands for a neo4j.Result, iterated over record by record."""
+
+    def __init__(self, records, summary):
+        self.records = records
+        self.summary = summary
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def consume(self):
+        return self.summary
+
+class AsyncConflictingGraph(AsyncNeo4jGraph):
+    """Asynchronous counterpart of ConflictingGraph, sharing its pages of conflicts."""
+
+    def __init__(self):
+        ConflictingGraph.__init__(self)
+        self.driver = SimpleNamespace(execute_query=self._execute_query_async)
+
+    _execute_query = ConflictingGraph._execute_query
+
+    async def _execute_query_async(self, query, parameters_=None, database=None):
+        await asyncio.sleep(0)
+        return self._execute_query(query, parameters_=parameters_, database=database)
+
+class ConflictTestCase(unittest.TestCase):
+
+    def testPages(self):
+        graph = ConflictingGraph()
+        conflicts = list(graph.iter_conflicts(fetch_size=10))
+        self.assertEqual(len(conflicts), 28)
+        # each page resumes after the last identifier of the previous one
+        self.assertEqual(graph.pages, ["", "(n009)", "(n019)", ""])
+        self.assertEqual(conflicts[0].labels, ["Person"])
+        self.assertEqual(conflicts[-1].to_dict(), {'kind': "edge", 'id': "(e002)", 'element_id': "5:x:2", 'labels': ["KNOWS"], 'keys': ["at", "since"]})
+
+    def testLimit(self):
+        graph = ConflictingGraph()
+        self.assertEqual(len(list(graph.iter_conflicts(elements="nodes", fetch_size=10, limit=12))), 12)
+        self.assertEqual([c.kind for c in graph.iter_conflicts(elements="edges")], ["edge"] * 3)
+
+    def testStreamedEdges(self):
+        # without an index on the identifiers of relationships, their conflicts are streamed by a single query per type
+        graph = StreamingGraph()
+        conflicts = list(graph.iter_conflicts(fetch_size=10))
+        self.assertEqual([c.kind for c in conflicts], ["node"] * 25 + ["edge"] * 3)
+        self.assertEqual(graph.pages, ["", "(n009)", "(n019)"])
+        self.assertEqual(graph.streams, [(10, None, False)])
+        self.assertEqual(len(list(graph.iter_conflicts(fetch_size=10, limit=27))), 27)
+        self.assertEqual(graph.streams[-1], (10, 2, True))
+
+    def testExport(self):
+        graph = ConflictingGraph()
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "conflicts.jsonl")
+            self.assertEqual(graph.export_conflicts(path, limit=5, stats=False), 5)
+            with open(path) as f:
+                self.assertEqual(json.loads(f.readline())['id'], "(n000)")
+    def testSummary(self):
+        graph = ConflictingGraph()
+        rows = graph.conflict_summary(stats=False)
+        self.assertEqual([(r['label'], r['key'], r['count']) for r in rows], [("KNOWS", "since", 30), ("Person", "name", 25), ("KNOWS", "at", 3), (None, "name", 3)])
+        self.assertIn("_hasConflict", graph.summary_parameters['bookkeeping'])
+        # nodes with only bookkeeping labels are not dropped by the server
+        self.assertIn("CASE WHEN size(labels) = 0 THEN [null] ELSE labels END", graph.summary_query)
+        self.assertEqual(len(graph.metrics), 1)
+
+    def testAsync(self):
+        # the asynchronous graph sends the same pages of queries as the synchronous one
+        graph = AsyncConflictingGraph()
+        async def run(path):
+            conflicts = [c async for c in graph.iter_conflicts(fetch_size=10)]
+            return conflicts, await graph.export_conflicts(path, limit=5, stats=False), await graph.conflict_summary(stats=False)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "conflicts.jsonl")
+            conflicts, exported, rows = asyncio.run(run(path))
+            with open(path) as f:
+                self.assertEqual(json.loads(f.readline())['id'], "(n000)")
+        self.assertEqual(len(conflicts), 28)
+        self.assertEqual(graph.pages[:4], ["", "(n009)", "(n019)", ""])
+        self.assertEqual(exported, 5)
+        self.assertEqual(rows[0]['count'], 30)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import csv
+import glob
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from dtgraph import InMemoryGraph, Rule, Transformation
+from dtgraph.backend.capabilities import NEO4J
+from dtgraph.backend.neo4j.graph import export_query
+from dtgraph.exceptions import TransformationExportError
+
+PEOPLE = """
+CREATE (a:Person {name: 'Alice', city: 'Paris'}), (b:Person {name: 'Bob', city: 'Paris'}), (c:Person {name: 'Carol', city: 'Lyon'})
+CREATE (a)-[:KNOWS]->(b), (b)-[:KNOWS]->(c), (c)-[:KNOWS]->(a)
+"""
+
+RULES = [
+    'MATCH (p:Person) GENERATE (x = (p):Friend {name = p.name})',
+    'MATCH (p:Person)-[:KNOWS]->(q:Person) GENERATE (x = (p):Friend)-[():LIKES {since = "2020"}]->(y = (q):Friend)',
+]
+
+def read_csv(directory, kind):
+    rows = []
+    for path in sorted(glob.glob(os.path.join(directory, f"{kind}-*.csv"))):
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows += [dict(zip(header, row)) for row in reader]
+    return rows
+
+class ExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = InMemoryGraph(sinks=[])
+        self.graph.load_scenario_script(PEOPLE)
+        self.transformation = Transformation([Rule(r) for r in RULES])
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testQueries(self):
+        self.assertEqual(export_query(NEO4J, "nodes"), "MATCH (n:`_dummy`)\nRETURN elementID(n) AS id, labels(n) AS labels, properties(n) AS properties")
+        self.assertEqual(export_query(NEO4J, "relationships", labels=["A", "B"], types=["T"], partitioned=True),
+                         "MATCH (s)-[r:`T`]->(t)\nWHERE (s:`A` OR s:`B`) AND (t:`A` OR t:`B`) AND toInteger(split(elementId(r), \":\")[-1]) % $partitions = $partition\n"
+                         "RETURN elementID(r) AS id, type(r) AS type, elementID(s) AS start, elementID(t) AS end, properties(r) AS properties")
+        self.assertTrue(export_query(NEO4J, "nodes", keys=True).endswith("UNWIND keys(n) AS key\nRETURN DISTINCT key"))
+
+    def testCsvBeforeEject(self):
+        self.transformation.apply_on(self.graph)
+        report = self.transformation.export(self.path, partitions=2, batch_size=2)
+        self.assertEqual((report['nodes'], report['relationships']), (3, 3))
+        self.assertEqual(len(report['files']), 4)
+        nodes = read_csv(self.path, "nodes")
+        # bookkeeping labels and properties are not exported
+        self.assertEqual(sorted([(n[':LABEL'], n['name']) for n in nodes]), [("Friend", "Alice"), ("Friend", "Bob"), ("Friend", "Carol")])
+        self.assertNotIn("_id", nodes[0])
+        ids = {n[':ID'] for n in nodes}
+        relationships = read_csv(self.path, "relationships")
+        self.assertEqual(len(relationships), 3)
+        self.assertTrue(all(r[':START_ID'] in ids and r[':END_ID'] in ids and r[':TYPE'] == "LIKES" and r['since'] == "2020" for r in relationships))
+
+    def testJsonlAfterEject(self):
+        self.transformation.apply_on(self.graph)
+        self.transformation.eject()
+        with self.assertRaises(TransformationExportError):
+            self.transformation.export(self.path)
+        report = self.transformation.export(self.path, format="jsonl", graph=self.graph, partitions=1)
+        self.assertEqual((report['nodes'], report['relationships']), (3, 3))
+        with open(os.path.join(self.path, "nodes-0.jsonl"), encoding="utf-8") as f:
+            nodes = [json.loads(line) for line in f]
+        self.assertEqual(sorted([n['properties']['name'] for n in nodes]), ["Alice", "Bob", "Carol"])
+        self.assertTrue(all(n['labels'] == ["Friend"] for n in nodes))
+        # input nodes are selected by label
+        report = self.transformation.export(self.path, format="jsonl", graph=self.graph, labels=["Person"])
+        self.assertEqual((report['nodes'], report['relationships']), (3, 3))
+
+    def testParquet(self):
+        self.transformation.apply_on(self.graph)
+        if importlib.util.find_spec("pyarrow") is None:
+            with self.assertRaises(TransformationExportError):
+                self.transformation.export(self.path, format="parquet")
+            return
+        report = self.transformation.export(self.path, format="parquet", partitions=1)
+        import pyarrow.parquet
+        table = pyarrow.parquet.read_table(os.path.join(self.path, "nodes-0.parquet"))
+        self.assertEqual(table.num_rows, report['nodes'])
+
+    def testInvalid(self):
+        self.transformation.apply_on(self.graph)
+        with self.assertRaises(TransformationExportError):
+            self.transformation.export(self.path, format="xml")
+        with self.assertRaises(TransformationExportError):
+            self.transformation.export(self.path, partitions=0)
+
+if __name__ == "__main__":
+    unittest.main()
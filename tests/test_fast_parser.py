@@ -0,0 +1,116 @@
+import json
+import random
+import unittest
+from pyparsing import ParseException
+from dtgraph.parser import RuleParser, RightHandSide
+from dtgraph.fast_parser import parse_rule, parse_rhs
+from dtgraph.exceptions import ParseError
+
+# inputs of tests/test_parser.py, seen as right-hand sides
+RHS_INPUTS = [
+    '( w = ("test", x, x1.de1, x2.de2, x3.de3, ) : Person, State, { name = "test" + x.name  , city = x.city + y.va, } ) ',
+    '(x)',
+    '( (x,) : Person { name = x.name }  ) -[ (x.a,"test") : HAS { name = x.name } ]-> (w)',
+    '((x):P{n=x.n})<-[(x.a,"t"):H,T{m=x.m+y.c+"3"}]-(w=("r",x,x1.de1,L):P,S,{n="u"+x.n,c=x.c+y.va,})',
+    '((x):P) -[ (x.a): ]-> ((L):), ((x):P{n=x.n})<-[(x.a,"t"):H,T{m=x.m+y.c+"3"}]-(w=("r",x, x1.d1,L):P, S,{n="u"+x.n,c=x.c+y.va,}), (w = ("t"):U{n=a.u}), (z = (L):V,J{n=a.u}), ',
+    # invalid inputs
+    '(("c" x.a):)',
+    '((,):)',
+    '((x):{ name = var1 })',
+    '((x):P)-[():]-((y):)',
+]
+
+# inputs of tests/test_parser.py, seen as rules
+RULE_INPUTS = [
+    """
+    MATCH (n)
+    RETURN n
+    GENERATE
+    (x = (n) : Person {
+        name = "SK1(" + n.name + ")"
+    })-[(): Knows]->(y = (n) : Person {
+        name = "SK2(" + n.name + ")"
+    })
+    """,
+    """
+    MATCH (n)
+    RETURN n
+    =>
+    (x = (n) : Person {
+        name = "SK1(" + n.name + ")"
+    })
+    """,
+    # the delimiter must not be adjacent to keyword characters
+    'MATCH (n) x=> y generate\t(():A)',
+    'MATCH (n)GENERATEx => (():A)',
+    'MATCH=>(():)',
+]
+
+class FastParserTestCase(unittest.TestCase):
+    """Differential tests against the reference pyparsing grammar."""
+
+    def assertSameResult(self, reference, fast, text):
+        try:
+            expected = reference.parseString(text, parseAll=True).asDict()
+        except ParseException:
+            with self.assertRaises(ParseError):
+                fast(text)
+        else:
+            # compare the serialized dictionaries, so that the order of the keys is also checked
+            self.assertEqual(json.dumps(expected), json.dumps(fast(text)))
+
+    def testRightHandSide(self):
+        for text in RHS_INPUTS:
+            with self.subTest(text=text):
+                self.assertSameResult(RightHandSide, parse_rhs, text)
+
+    def testRuleParser(self):
+        for text in RULE_INPUTS:
+            with self.subTest(text=text):
+                self.assertSameResult(RuleParser, parse_rule, text)
+
+    def testRandomRules(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            text = _random_rule(rng)
+            with self.subTest(text=text):
+                self.assertSameResult(RuleParser, parse_rule, text)
+
+def _random_rule(rng):
+    """Generates a rule, which is sometimes slightly corrupted."""
+    def ws():
+        return rng.choice(['', ' ', '\n  ', '\t'])
+    def sep(s):
+        return ws() + s + ws()
+    def many(gen):
+        text = sep(',').join(gen() for _ in range(rng.randint(1, 3)))
+        return text + (sep(',') if rng.random() < 0.2 else '')
+    var = lambda: rng.choice(['x', 'n', 'a1', 'x_y', 'generate'])
+    label = lambda: rng.choice(['P', 'Person', 'A_b', 'GENERATE'])
+    const = lambda: rng.choice(['"c"', '""', '"a + b"', '"SK1("', '"=>"'])
+    key = lambda: var() + '.' + rng.choice(['a', 'name', 'B1'])
+    expr = lambda: sep('+').join(rng.choice([const, key])() for _ in range(rng.randint(1, 3)))
+    prop = lambda: rng.choice(['name', 'a', 'B']) + sep('=') + expr()
+    def content():
+        text = var() + sep('=') if rng.random() < 0.5 else ''
+        text += '(' + (many(lambda: rng.choice([const, key, var, label])()) if rng.random() < 0.7 else ws()) + ')' + sep(':')
+        text += many(label) if rng.random() < 0.7 else ''
+        text += sep('{') + many(prop) + sep('}') if rng.random() < 0.6 else ''
+        return text
+    node = lambda: '(' + ws() + (content() if rng.random() < 0.7 else var()) + ws() + ')'
+    def constructor():
+        r = rng.random()
+        if r < 0.4:
+            return node() + ws() + '-[' + content() + ']->' + ws() + node()
+        if r < 0.6:
+            return node() + ws() + '<-[' + content() + ']-' + ws() + node()
+        return node()
+    lhs = rng.choice(['MATCH (n)', 'MATCH (n) x=> y', 'MATCH (n:A)\n WHERE n.a = "generate"', ''])
+    text = ws() + lhs + ws() + rng.choice(['=>', 'GENERATE', 'generate']) + ws() + many(constructor) + ws()
+    if rng.random() < 0.3:
+        i = rng.randrange(len(text))
+        text = text[:i] + rng.choice('(){}[],:=+-<>" .xA') + text[i + 1:]
+    return text
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from dtgraph.loader import CsvLoader, resolve_csv_path, iter_csv_rows, new_variable
+from dtgraph.scenarios.ibench_personaddress import iBenchPersonAddress
+
+CSV_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output-ibench-data")
+
+class BatchGraph(object):
+    """Stands for a Neo4jGraph, recording the batches of rows sent to it."""
+
+    verbose = False
+
+    def __init__(self, delay = 0.01):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.batches = []
+        self.commands = set()
+
+    def populate_with_rows(self, rows, mergeCMD, stats=False, mark_new=False):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+            self.batches.append(rows)
+            self.commands.add(mergeCMD)
+        return SimpleNamespace(counters=SimpleNamespace(nodes_created=len(rows)))
+
+class LoaderTestCase(unittest.TestCase):
+
+    def testResolve(self):
+        self.assertEqual(resolve_csv_path("file:///gtb/gusgene1000-5.csv", "output-ibench-data"), os.path.join("output-ibench-data", "gtb/gusgene1000-5.csv"))
+        self.assertEqual(resolve_csv_path("data/a.csv"), "data/a.csv")
+        with self.assertRaises(ValueError):
+            resolve_csv_path("https://example.org/a.csv")
+
+    def testRows(self):
+        path, cmd = iBenchPersonAddress.csv_files(100)[0]
+        rows = list(iter_csv_rows(resolve_csv_path(path, CSV_ROOT)))
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(rows[0][0], "1")
+
+    def testParallelBatches(self):
+        graph = BatchGraph()
+        path, cmd = iBenchPersonAddress.csv_files(1000)[0]
+        rows = CsvLoader(graph, sessions=3, batch_size=64, csv_root=CSV_ROOT).load(path, cmd)
+        self.assertEqual(rows, 1000)
+        self.assertEqual(sum([len(b) for b in graph.batches]), 1000)
+        self.assertEqual(len(graph.batches), 16)
+        self.assertEqual(graph.max_active, 3)
+        # the commands of the scenarios are sent unchanged
+        self.assertEqual(graph.commands, {cmd})
+
+    def testNewVariable(self):
+        self.assertEqual(new_variable("MERGE (n:Person {id: row[0]})", True), "n")
+        self.assertEqual(new_variable("MERGE (a:Address {id: row[1]})\nMERGE (p:Person {id: row[0]})-[:LIVES_AT]->(a)", "p"), "p")
+        with self.assertRaises(ValueError):
+            # `n` only occurs in a string literal and a comment
+            new_variable("MERGE (p:Person {id: '(n)'}) // (n)", True)
+        with self.assertRaises(ValueError):
+            new_variable("MERGE (n:Person)", "n:Other")
+        with self.assertRaises(ValueError):
+            CsvLoader(BatchGraph(), csv_root=CSV_ROOT).load(*iBenchPersonAddress.csv_files(100)[0], mark_new="m")
+
+if __name__ == "__main__":
+    unittest.main()
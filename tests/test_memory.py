@@ -0,0 +1,251 @@
+import contextlib
+import io
+import os
+import unittest
+
+from dtgraph import Rule, Transformation
+from dtgraph.backend.memory.cypher import parse_query, parse_script
+from dtgraph.backend.memory.graph import InMemoryGraph
+from dtgraph.bench.runner import SCENARIOS
+from dtgraph.conflict import CONFLICT_VALUE
+from dtgraph.exceptions import CompileError, ParseError, RunTimeError
+from dtgraph.scenarios.ibench_personaddress import iBenchPersonAddress
+from dtgraph.scenarios.movies import Movies
+
+CSV_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output-ibench-data")
+
+PEOPLE = """
+CREATE (a:Person {name: 'Alice', city: 'Paris'}), (b:Person {name: 'Bob', city: 'Paris'}), (c:Person {name: 'Carol'})
+CREATE (a)-[:KNOWS]->(b), (b)-[:KNOWS]->(c), (c)-[:KNOWS]->(a)
+CREATE (p:City {name: 'Paris'})
+"""
+
+class CypherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = InMemoryGraph(sinks=[])
+        self.graph.load_scenario_script(PEOPLE)
+
+    def names(self, query, *variables):
+        return sorted([tuple([row[v].properties.get('name') for v in variables]) for row in parse_query(query).match(self.graph)])
+
+    def testPatterns(self):
+        self.assertEqual(self.names("MATCH (x:Person)-[:KNOWS]->(y:Person)", "x", "y"), [("Alice", "Bob"), ("Bob", "Carol"), ("Carol", "Alice")])
+        self.assertEqual(self.names("MATCH (x)<-[:KNOWS]-(y {name: 'Alice'})", "x"), [("Bob",)])
+        self.assertEqual(len(parse_query("MATCH (x:Person)--(y)").match(self.graph)), 6)
+        self.assertEqual(self.names("MATCH (x {name: 'Alice'})-[:KNOWS*2]->(y)", "y"), [("Carol",)])
+        self.assertEqual(self.names("MATCH (x {name: 'Alice'})-[*0..]->(y)", "y"), [("Alice",), ("Alice",), ("Bob",), ("Carol",)])
+        # relationships matched by a clause are distinct
+        self.assertEqual(len(parse_query("MATCH (x)-[:KNOWS]->(y), (z)-[:KNOWS]->(t)").match(self.graph)), 6)
+
+    def testJoinAndNulls(self):
+        # a hash join on the equality relating both patterns, null never being equal to null
+        self.assertEqual(self.names("MATCH (p:Person) MATCH (c:City) WHERE p.city = c.name", "p"), [("Alice",), ("Bob",)])
+        self.assertEqual(len(parse_query("MATCH (p:Person), (q:Person) WHERE p.city = q.city").match(self.graph)), 4)
+        self.assertEqual(self.names("MATCH (p:Person) WHERE NOT p.city = 'Paris'", "p"), [])
+        self.assertEqual(self.names("MATCH (p:Person) WHERE p.city IS NULL OR p.name STARTS WITH 'A'", "p"), [("Alice",), ("Carol",)])
+        self.assertEqual(self.names("MATCH (p) WHERE p:Person AND p.name IN ['Bob', 'Dan'] AND p.name + '!' = 'Bob!'", "p"), [("Bob",)])
+
+    def testConditions(self):
+        # each construct of the conditions supported in memory
+        self.assertEqual(self.names("MATCH (p:Person) WHERE p.name < 'B' OR p.name >= 'Carol'", "p"), [("Alice",), ("Carol",)])
+        self.assertEqual(self.names("MATCH (p:Person) WHERE p.name <> 'Bob' AND p.city IS NOT NULL", "p"), [("Alice",)])
+        self.assertEqual(self.names("MATCH (p:Person) WHERE p.name ENDS WITH 'ol' OR p.name CONTAINS 'li'", "p"), [("Alice",), ("Carol",)])
+        self.assertEqual(self.names("MATCH (p:Person) WHERE coalesce(p.city, 'Lyon') = 'Lyon'", "p"), [("Carol",)])
+        self.assertEqual(self.names("MATCH (p:Person) WHERE toLower(p.name) = 'bob' AND toUpper(trim(' ' + p.city)) = 'PARIS'", "p"), [("Bob",)])
+        self.assertEqual(self.names("MATCH (p:Person), (c:City) WHERE toString(p.name) + '@' + c.name = 'Alice@Paris'", "p"), [("Alice",)])
+
+    def testUnsupported(self):
+        # constructs not used by the lhs of rules nor by the commands loading scenarios
+        for condition in ("p.age * 2 > 1", "-p.age < 0", "p.name =~ 'A.*'", "p.a XOR p.b", "id(p) = 1", "size(p.name) = 3", "p.name = $name"):
+            with self.subTest(condition=condition), self.assertRaises(ParseError):
+                parse_query(f"MATCH (p:Person) WHERE {condition}")
+        with self.assertRaises(ParseError):
+            parse_query("MATCH (n) RETURN n")
+        with self.assertRaises(ParseError):
+            parse_query("OPTIONAL MATCH (n)")
+        with self.assertRaises(ParseError):
+            parse_query("MATCH (n) WHERE m.x = 1")
+        with self.assertRaises(ParseError):
+            parse_script("MATCH (n) SET n.x = 1")
+        with self.assertRaises(RunTimeError):
+            self.graph.populate_with_rows([[None]], "MERGE (n:Label {key: row[0]})")
+
+class RuleTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = InMemoryGraph(sinks=[])
+        self.graph.load_scenario_script(PEOPLE)
+
+    def testConflicts(self):
+        t = Transformation([
+            Rule('MATCH (p:Person) WHERE p.city IS NOT NULL GENERATE (x = (p.city):Town {name = p.city, first = p.name})'),
+            Rule('MATCH (p:Person)-[:KNOWS]->(q:Person) GENERATE (x = (p):Friend {name = p.name})-[():LIKES {since = "2020"}]->(y = (q):Friend {name = q.name})'),
+        ])
+        t.apply_on(self.graph)
+        # Alice and Bob disagree on the first name of Paris
+        towns = self.graph.nodes("Town")
+        self.assertEqual(len(towns), 1)
+        self.assertEqual(towns[0].properties['first'], CONFLICT_VALUE)
+        self.assertIn("_hasConflict", towns[0].labels)
+        with self.assertRaises(RunTimeError):
+            # the Skolem tuple of a town is null for Carol
+            Rule('MATCH (p:Person) WHERE p.city IS NULL GENERATE (x = (p.city):Town {name = p.city})').apply_on(self.graph)
+        self.assertEqual(len(self.graph.nodes("Friend")), 3)
+        self.assertEqual(len(self.graph.relationships("LIKES")), 3)
+        self.assertEqual(t.conflict_summary(), [{'kind': "node", 'label': "Town", 'key': "first", 'count': 1}])
+        self.assertEqual([c.keys for c in t.conflicts()], [["first"]])
+        t.eject()
+        self.assertEqual(self.graph.nodes("_dummy"), [])
+        self.assertEqual(self.graph.nodes("_hasConflict"), [])
+        self.assertTrue(all('_id' not in r.properties for r in self.graph.relationships("LIKES")))
+        self.assertEqual(len(self.graph.nodes("Person")), 3)
+
+    def testUnlabelledConflicts(self):
+        # output nodes without label are counted by the summary, with a null label
+        Rule('MATCH (p:Person) WHERE p.city IS NOT NULL GENERATE (x = (p.city): {first = p.name})').apply_on(self.graph)
+        self.assertEqual(self.graph.conflict_summary(stats=False), [{'kind': "node", 'label': None, 'key': "first", 'count': 1}])
+
+    def testIdempotentAndFused(self):
+        rules = [Rule('MATCH (p:Person) GENERATE (x = (p):Friend {name = p.name})'), Rule('MATCH (p:Person) GENERATE (x = (p):Friend {name = p.name})')]
+        t = Transformation(rules, fuse=True)
+        t.apply_on(self.graph)
+        self.assertEqual(len(self.graph.nodes("Friend")), 3)
+        self.assertEqual(self.graph.nodes("_hasConflict"), [])
+        t.abort()
+        self.assertEqual(self.graph.nodes("Friend"), [])
+        self.assertEqual(self.graph.node_count(), 4)
+
+    def testFusedStatistics(self):
+        rules = [Rule('MATCH (p:Person) WHERE p.city IS NOT NULL GENERATE (x = (p):Friend)-[():LIVES_IN]->(y = (p.city):Town)'), Rule('MATCH (p:Person) WHERE p.city IS NOT NULL GENERATE (x = (p, "other"):Other)')]
+        t = Transformation(rules, fuse=True)
+        t.apply_on(self.graph)
+        # the query is recorded once, and the output of each rule on its own
+        self.assertEqual([s.phase for s in t.report.records].count("rule"), 1)
+        fused = [s for s in t.report.records if s.phase == "fused"]
+        self.assertEqual([s.rule for s in fused], ["#0", "#1"])
+        self.assertEqual(fused[0].outputs, {'rows': 2, 'nodes_merged': 2 + 1, 'relationships_merged': 2})
+        self.assertEqual(fused[1].outputs, {'rows': 2, 'nodes_merged': 2, 'relationships_merged': 0})
+        self.assertIn("#1,", t.report.to_csv().splitlines()[-1])
+
+    def testSilentSinks(self):
+        # messages which do not describe a query, e.g., fusion or the listing of conflicts, go through the sinks too
+        messages = []
+        for sinks in ([], [lambda stats: messages.append(stats.message) if stats.display else None]):
+            graph = InMemoryGraph(sinks=sinks)
+            graph.load_scenario_script(PEOPLE)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                t = Transformation([Rule('MATCH (p:Person) GENERATE (x = ("all"):Friend {name = p.name})'), Rule('MATCH (p:Person) GENERATE (x = (p):Other)')], fuse=True)
+                t.apply_on(graph)
+                t.diagnose()
+                graph.conflict_summary()
+            self.assertEqual(output.getvalue(), "")
+        self.assertTrue(any(m.startswith("Fused: Rules #0, #1") for m in messages))
+        self.assertTrue(any(m.startswith("  (") and "has a conflict" in m for m in messages))
+        self.assertTrue(any(m.lstrip().startswith("kind") for m in messages))
+        # the messages are not recorded as queries
+        self.assertNotIn("log", [s.phase for s in graph.metrics.records])
+
+    def testFusionOrder(self):
+        # the third rule is not fused with the first one, as the second one reads its output
+        for fuse in (False, True):
+            graph = InMemoryGraph(sinks=[])
+            graph.load_scenario_script(PEOPLE)
+            t = Transformation([Rule('MATCH (p:Person) => ((p):Friend)'), Rule('MATCH (f:Friend) => ((f, "copy"):Copy)'), Rule('MATCH (p:Person) => ((p, "other"):Friend)')], fuse=fuse)
+            self.assertEqual(len(t._units()), 3)
+            t.apply_on(graph)
+            self.assertEqual(len(graph.nodes("Copy")), 3)
+        # rules in between which do not interfere do not prevent fusion
+        t = Transformation([Rule('MATCH (p:Person) => ((p):Friend)'), Rule('MATCH (c:City) => ((c):Town)'), Rule('MATCH (p:Person) => ((p, "other"):Other)')], fuse=True)
+        self.assertEqual([len(unit) for unit in t._units()], [2, 1])
+
+    def testInvalidConstructors(self):
+        with self.assertRaises(CompileError):
+            Rule('MATCH (p:Person) GENERATE (x)-[():KNOWS]->(y = (p):Friend)').apply_on(self.graph)
+        with self.assertRaises(RunTimeError):
+            Rule(raw="MATCH (n) RETURN n").apply_on(self.graph)
+
+class StreamTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = InMemoryGraph(sinks=[])
+        # two persons per identifier, hence 7 conflicting friends and relationships
+        self.graph.populate_with_rows([[str(i // 2), str(i)] for i in range(14)], "CREATE (n:Person {id: row[0], name: row[1]})")
+        Rule('MATCH (p:Person) GENERATE (x = (p.id):Friend {name = p.name})-[():IN {since = p.name}]->(y = ("town"):Town {name = "Paris"})').apply_on(self.graph)
+
+    def phases(self):
+        return [s.phase for s in self.graph.metrics.records]
+
+    def testConflictPages(self):
+        records = len(self.graph.metrics)
+        conflicts = self.graph.iter_conflicts(fetch_size=3)
+        self.assertEqual(next(conflicts).kind, "node")
+        # conflicts are listed page by page
+        self.assertEqual(self.phases()[records:], ["diagnose"])
+        conflicts = [c for c in self.graph.iter_conflicts(fetch_size=3)]
+        self.assertEqual([c.kind for c in conflicts], ["node"] * 7 + ["edge"] * 7)
+        self.assertEqual(self.phases()[records:].count("diagnose"), 1 + 3 + 3)
+        self.assertEqual([c.id for c in conflicts[:7]], sorted([c.id for c in conflicts[:7]]))
+        self.assertEqual([c.id for c in self.graph.iter_conflicts(elements="edges", fetch_size=2, limit=5)], [c.id for c in conflicts[7:12]])
+
+    def testOutputPages(self):
+        nodes = list(self.graph.iter_output("nodes", fetch_size=2))
+        self.assertEqual(len(nodes), 8)
+        self.assertEqual(len(list(self.graph.iter_output("nodes", labels=["Person"], fetch_size=5))), 14)
+        self.assertEqual([int(n['id']) for n in nodes], sorted([int(n['id']) for n in nodes]))
+        parts = [list(self.graph.iter_output("relationships", partition=i, partitions=3, fetch_size=1)) for i in range(3)]
+        self.assertEqual(sorted([r['id'] for part in parts for r in part]), sorted([r['id'] for r in self.graph.iter_output("relationships")]))
+        self.assertTrue(all(int(r['id']) % 3 == i for i, part in enumerate(parts) for r in part))
+        self.assertEqual(self.graph.output_keys("nodes", labels=["Town"]), ["_id", "name"])
+
+    def testPagesSnapshot(self):
+        # pages are read from a snapshot taken when the first one is listed, skipping the elements removed in between
+        output = self.graph.iter_output("nodes", fetch_size=2)
+        first = next(output)
+        removed = [n for n in self.graph.nodes("_dummy") if n.id > int(first['id'])][-1]
+        self.graph.detach_delete_node(removed, dict.fromkeys(["nodes_deleted", "relationships_deleted"], 0))
+        self.assertEqual(len([first] + list(output)), 7)
+        conflicting = self.graph.nodes("_hasConflict")
+        conflicts = self.graph.iter_conflicts(elements="nodes", fetch_size=2)
+        first = next(conflicts)
+        self.graph.detach_delete_node(max(conflicting, key=lambda n: n.properties['_id']), dict.fromkeys(["nodes_deleted", "relationships_deleted"], 0))
+        self.assertEqual(len([first] + list(conflicts)), len(conflicting) - 1)
+
+class ScenarioTestCase(unittest.TestCase):
+
+    def testPersonAddress(self):
+        graph = InMemoryGraph(import_dir=CSV_ROOT, sinks=[])
+        iBenchPersonAddress.load(graph, 100)
+        self.assertEqual(len(graph.nodes("Person")), 100)
+        self.assertEqual(len(graph.nodes("Address")), 100)
+        _, texts, _ = SCENARIOS["personaddress"]
+        t = Transformation([Rule(text) for text in texts])
+        t.apply_on(graph)
+        t.eject(destructive=True)
+        self.assertEqual(graph.nodes("Person"), [])
+        self.assertEqual(len(graph.nodes("Address2")), 100)
+        self.assertEqual(len(graph.relationships("LIVES_AT")), len(graph.nodes("Person2")))
+        self.assertTrue(all(r.src.labels == {"Person2"} for r in graph.relationships("LIVES_AT")))
+
+    def testMovies(self):
+        graph = InMemoryGraph(sinks=[])
+        Movies.load(graph)
+        self.assertEqual(graph.node_count(), 171)
+        self.assertEqual(len(graph.relationships()), 253)
+
+    def testDelta(self):
+        graph = InMemoryGraph(sinks=[])
+        graph.populate_with_rows([["1", "Alice"]], "MERGE (n:Person {id: row[0], name: row[1]})")
+        t = Transformation([Rule('MATCH (p:Person) GENERATE (x = (p):Friend {name = p.name})')], incremental=True)
+        t.apply_on(graph)
+        graph.populate_with_rows([["2", "Bob"]], "MERGE (n:Person {id: row[0], name: row[1]})", mark_new=True)
+        graph.populate_with_rows([["3", "Carol"]], "MERGE (p:Person {id: row[0], name: row[1]})", mark_new="p")
+        with self.assertRaises(ValueError):
+            graph.populate_with_rows([["4", "Dan"]], "MERGE (p:Person {id: row[0], name: row[1]})", mark_new=True)
+        t.apply_delta()
+        self.assertEqual(sorted([n.properties['name'] for n in graph.nodes("Friend")]), ["Alice", "Bob", "Carol"])
+        self.assertEqual(graph.nodes("_dtgNew"), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from dtgraph import Rule, Transformation, RunStats
+from dtgraph.backend.neo4j.async_graph import AsyncNeo4jGraph
+from dtgraph.backend.neo4j.graph import Neo4jGraph
+
+def summary(query, available_after, consumed_after, **counters):
+    return SimpleNamespace(query=query, parameters=None, result_available_after=available_after, result_consumed_after=consumed_after,
+                           counters=SimpleNamespace(**counters), plan=None, profile=None)
+
+class MetricsGraph(Neo4jGraph):
+    """Stands for a Neo4jGraph, recording the statistics of fake summaries instead of sending queries to a server."""
+
+    def __init__(self, sinks=None):
+        self.database = "memgraph"
+        self.verbose = False
+        self.metrics = RunStats(sinks=sinks)
+
+    def run_schema_command(self, query):
+        pass
+
+    def exec_rule(self, query, stats=False, autocommit=False, parameters=None):
+        s = summary(query, 2, 5, nodes_created=3, properties_set=6)
+        self._record("rule", s, message="Rule: ...", display=stats)
+        return s
+
+    def remove_bookkeeping(self, stats=False, batch_size=None):
+        self._record("eject", summary("MATCH (n) REMOVE n._dtgDummy", 1, 1, properties_set=3), display=stats)
+
+class BookkeepingGraph(Neo4jGraph):
+    """Stands for a Neo4jGraph holding `nodes` output nodes, removing their bookkeeping in batches."""
+
+    def __init__(self, nodes):
+        self.database = "memgraph"
+        self.verbose = False
+        self.metrics = RunStats()
+        self.nodes = nodes
+        self.driver = SimpleNamespace(execute_query=self._execute_query)
+
+    def _execute_query(self, query, parameters_=None, database=None):
+        count = min(self.nodes, parameters_['batch_size'])
+        self.nodes -= count
+        return [{'count': count}], summary(query, 1, 1, labels_removed=count), ["count"]
+
+    def run_schema_command(self, query):
+        pass
+
+class DeletingGraph(Neo4jGraph):
+    """Stands for a Neo4jGraph holding `nodes` input nodes and `relationships` input relationships, deleting them in batches."""
+
+    def __init__(self, database, nodes, relationships):
+        self.database = database
+        self.verbose = False
+        self.metrics = RunStats()
+        self.nodes = nodes
+        self.relationships = relationships
+        self.queries = []
+        self.driver = SimpleNamespace(execute_query=self._execute_query)
+
+    def _delete(self, query, limit):
+        self.queries.append(query)
+        if "-[r]->" in query:
+            count = min(self.relationships, limit)
+            self.relationships -= count
+            return count, summary(query, 1, 1, relationships_deleted=count)
+        count = min(self.nodes, limit)
+        self.nodes -= count
+        return count, summary(query, 1, 1, nodes_deleted=count)
+
+    def _execute_query(self, query, parameters_=None, database=None):
+        count, s = self._delete(query, int(query.split("LIMIT ")[1].split()[0]))
+        return [{'count': count}], s, ["count"]
+
+    def _run_autocommit(self, query, parameters=None):
+        count, s = self._delete(query, float("inf"))
+        return [], s, []
+
+class AsyncDeletingGraph(AsyncNeo4jGraph):
+    """Asynchronous counterpart of DeletingGraph."""
+
+    __init__ = DeletingGraph.__init__
+    _delete = DeletingGraph._delete
+
+    async def _execute_query(self, query, parameters_=None, database=None):
+        return DeletingGraph._execute_query(self, query, parameters_=parameters_, database=database)
+
+    async def _run_autocommit(self, query, parameters=None):
+        return DeletingGraph._run_autocommit(self, query, parameters)
+
+class MetricsTestCase(unittest.TestCase):
+
+    def testRecord(self):
+        printed = []
+        metrics = RunStats(sinks=[printed.append])
+        stats = metrics.record("csv", summary("LOAD CSV FROM 'f' AS row\nMERGE (n:A)", 4, 6, nodes_created=10), message="CSV")
+        self.assertEqual(printed, [stats])
+        self.assertEqual(stats.label, "LOAD CSV FROM 'f' AS row")
+        self.assertEqual(stats.time, 10)
+        self.assertEqual(stats.bytes_sent, len("LOAD CSV FROM 'f' AS row\nMERGE (n:A)"))
+        self.assertEqual(stats.counters['nodes_created'], 10)
+        self.assertEqual(stats.counters['nodes_deleted'], 0)
+        metrics.record("csv", summary("LOAD CSV FROM 'g' AS row", 1, 1, nodes_created=5))
+        self.assertEqual(metrics.totals()['csv']['nodes_created'], 15)
+        # the size of small parameters is exact, the size of large lists is estimated from their first items
+        small = summary("UNWIND $rows AS row", 1, 1)
+        small.parameters = {'rows': [["a", None]] * 3, 'n': 1}
+        self.assertEqual(RunStats().record("csv", small).bytes_sent, len("UNWIND $rows AS row") + len(json.dumps(small.parameters)))
+        small.parameters = {'rows': [["abc", "d"]] * 10_000}
+        self.assertEqual(RunStats().record("csv", small).bytes_sent, len("UNWIND $rows AS row") + len(json.dumps(small.parameters)))
+        self.assertEqual(json.loads(metrics.to_json())['totals']['csv']['queries'], 2)
+        self.assertEqual(metrics.to_csv().splitlines()[0].split(",")[:6], ['phase', 'label', 'available_after', 'consumed_after', 'time', 'bytes_sent'])
+        self.assertEqual(len(metrics.to_csv().splitlines()), 3)
+
+    def testReport(self):
+        graph = MetricsGraph()
+        transformation = Transformation([Rule('MATCH (n:A) => (x = ("A", n) : OutA)'), Rule('MATCH (n:B) => (x = ("B", n) : OutB)')])
+        # rules report the time to execute and consume their results
+        self.assertEqual(transformation.apply_on(graph), 14)
+        self.assertEqual(transformation.report.totals()['rule']['nodes_created'], 6)
+        report = transformation.eject()
+        self.assertEqual(list(report.totals()), ['rule', 'eject'])
+        self.assertEqual(report.time, 16)
+    def testBackgroundEject(self):
+        graph = BookkeepingGraph(25)
+        transformation = Transformation([])
+        transformation.apply_on(graph)
+        future = transformation.eject(batch_size=10, background=True)
+        # the transformation is deactivated before the removal is done
+        self.assertIsNone(transformation._graph)
+        report = future.result(timeout=5)
+        self.assertTrue(future.done())
+        self.assertEqual(graph.nodes, 0)
+        self.assertEqual(report.totals()['eject']['queries'], 3)
+        self.assertEqual(report.totals()['eject']['labels_removed'], 25)
+    def testBatchedDelete(self):
+        graph = DeletingGraph("memgraph", 25, 12)
+        self.assertEqual(graph.destruct_input(batch_size=10), {'nodes': 25, 'relationships': 12})
+        # relationships are deleted first, each step being repeated until it deletes fewer elements than the batch size
+        self.assertEqual([q.splitlines()[0] for q in graph.queries], ["MATCH (n)-[r]->()"] * 2 + ["MATCH ()-[r]->(n)"] + ["MATCH (n)"] * 3)
+        graph = DeletingGraph("neo4j", 25, 12)
+        self.assertEqual(graph.abort(batch_size=10), {'nodes': 25, 'relationships': 12})
+        self.assertEqual(len(graph.queries), 3)
+        self.assertTrue(all(q.endswith("IN TRANSACTIONS OF 10 ROWS") for q in graph.queries))
+        self.assertTrue(graph.queries[0].startswith("MATCH (n:`_dummy`)-[r]->()"))
+        # the asynchronous graph runs the same steps
+        graph = AsyncDeletingGraph("memgraph", 25, 12)
+        self.assertEqual(asyncio.run(graph.destruct_input(batch_size=10)), {'nodes': 25, 'relationships': 12})
+        self.assertEqual(len(graph.queries), 6)
+        self.assertEqual(graph.metrics.totals()['destruct']['queries'], 6)
+
+if __name__ == "__main__":
+    unittest.main()
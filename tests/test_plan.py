@@ -0,0 +1,62 @@
+import unittest
+from types import SimpleNamespace
+from dtgraph import Rule, Transformation
+from dtgraph.exceptions import PlanError
+from dtgraph.plan import PlanNode
+
+# shape of the plans returned by the Neo4j driver for `EXPLAIN MATCH (gtn:GUSTaxonName) MATCH (gt:GUSTaxon) ...`
+PLAN = {
+    'operatorType': "ProduceResults@neo4j",
+    'identifiers': ["gt", "gtn"],
+    'args': {'EstimatedRows': 1000000.0, 'string-representation': "Planner COST\n..."},
+    'children': [{
+        'operatorType': "CartesianProduct@neo4j",
+        'identifiers': ["gt", "gtn"],
+        'args': {'EstimatedRows': 1000000.0},
+        'children': [
+            {'operatorType': "NodeByLabelScan@neo4j", 'identifiers': ["gtn"], 'args': {'EstimatedRows': 1000.0, 'Details': "gtn:GUSTaxonName"}, 'children': []},
+            {'operatorType': "NodeByLabelScan@neo4j", 'identifiers': ["gt"], 'args': {'EstimatedRows': 1000.0, 'Details': "gt:GUSTaxon"}, 'children': []},
+        ],
+    }],
+}
+
+class ExplainingGraph(object):
+    """Stands for a Neo4jGraph, answering every EXPLAIN query with the same plan."""
+
+    database = "neo4j"
+
+    def __init__(self):
+        self.explained = []
+
+    def explain_rule(self, query, autocommit=False, parameters=None):
+        self.explained.append(query)
+        return SimpleNamespace(plan=PLAN, profile=None)
+
+class PlanTestCase(unittest.TestCase):
+
+    def testFromDict(self):
+        plan = PlanNode.from_dict(PLAN)
+        self.assertEqual([node.operator for node in plan.walk()], ["ProduceResults", "CartesianProduct", "NodeByLabelScan", "NodeByLabelScan"])
+        self.assertEqual(plan.children[0].children[1].details, "gt:GUSTaxon")
+        self.assertEqual(plan.max_estimated_rows(), 1000000.0)
+        self.assertIsNone(plan.total_db_hits())
+        self.assertEqual(str(plan), "Planner COST\n...")
+        self.assertEqual(plan.to_dict()['children'][0]['operator'], "CartesianProduct")
+
+    def testBudget(self):
+        rules = [Rule('MATCH (gtn:GUSTaxonName) MATCH (gt:GUSTaxon) WHERE gt.a = gtn.a => (x = (gt) : Taxon)')]
+        graph = ExplainingGraph()
+        plans = Transformation(rules).plan(graph)
+        self.assertTrue(graph.explained[0].startswith("EXPLAIN MATCH (gtn:GUSTaxonName)"))
+        self.assertEqual(plans[0].children[0].operator, "CartesianProduct")
+        with self.assertRaises(PlanError):
+            Transformation(rules).plan(graph, budget=10_000)
+        # the transformation is not activated when its budget is exceeded
+        transformation = Transformation(rules, budget=10_000)
+        with self.assertRaises(PlanError):
+            transformation.apply_on(graph)
+        self.assertIsNone(transformation._graph)
+        Transformation(rules, strict_budget=False).plan(graph, budget=10_000)
+
+if __name__ == "__main__":
+    unittest.main()
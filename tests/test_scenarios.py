@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+from dtgraph.scenarios.ibench_persondata import iBenchPersonData
+from dtgraph.scenarios.ibench_gtb import iBenchGUSToBIOSQL
+from dtgraph.scenarios.scenario import merged_node
+
+class RecordingGraph(object):
+    """Records the CSV files loaded by a scenario."""
+
+    def __init__(self):
+        self.loaded = []
+
+    async def flush_database(self):
+        pass
+
+    async def populate_with_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False):
+        self.loaded.append(path_to_csv_file)
+
+class SchemaGraph(object):
+    """Records the commands and the schema commands sent by a scenario."""
+
+    database = "memgraph"
+
+    def __init__(self):
+        self.commands = []
+        self.schema = []
+
+    def flush_database(self):
+        pass
+
+    def run_schema_command(self, query):
+        self.schema.append(query)
+
+    def populate_with_csv(self, path_to_csv_file, mergeCMD, fieldterminator="|", stats=False):
+        self.commands.append(mergeCMD)
+
+class ScenarioTestCase(unittest.TestCase):
+
+    def testCsvFiles(self):
+        files = iBenchPersonData.csv_files(100)
+        self.assertEqual([path for path, _ in files], [
+            "file:///persondata/person100-5.csv",
+            "file:///persondata/address100-5.csv",
+            "file:///persondata/place100-5.csv",
+        ])
+        self.assertTrue(all(cmd.startswith("MERGE (n:") for _, cmd in files))
+
+    def testLoadAsync(self):
+        graph = RecordingGraph()
+        asyncio.run(iBenchPersonData.load_async(graph))
+        self.assertEqual(len(graph.loaded), 3)
+        self.assertIn("file:///persondata/place1000-5.csv", graph.loaded)
+    def testMergedNode(self):
+        _, cmd = iBenchGUSToBIOSQL.csv_files()[0]
+        self.assertEqual(merged_node(cmd), ("GUSGene", ["geneID", "name", "geneSymbol", "geneCategoryID", "reviewStatusID", "description", "reviewerSummary", "sequenceOntologyID"]))
+        self.assertIsNone(merged_node("MATCH (n:A) MERGE (n)-[:R]->(m:B {a: row[1]})"))
+
+    def testModes(self):
+        graph = SchemaGraph()
+        timings = iBenchPersonData.load(graph, 100, mode="create")
+        self.assertTrue(all(cmd.startswith("CREATE (n:") for cmd in graph.commands))
+        self.assertEqual([t['path'] for t in timings], [path for path, _ in iBenchPersonData.csv_files(100)])
+        graph = SchemaGraph()
+        timings = iBenchPersonData.load(graph, 100, mode="indexed")
+        self.assertTrue(all(cmd.startswith("MERGE (n:") for cmd in graph.commands))
+        self.assertEqual(graph.schema[0], "CREATE INDEX ON :`Person`(`name`)")
+        self.assertEqual(len(graph.schema), 3)
+        self.assertTrue(all('load_time' in t and 'index_time' in t for t in timings))
+        with self.assertRaises(ValueError):
+            iBenchPersonData.load(graph, 100, mode="fast")
+
+if __name__ == "__main__":
+    unittest.main()
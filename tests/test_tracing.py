@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from dtgraph import Rule, Transformation, RunStats, Tracer, TraceHook, ChromeTraceExporter
+from dtgraph.backend.neo4j.graph import Neo4jGraph
+
+class TracedGraph(Neo4jGraph):
+    """Stands for a Neo4jGraph, answering every query with a fake summary."""
+
+    def __init__(self, tracer):
+        self.database = "memgraph"
+        self.verbose = False
+        self.metrics = RunStats()
+        self.tracer = tracer
+        self.driver = SimpleNamespace(execute_query=self._execute_query)
+
+    def _execute_query(self, query, parameters_=None, database=None):
+        counters = SimpleNamespace(nodes_created=2, labels_added=2, properties_set=4, relationships_created=0, labels_removed=1)
+        return [], SimpleNamespace(query=query, parameters=parameters_, result_available_after=1, result_consumed_after=2, counters=counters, plan=None, profile=None), []
+
+    def run_schema_command(self, query):
+        pass
+
+class Recorder(TraceHook):
+
+    def __init__(self):
+        self.events = []
+
+    def on_start(self, span):
+        self.events.append(("start", span.name))
+
+    def on_end(self, span):
+        self.events.append(("end", span.name))
+
+class TracingTestCase(unittest.TestCase):
+
+    def testSpans(self):
+        recorder = Recorder()
+        exporter = ChromeTraceExporter()
+        graph = TracedGraph(Tracer([recorder, exporter]))
+        transformation = Transformation([Rule('MATCH (n:A) => (x = ("A", n) : OutA)'), Rule('MATCH (n:B) => (x = ("B", n) : OutB)')])
+        transformation.apply_on(graph)
+        transformation.eject()
+        self.assertEqual(recorder.events[:4], [("start", "apply_on"), ("start", "pre_apply"), ("end", "pre_apply"), ("start", "rule")])
+        self.assertEqual(recorder.events[4:7], [("start", "exec_rule"), ("end", "exec_rule"), ("end", "rule")])
+        self.assertEqual(recorder.events[-3:], [("start", "remove_bookkeeping"), ("end", "remove_bookkeeping"), ("end", "eject")])
+        events = {e['name']: e for e in exporter.to_dict()['traceEvents']}
+        self.assertEqual(events["rule #1"]['args']['rule'], "#1")
+        self.assertEqual(len(events["rule #1"]['args']['query_hash']), 12)
+        self.assertEqual(events["exec_rule"]['args']['nodes_created'], 2)
+        self.assertEqual(events["exec_rule"]['args']['time'], 3)
+        # nested spans are enclosed in their parent
+        self.assertLessEqual(events["apply_on"]['ts'], events["rule #0"]['ts'])
+        self.assertGreaterEqual(events["apply_on"]['ts'] + events["apply_on"]['dur'], events["rule #1"]['ts'] + events["rule #1"]['dur'])
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "trace.json")
+            exporter.write(path)
+            with open(path) as f:
+                self.assertEqual(len(json.load(f)['traceEvents']), len(exporter.events))
+
+    def testTasks(self):
+        # concurrent tasks of a thread are laid out on separate tracks
+        exporter = ChromeTraceExporter()
+        tracer = Tracer([exporter])
+        async def task(name):
+            with tracer.span(name, "rule"):
+                await asyncio.sleep(0.01)
+        async def run():
+            await asyncio.gather(task("a"), task("b"))
+        asyncio.run(run())
+        with tracer.span("c", "rule"):
+            pass
+        tracks = {e['name']: e['tid'] for e in exporter.to_dict()['traceEvents']}
+        self.assertNotEqual(tracks["a"], tracks["b"])
+        self.assertEqual(tracks["c"], threading.get_ident())
+
+    def testNoHooks(self):
+        tracer = Tracer()
+        with tracer.span("rule", "rule") as span:
+            tracer.annotate(nodes_created=1)
+        self.assertIsNone(span)
+
+if __name__ == "__main__":
+    unittest.main()
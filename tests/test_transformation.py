@@ -0,0 +1,188 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from neo4j.exceptions import TransientError
+from dtgraph import Rule, Transformation
+from dtgraph.exceptions import TransformationActivationError
+
+class RecordingGraph(object):
+    """Stands for a Neo4jGraph, recording the rules executed on it instead of sending them to a server."""
+
+    database = "neo4j"
+
+    def __init__(self, delay = 0.05, hash_functions = None):
+        self.delay = delay
+        self.hash_functions = hash_functions
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.log = []
+        self.parameters = []
+
+    def exec_rule(self, query, stats=False, autocommit=False, parameters=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.log.append(("start", query.splitlines()[0]))
+            self.parameters.append(parameters)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+            self.log.append(("end", query.splitlines()[0]))
+        return SimpleNamespace(result_available_after=1, plan=None, profile=None)
+
+    def dropIndex(self, query, stats=False):
+        pass
+
+    def addConstraint(self, query, stats=False):
+        pass
+
+    def await_indexes(self, names, stats=False):
+        pass
+
+    def clear_new_marks(self, stats=False):
+        self.log.append(("clear", None))
+
+    def has_hash_function(self, name):
+        return self.hash_functions is None or name in self.hash_functions
+
+class AsyncRecordingGraph(RecordingGraph):
+    """Asynchronous counterpart of RecordingGraph."""
+
+    async def exec_rule(self, query, stats=False, autocommit=False, parameters=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.log.append(("start", query.splitlines()[0]))
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.log.append(("end", query.splitlines()[0]))
+        return SimpleNamespace(result_available_after=1, plan=None, profile=None)
+
+    async def dropIndex(self, query, stats=False):
+        pass
+
+    async def addConstraint(self, query, stats=False):
+        pass
+
+    async def await_indexes(self, names, stats=False):
+        pass
+
+class FlakyGraph(RecordingGraph):
+    """Fails the first execution of the second partition of a rule with a transient error."""
+
+    def exec_rule(self, query, stats=False, autocommit=False, parameters=None):
+        summary = super().exec_rule(query, stats=stats, autocommit=autocommit, parameters=parameters)
+        with self.lock:
+            failing = parameters['dtgPartition'] == 1 and len([p for p in self.parameters if p['dtgPartition'] == 1]) == 1
+        if failing:
+            raise TransientError("deadlock")
+        return summary
+
+INDEPENDENT = [
+    Rule('MATCH (n:A) => (x = ("A", n) : OutA)'),
+    Rule('MATCH (n:B) => (x = ("B", n) : OutB)'),
+    Rule('MATCH (n:C) => (x = ("C", n) : OutC)'),
+]
+
+class TransformationTestCase(unittest.TestCase):
+
+    def testInterference(self):
+        a, b, c = INDEPENDENT
+        self.assertFalse(a.interferes_with(b))
+        # reads the output of a
+        self.assertTrue(a.interferes_with(Rule('MATCH (n:OutA) => (x = ("D", n) : OutD)')))
+        # may write the same nodes as a
+        self.assertTrue(a.interferes_with(Rule('MATCH (n:D) => (x = (n.a, n) : OutD)')))
+        # reads any node
+        self.assertTrue(a.interferes_with(Rule('MATCH (n)-[:R]->(m:D) => (x = ("D", n) : OutD)')))
+        self.assertTrue(a.interferes_with(Rule(raw = 'MATCH (n:D) RETURN n')))
+
+    def testParallel(self):
+        graph = RecordingGraph()
+        Transformation(list(INDEPENDENT), parallel=3).apply_on(graph)
+        self.assertEqual(graph.max_active, 3)
+
+    def testParallelOrder(self):
+        graph = RecordingGraph()
+        dependent = Rule('MATCH (n:OutA) => (x = ("D", n) : OutD)')
+        Transformation(list(INDEPENDENT) + [dependent], parallel=4).apply_on(graph)
+        # the dependent rule starts once the rule it reads from has ended
+        self.assertLess(graph.log.index(("end", "MATCH (n:A)")), graph.log.index(("start", "MATCH (n:OutA)")))
+
+    def testPartitions(self):
+        graph = RecordingGraph()
+        Rule('MATCH (n:A) => (x = ("A", n) : OutA)', partitions=3).apply_on(graph)
+        self.assertEqual(graph.max_active, 3)
+        self.assertEqual(sorted([p['dtgPartition'] for p in graph.parameters]), [0, 1, 2])
+        self.assertTrue(all(p['dtgPartitions'] == 3 for p in graph.parameters))
+
+    def testPartitionsSwitch(self):
+        # a rule is compiled again when applied with another mode of partitioning
+        graph = RecordingGraph(delay=0)
+        rule = Rule('MATCH (n:A) => (x = ("A", n) : OutA)')
+        rule.apply_on(graph)
+        self.assertNotIn("$dtgPartition", rule._compiled)
+        rule.apply_on(graph, partitions=2)
+        self.assertIn("$dtgPartition", rule._compiled)
+        self.assertEqual(sorted([p['dtgPartition'] for p in graph.parameters[1:]]), [0, 1])
+        rule.apply_on(graph)
+        self.assertNotIn("$dtgPartition", rule._compiled)
+        self.assertIsNone(graph.parameters[-1])
+
+    def testPartitionRetries(self):
+        # only the partition failing with a transient error is executed again
+        graph = FlakyGraph(delay=0)
+        t = Transformation([Rule('MATCH (n:A) => (x = ("A", n) : OutA)', partitions=3)], retries=2)
+        t.apply_on(graph)
+        self.assertEqual(sorted([p['dtgPartition'] for p in graph.parameters]), [0, 1, 1, 2])
+        self.assertEqual(t._rules[0].last_retries, 1)
+
+    def testMissingHashFunction(self):
+        # compact identifiers are only computed by servers providing the hash function
+        graph = RecordingGraph(delay=0, hash_functions=[])
+        t = Transformation([Rule('MATCH (n:A) => (x = ("A", n) : OutA)')], compact_ids=True)
+        with self.assertRaises(TransformationActivationError):
+            t.apply_on(graph)
+        self.assertEqual(graph.log, [])
+        t.apply_on(RecordingGraph(delay=0, hash_functions=["apoc.util.md5"]))
+
+    def testApplyOnAsync(self):
+        graph = AsyncRecordingGraph()
+        dependent = Rule('MATCH (n:OutA) => (x = ("D", n) : OutD)')
+        tt = asyncio.run(Transformation(list(INDEPENDENT) + [dependent], parallel=4).apply_on_async(graph))
+        self.assertEqual(tt, 4)
+        self.assertEqual(graph.max_active, 3)
+        self.assertLess(graph.log.index(("end", "MATCH (n:A)")), graph.log.index(("start", "MATCH (n:OutA)")))
+
+    def testDeltaVariants(self):
+        rule = Rule('MATCH (n:A)-[:R]->(:B {name: "(x)"}) WHERE n.a = "(y)" => (x = (n) : OutA)')
+        self.assertEqual([v._dict['lhs'] for v in rule.delta_variants()], [
+            'MATCH (n:_dtgNew:A)-[:R]->(_dtg1:B {name: "(x)"}) WHERE n.a = "(y)"',
+            'MATCH (n:A)-[:R]->(_dtg1:_dtgNew:B {name: "(x)"}) WHERE n.a = "(y)"',
+        ])
+        # several patterns, property maps, comments and pattern predicates
+        rule = Rule('MATCH (n:A {tag: "MATCH (z)"}), /* (c) */ (m:B)<-[:R {count: 1}]-(n) // (d)\nWHERE (n)-->(:C) => (x = (n, m) : OutA)')
+        self.assertEqual([v._dict['lhs'] for v in rule.delta_variants()], [
+            'MATCH (n:_dtgNew:A {tag: "MATCH (z)"}), /* (c) */ (m:B)<-[:R {count: 1}]-(n) // (d)\nWHERE (n)-->(:C)',
+            'MATCH (n:A {tag: "MATCH (z)"}), /* (c) */ (m:_dtgNew:B)<-[:R {count: 1}]-(n) // (d)\nWHERE (n)-->(:C)',
+        ])
+        self.assertIsNone(Rule('MATCH (n:A) OPTIONAL MATCH (n)-[:R]->(m:B) => (x = (n) : OutA)').delta_variants())
+        self.assertIsNone(Rule('MATCH (n:A|B) => (x = (n) : OutA)').delta_variants())
+        self.assertIsNone(Rule('MATCH p = shortestPath((n:A)-[*]->(m:B)) => (x = (n) : OutA)').delta_variants())
+
+    def testApplyDelta(self):
+        graph = RecordingGraph(delay=0)
+        reader = Rule('MATCH (n:OutA) => (x = ("D", n) : OutD)')
+        transformation = Transformation([INDEPENDENT[0], reader], incremental=True)
+        transformation.apply_on(graph)
+        self.assertEqual(graph.log[-1], ("clear", None))
+        graph.log = []
+        transformation.apply_delta()
+        # the second rule reads the output of the first one, hence is applied on the whole input
+        self.assertEqual([entry for entry in graph.log if entry[0] == "start"], [("start", "MATCH (n:_dtgNew:A)"), ("start", "MATCH (n:OutA)")])
+        self.assertEqual(graph.log[-1], ("clear", None))
+
+if __name__ == "__main__":
+    unittest.main()